@@ -0,0 +1,35 @@
+-- Backs the paginated /api/app_projects_with_members feed.
+-- Cards list a capped number of members, so the total is kept on the
+-- project row by triggers instead of counting members on every read.
+ALTER TABLE app_projects ADD COLUMN IF NOT EXISTS member_count integer NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION app_projects_member_count() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    UPDATE app_projects SET member_count = member_count + 1 WHERE id = NEW.project_id;
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE app_projects SET member_count = GREATEST(member_count - 1, 0) WHERE id = OLD.project_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS app_project_members_member_count ON app_project_members;
+CREATE TRIGGER app_project_members_member_count
+AFTER INSERT OR DELETE ON app_project_members
+FOR EACH ROW EXECUTE FUNCTION app_projects_member_count();
+
+-- Keyset order of the feed (newest first, id breaks ties)
+CREATE INDEX IF NOT EXISTS app_projects_feed_idx
+  ON app_projects (created_at DESC, id DESC);
+
+-- Each card's first members, and the viewer's own membership per page
+CREATE INDEX IF NOT EXISTS app_project_members_project_joined_idx
+  ON app_project_members (project_id, joined_at, id);
+CREATE INDEX IF NOT EXISTS app_project_members_user_idx
+  ON app_project_members (user_id);
+
+-- Backfill from existing rows
+UPDATE app_projects p SET member_count = (
+  SELECT COUNT(*) FROM app_project_members m WHERE m.project_id = p.id
+);
@@ -0,0 +1,237 @@
+"""
+Email OTP store: expiring codes, attempt caps and send rate limits.
+
+A code lives OTP_TTL_SECONDS (the email says 10 minutes) and allows
+OTP_MAX_ATTEMPTS wrong guesses before it's thrown away. /send-otp is
+limited to OTP_EMAIL_SENDS per address and OTP_IP_SENDS per client IP in
+every OTP_SEND_WINDOW_SECONDS window (fixed windows), which also bounds how
+often a fresh code can reset the attempt count.
+
+Everything is kept as expiring keys, so both backends share one algorithm:
+    otp:code:<email>          the code, expires with it
+    otp:attempts:<email>      wrong-guess counter, expires with the code
+    otp:sends:email:<email>   send counters, one window each
+    otp:sends:ip:<ip>
+
+OTP_STORE_URL selects the backend (defaulting to BROKER_URL, so workers
+that share a broker share codes too):
+    unset / "memory://"          InProcessOTPStore (single worker)
+    "redis://host:port"          RedisOTPStore over TCP (Redis or pubsub.server)
+    "unix:///path/to/socket"     RedisOTPStore over a Unix socket
+
+With several uvicorn workers the store must be shared: /verify-otp can land
+on a different worker from the /send-otp that issued the code.
+"""
+import abc
+import asyncio
+import hmac
+import os
+from urllib.parse import urlparse
+
+from pubsub.resp import encode_command, read_reply, open_connection, RespError
+from ttl_cache import ExpiringMap
+
+OTP_TTL_SECONDS = int(os.getenv("OTP_TTL_SECONDS", "600"))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+OTP_EMAIL_SENDS = int(os.getenv("OTP_EMAIL_SENDS", "3"))
+OTP_IP_SENDS = int(os.getenv("OTP_IP_SENDS", "20"))
+OTP_SEND_WINDOW_SECONDS = int(os.getenv("OTP_SEND_WINDOW_SECONDS", "600"))
+OTP_MAX_ENTRIES = int(os.getenv("OTP_MAX_ENTRIES", "100000"))
+
+
+class OTPNotFound(LookupError):
+    pass
+
+
+class OTPInvalid(ValueError):
+    pass
+
+
+class TooManyAttempts(Exception):
+    pass
+
+
+class OTPStoreUnavailable(Exception):
+    pass
+
+
+class RateLimited(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+class OTPStore(abc.ABC):
+    """Send limits and code checks over expiring keys; backends supply the key operations"""
+
+    def __init__(self, ttl: int = OTP_TTL_SECONDS, max_attempts: int = OTP_MAX_ATTEMPTS,
+                 email_sends: int = OTP_EMAIL_SENDS, ip_sends: int = OTP_IP_SENDS,
+                 send_window: int = OTP_SEND_WINDOW_SECONDS):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.email_sends = email_sends
+        self.ip_sends = ip_sends
+        self.send_window = send_window
+
+    async def close(self):
+        pass
+
+    @abc.abstractmethod
+    async def _get(self, key: str):
+        ...
+
+    @abc.abstractmethod
+    async def _set(self, key: str, value: str, ttl: int):
+        ...
+
+    @abc.abstractmethod
+    async def _delete(self, *keys: str) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def _incr(self, key: str, ttl: int):
+        """Fixed-window counter: returns (count, seconds until the window resets)"""
+
+    async def check_send(self, email: str, ip: str = None):
+        """Count a send against the per-IP and per-email limits; raises RateLimited"""
+        limits = [(f"otp:sends:email:{normalize_email(email)}", self.email_sends)]
+        if ip:
+            limits.insert(0, (f"otp:sends:ip:{ip}", self.ip_sends))
+        for key, limit in limits:
+            count, retry_after = await self._incr(key, self.send_window)
+            if count > limit:
+                raise RateLimited("Too many OTP requests, try again later", retry_after)
+
+    async def issue(self, email: str, code: str):
+        """Store a new code for email, replacing any earlier one and its attempts"""
+        email = normalize_email(email)
+        await self._set(f"otp:code:{email}", code, self.ttl)
+        await self._delete(f"otp:attempts:{email}")
+
+    async def verify(self, email: str, code: str):
+        """
+        Check and consume email's code. Raises OTPNotFound (none issued, or
+        expired), OTPInvalid, and TooManyAttempts once the code has taken
+        max_attempts wrong guesses (it is deleted then).
+        """
+        email = normalize_email(email)
+        code_key, attempts_key = f"otp:code:{email}", f"otp:attempts:{email}"
+        stored = await self._get(code_key)
+        if stored is None:
+            raise OTPNotFound("No OTP found for this email. Request a new one.")
+        attempts, _ = await self._incr(attempts_key, self.ttl)
+        if attempts > self.max_attempts:
+            await self._delete(code_key, attempts_key)
+            raise TooManyAttempts("Too many attempts. Request a new OTP.")
+        if not hmac.compare_digest(stored.encode(), code.strip().encode()):
+            if attempts == self.max_attempts:
+                await self._delete(code_key, attempts_key)
+                raise TooManyAttempts("Too many attempts. Request a new OTP.")
+            raise OTPInvalid("Invalid OTP")
+        # Only the request that actually removes the code succeeds, so it can't be used twice
+        if not await self._delete(code_key):
+            raise OTPNotFound("No OTP found for this email. Request a new one.")
+        await self._delete(attempts_key)
+
+
+class InProcessOTPStore(OTPStore):
+    """Keys in this process's memory, evicted in expiry order and capped at max_entries"""
+
+    def __init__(self, max_entries: int = OTP_MAX_ENTRIES, **limits):
+        super().__init__(**limits)
+        self.keys = ExpiringMap(max_entries=max_entries)
+
+    async def _get(self, key: str):
+        return self.keys.get(key)
+
+    async def _set(self, key: str, value: str, ttl: int):
+        self.keys.set(key, value, ttl)
+
+    async def _delete(self, *keys: str) -> int:
+        return sum(self.keys.delete(key) for key in keys)
+
+    async def _incr(self, key: str, ttl: int):
+        return self.keys.incr(key, ttl)
+
+    def stats(self) -> dict:
+        return self.keys.stats()
+
+
+class RedisOTPStore(OTPStore):
+    """
+    Keys in Redis (or pubsub.server), shared by every worker. One pipelined
+    connection per worker; reconnects once if it was dropped, then raises
+    OTPStoreUnavailable.
+    """
+
+    def __init__(self, url: str, **limits):
+        super().__init__(**limits)
+        self.url = urlparse(url)
+        self.connection = None
+        self.lock = asyncio.Lock()
+
+    async def _call(self, *commands):
+        async with self.lock:
+            for attempt in range(2):
+                try:
+                    if self.connection is None:
+                        self.connection = await open_connection(self.url)
+                    reader, writer = self.connection
+                    writer.write(b"".join(encode_command(*command) for command in commands))
+                    await writer.drain()
+                    replies = [await read_reply(reader) for _ in commands]
+                    break
+                except (ConnectionError, OSError, asyncio.IncompleteReadError) as error:
+                    await self.close()
+                    if attempt:
+                        raise OTPStoreUnavailable(f"OTP store unreachable: {error}") from error
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    async def close(self):
+        connection, self.connection = self.connection, None
+        if connection:
+            connection[1].close()
+            try:
+                await connection[1].wait_closed()
+            except OSError:
+                pass
+
+    async def _get(self, key: str):
+        value, = await self._call(("GET", key))
+        return None if value is None else value.decode()
+
+    async def _set(self, key: str, value: str, ttl: int):
+        await self._call(("SET", key, value, "PX", ttl * 1000))
+
+    async def _delete(self, *keys: str) -> int:
+        count, = await self._call(("DEL", *keys))
+        return count
+
+    async def _incr(self, key: str, ttl: int):
+        count, remaining = await self._call(("INCR", key), ("PTTL", key))
+        if remaining < 0:
+            # A new window (or one whose PEXPIRE was lost): start its clock
+            await self._call(("PEXPIRE", key, ttl * 1000))
+            return count, ttl
+        return count, remaining / 1000
+
+
+def create_otp_store(url: str = None) -> OTPStore:
+    if url is None:
+        url = os.getenv("OTP_STORE_URL") or os.getenv("BROKER_URL", "")
+    if not url or url.startswith("memory://"):
+        return InProcessOTPStore()
+    if url.startswith(("redis://", "unix://")):
+        return RedisOTPStore(url)
+    raise RuntimeError(f"Unsupported OTP_STORE_URL {url!r}")
+
+
+# Process-wide store used by /send-otp and /verify-otp
+otp_store = create_otp_store()
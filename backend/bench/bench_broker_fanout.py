@@ -0,0 +1,77 @@
+"""
+Benchmark: room fan-out through the pub/sub broker across simulated workers.
+
+Starts the local Redis-protocol stand-in, connects WORKERS RedisBroker
+instances to it (one per simulated uvicorn worker, each subscribed to every
+room) and publishes MESSAGES messages round-robin from all of them. Reports
+publish->delivery latency and delivered messages per second, next to the
+single-process InProcessBroker as a baseline.
+
+Run from backend/:
+    python -m bench.bench_broker_fanout [workers] [rooms] [messages]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from pubsub.broker import InProcessBroker, RedisBroker
+from pubsub.server import PubSubServer
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(brokers, rooms: int, messages: int):
+    expected = messages * len(brokers)
+    latencies = []
+    done = asyncio.Event()
+
+    async def on_message(channel, message):
+        latencies.append((time.perf_counter() - float(message)) * 1000)
+        if len(latencies) >= expected:
+            done.set()
+
+    for broker in brokers:
+        for room in range(rooms):
+            await broker.subscribe(f"room:{room}", on_message)
+
+    started = time.perf_counter()
+    for i in range(messages):
+        await brokers[i % len(brokers)].publish(f"room:{i % rooms}", repr(time.perf_counter()))
+    await asyncio.wait_for(done.wait(), timeout=60)
+    elapsed = time.perf_counter() - started
+
+    for broker in brokers:
+        await broker.close()
+    return latencies, expected / elapsed
+
+
+async def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rooms = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    messages = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+
+    server = PubSubServer()
+    await server.start(port=0)
+    port = server.server.sockets[0].getsockname()[1]
+
+    print(f"workers={workers} rooms={rooms} messages={messages}")
+    print(f"{'broker':<22} {'p50 ms':>8} {'p99 ms':>8} {'delivered/s':>12}")
+    cases = [
+        ("in-process (1 worker)", [InProcessBroker()]),
+        (f"redis-protocol x{workers}", [RedisBroker(f"redis://127.0.0.1:{port}") for _ in range(workers)]),
+    ]
+    for name, brokers in cases:
+        latencies, rate = await run(brokers, rooms, messages)
+        print(f"{name:<22} {statistics.median(latencies):>8.2f} {percentile(latencies, 99):>8.2f} {rate:>12.0f}")
+
+    # Let the server notice the closed client connections before shutting down
+    await asyncio.sleep(0.1)
+    await server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark: inline blocking .execute() vs run_query() thread-pool offload.
+
+Simulates N concurrent handlers that each issue one query whose round trip
+takes QUERY_MS (the supabase client blocks for that long), while a ticker
+coroutine stands in for an open websocket that needs the loop every 5ms.
+
+Run from backend/:
+    python -m bench.bench_db_offload [concurrency] [query_ms]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("DB_MAX_WORKERS", "32")
+
+from db import run_query
+
+
+class FakeQuery:
+    """Stand-in for a PostgREST builder whose execute() blocks like an HTTP call"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return {"data": []}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    """Measures how late the loop wakes us up, i.e. how long it was blocked"""
+    interval = 0.005
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - expected) * 1000)
+
+
+async def run(mode: str, concurrency: int, latency: float):
+    async def handler(arrived: float):
+        query = FakeQuery(latency)
+        if mode == "inline":
+            query.execute()
+        else:
+            await run_query(query)
+        return (time.perf_counter() - arrived) * 1000
+
+    stop = asyncio.Event()
+    lags = []
+    tick = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    # Every request arrives at once, so latency includes time spent waiting
+    # behind other requests that hold the loop (inline) or the pool (offload).
+    latencies = await asyncio.gather(*(handler(started) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await tick
+    return latencies, lags or [0.0], elapsed
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    query_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+
+    print(f"concurrency={concurrency} query={query_ms}ms db_workers={os.environ['DB_MAX_WORKERS']}")
+    print(f"{'mode':<8} {'p50 ms':>10} {'p99 ms':>10} {'loop lag p99 ms':>16} {'req/s':>10}")
+    for mode in ("inline", "offload"):
+        latencies, lags, elapsed = asyncio.run(run(mode, concurrency, query_ms / 1000))
+        print(
+            f"{mode:<8} {statistics.median(latencies):>10.1f} {percentile(latencies, 99):>10.1f} "
+            f"{percentile(lags, 99):>16.1f} {concurrency / elapsed:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
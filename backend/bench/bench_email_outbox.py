@@ -0,0 +1,112 @@
+"""
+Benchmark: email throughput of the outbox against a local SMTP stand-in.
+
+Runs mail.smtp_server on a background thread with a simulated network
+round trip per reply (LATENCY) and handshake cost on AUTH (AUTH_DELAY, the
+TLS negotiation and login of a real relay), then sends EMAILS emails:
+
+- per-email connection: the previous send path, email_utils.send_email,
+  which connects and logs in for every email (on BASELINE_EMAILS emails);
+- the outbox with 1 and 4 sender workers (pooled connections, batches);
+- the outbox with 4 workers while the relay answers every 10th recipient
+  with a temporary failure, so retries and backoff are exercised.
+
+Each run reports emails/s, connections opened, and the longest time the
+caller (the request handler, i.e. the event loop) was blocked per email.
+The stand-in's received count is checked against the emails sent, so the
+numbers are for delivered mail.
+
+Run from backend/:
+    python -m bench.bench_email_outbox [emails]
+"""
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+from mail.smtp_server import SMTPServer
+
+LATENCY = 0.005
+AUTH_DELAY = 0.1
+BASELINE_EMAILS = 50
+
+
+def start_server(server: SMTPServer, port: int):
+    """Serve on a background thread's event loop"""
+    ready = threading.Event()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(server.start("127.0.0.1", port))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def run_outbox(outbox, build_message, emails: int):
+    submit_ms = []
+    started = time.perf_counter()
+    for i in range(emails):
+        message = build_message(f"user{i}@example.com", "Your OTP Code", f"Your OTP code is: {i:06d}")
+        submitted = time.perf_counter()
+        outbox.submit(message)
+        submit_ms.append((time.perf_counter() - submitted) * 1000)
+    await outbox.queue.join()
+    seconds = time.perf_counter() - started
+    stats = outbox.stats()
+    await outbox.drain()
+    return seconds, stats, max(submit_ms)
+
+
+def main():
+    emails = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    # email_utils reads the relay settings at import, so point them at the stand-in first
+    port = free_port()
+    os.environ.update(SMTP_SERVER="127.0.0.1", SMTP_PORT=str(port), SMTP_STARTTLS="0",
+                      EMAIL_ADDRESS="noreply@devconnect.test", EMAIL_PASSWORD="secret")
+    from email_utils import send_email, build_message
+    from mail.outbox import EmailOutbox
+
+    print(f"relay: {LATENCY * 1000:.0f} ms per reply, {AUTH_DELAY * 1000:.0f} ms handshake")
+    print(f"{'sender':<34} {'emails':>7} {'emails/s':>9} {'connections':>12} {'caller blocked ms':>18}  check")
+
+    server = SMTPServer(LATENCY, AUTH_DELAY)
+    start_server(server, port)
+    started = time.perf_counter()
+    samples = []
+    for i in range(BASELINE_EMAILS):
+        sent = time.perf_counter()
+        send_email(f"user{i}@example.com", "Your OTP Code", f"Your OTP code is: {i:06d}")
+        samples.append((time.perf_counter() - sent) * 1000)
+    seconds = time.perf_counter() - started
+    check = "ok" if server.received == BASELINE_EMAILS else f"{server.received} received"
+    print(f"{'per-email connection':<34} {BASELINE_EMAILS:>7} {BASELINE_EMAILS / seconds:>9.1f} "
+          f"{server.connections:>12} {max(samples):>18.1f}  {check}")
+
+    for name, workers, fail_every in (
+        ("outbox, 1 worker", 1, 0),
+        ("outbox, 4 workers", 4, 0),
+        ("outbox, 4 workers, 10% temp fails", 4, 10),
+    ):
+        server.received = server.connections = server.recipients = server.rejected = 0
+        server.fail_every = fail_every
+        outbox = EmailOutbox(workers=workers, queue_size=emails)
+        seconds, stats, submit_max = asyncio.run(run_outbox(outbox, build_message, emails))
+        check = "ok" if server.received == emails == stats["sent"] else f"{server.received} received"
+        print(f"{name:<34} {emails:>7} {emails / seconds:>9.1f} {stats['connections_opened']:>12} "
+              f"{submit_max:>18.3f}  {check}  (retries {stats['retries']}, batches {stats['batches']})")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(line_buffering=True)
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: filtered project browse with facet counts on the discovery index.
+
+Generates PROJECTS app_projects-shaped rows whose skills, stack, languages
+and tags are drawn from Zipf-distributed vocabularies (a few very common
+values, a long tail of rare ones), loads them into a FacetIndex and times
+typical browse queries: no filter, one common value, an OR of values, ANDs
+across facets, a narrow filter, and a deep page through the cursor. Each
+query returns a 20-project page plus the top 10 values of every facet.
+
+The first run of each query is checked against a brute-force scan of the
+rows, so the numbers are for correct answers.
+
+Run from backend/:
+    python -m bench.bench_facets [projects]
+"""
+import itertools
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from search.facets import FacetIndex, ARRAY_FIELDS, FACET_FIELDS, parse_filters
+
+REPEAT = 30
+VOCABULARY = {"required_skills": 3000, "tech_stack": 800, "programming_languages": 60, "tags": 5000}
+SCALARS = {
+    "domain": ["web", "ai", "data", "mobile", "devtools", "games", "fintech", "health"],
+    "difficulty_level": ["beginner", "intermediate", "advanced", "expert"],
+    "is_remote": [True, False],
+    "status": ["active", "completed", "on_hold", "cancelled"],
+}
+
+
+def corpus(count: int):
+    rng = random.Random(4)
+    pools = {}
+    for field, size in VOCABULARY.items():
+        values = [f"{field[:4]}{i}" for i in range(size)]
+        pools[field] = values, list(itertools.accumulate(1 / (rank + 1) for rank in range(size)))
+    for i in range(count):
+        row = {"id": f"{i:08d}", "created_at": f"2026-01-01T{i:012d}"}
+        for field, (values, cumulative) in pools.items():
+            row[field] = list(set(rng.choices(values, cum_weights=cumulative, k=rng.randrange(1, 6))))
+        for field, values in SCALARS.items():
+            row[field] = rng.choice(values)
+        yield row
+
+
+def brute(rows, clauses, limit, facet_limit=10):
+    """Same answer as FacetIndex.query, by scanning every row"""
+    def keys(row, field):
+        raw = row[field]
+        values = raw if field in ARRAY_FIELDS else [raw]
+        return {("true" if v else "false") if isinstance(v, bool) else str(v).lower() for v in values}
+
+    def matches(row, skip=None):
+        return all(keys(row, field) & {v.lower() for v in values} for field, values in clauses if field != skip)
+
+    hits = [row for row in rows if matches(row)]
+    facets = {}
+    for field in FACET_FIELDS:
+        counts = Counter(value for row in rows if matches(row, skip=field) for value in keys(row, field))
+        best = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:facet_limit]
+        facets[field] = [{"value": value, "count": count} for value, count in best]
+    return [row["id"] for row in reversed(hits)][:limit], len(hits), facets
+
+
+def timed_ms(fn):
+    samples = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[-1]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = list(corpus(count))
+    index = FacetIndex()
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.begin_load()
+    for row in rows:
+        index.add(row, loading=True)
+    index.finish_load()
+    seconds = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"projects={count} {index.stats()}")
+    print(f"build {seconds:.1f}s, index memory {memory / 2**20:.0f} MB")
+
+    deep = index.query([], 20)
+    for _ in range(49):
+        last = deep["ids"][-1]
+        deep = index.query([], 20, (rows[int(last)]["created_at"], last))
+    deep_cursor = (rows[int(deep["ids"][-1])]["created_at"], deep["ids"][-1])
+
+    queries = [
+        ("no filter", []),
+        ("one common value", ["tech_stack:tech0"]),
+        ("OR of three", ["programming_languages:prog1|prog2|prog3"]),
+        ("AND across facets", ["tech_stack:tech0|tech1", "status:active", "is_remote:true"]),
+        ("narrow", ["required_skills:requ40", "difficulty_level:expert"]),
+        ("rare tag", ["tags:tags4000"]),
+    ]
+    print(f"{'query':<22} {'total':>7} {'p50 ms':>8} {'max ms':>8}  check")
+    for name, filters in queries:
+        clauses = parse_filters(filters)
+        result = index.query(clauses, 20)
+        expected_ids, expected_total, expected_facets = brute(rows, clauses, 20)
+        facets = {field: [{**item, "value": item["value"].lower()} for item in items]
+                  for field, items in result["facets"].items()}
+        ok = result["ids"] == expected_ids and result["total"] == expected_total and facets == expected_facets
+        p50, worst = timed_ms(lambda: index.query(clauses, 20))
+        print(f"{name:<22} {result['total']:>7} {p50:>8.2f} {worst:>8.2f}  {'ok' if ok else 'MISMATCH'}")
+    p50, worst = timed_ms(lambda: index.query([], 20, deep_cursor))
+    print(f"{'page 51 via cursor':<22} {'':>7} {p50:>8.2f} {worst:>8.2f}")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(line_buffering=True)
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: deep-page latency, offset paging vs keyset (cursor) paging.
+
+Loads MESSAGES messages into one room on the SQLite storage backend, then
+times fetching the same 50-message page at increasing depths with
+get_room_messages (limit/offset) and get_room_messages_page (after cursor).
+Also prints the query plans so they can be compared.
+
+Run from backend/:
+    python -m bench.bench_message_paging [messages]
+"""
+import asyncio
+import datetime
+import os
+import sys
+import time
+import uuid
+
+os.environ["DB_BACKEND"] = "sqlite"
+
+import db
+
+PAGE = 50
+REPEAT = 20
+
+
+def seed(messages: int):
+    client = db.supabase
+    client.table("profiles").insert({"id": "bench-user", "username": "bench"}).execute()
+    room = client.table("rooms").insert({"name": "bench", "type": "group", "created_by": "bench-user"}).execute().data[0]
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    rows = [
+        (str(uuid.uuid4()), room["id"], "bench-user", f"message {i}",
+         (start + datetime.timedelta(seconds=i)).isoformat())
+        for i in range(messages)
+    ]
+    with client.lock:
+        client.connection.executemany(
+            "INSERT INTO messages (id, room_id, sender_id, content, created_at) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        client.connection.commit()
+    return room["id"]
+
+
+def cursor_before(room_id: str, offset: int):
+    """Cursor whose `after` page starts at the given oldest-first offset"""
+    row = (
+        db.supabase.table("messages").select("*").eq("room_id", room_id)
+        .order("created_at").order("id").limit(1).offset(offset - 1).execute().data[0]
+    )
+    return db.encode_cursor(row)
+
+
+async def timed(factory):
+    samples = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        await factory()
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+async def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    room_id = seed(messages)
+    print(f"messages={messages} page={PAGE} (median of {REPEAT})")
+    print(f"{'offset':>10} {'offset ms':>10} {'keyset ms':>10}")
+
+    offset = PAGE
+    while offset < messages:
+        # The same page addressed both ways
+        cursor = cursor_before(room_id, offset)
+        offset_ms = await timed(lambda: db.get_room_messages(room_id, PAGE, offset))
+        keyset_ms = await timed(lambda: db.get_room_messages_page(room_id, PAGE, after=cursor))
+        print(f"{offset:>10} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+        offset *= 4
+
+    client = db.supabase
+    created_at, row_id = db.decode_cursor(cursor_before(room_id, messages // 2))
+    offset_query = client.table("messages").select("*").eq("room_id", room_id).order("created_at").limit(PAGE).offset(messages // 2)
+    keyset_query = (
+        client.table("messages").select("*").eq("room_id", room_id)
+        .gte("created_at", created_at)
+        .or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{row_id})')
+        .order("created_at").order("id").limit(PAGE + 1)
+    )
+    print("offset plan:", client.explain(offset_query))
+    print("keyset plan:", client.explain(keyset_query))
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(line_buffering=True)
+    # db helpers log every fetch; keep the table readable
+    import builtins
+    _print = builtins.print
+    builtins.print = lambda *args, **kwargs: None if args and str(args[0]).startswith("📩") else _print(*args, **kwargs)
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""
+Benchmark: OTP storage under signup spam and across workers.
+
+1. Memory. Replays SENDS /send-otp requests for distinct addresses at
+   RATE per second on a simulated clock (an hour of spam at the defaults)
+   and reports how many keys each store holds at the end: the old
+   module-level dict keeps every code forever, the in-process store only
+   the ones still inside their TTL, popped off the expiry heap as time
+   passes.
+2. Sharing. Sends and verifies USERS codes with requests spread
+   round-robin over two workers (two store instances) and counts the
+   verifications that succeed: per-process storage fails whenever the
+   verify lands on the other worker; the Redis-protocol store, against the
+   pubsub.server stand-in on a background thread, doesn't.
+3. Cost. Issue + verify pairs per second for each store.
+
+Run from backend/:
+    python -m bench.bench_otp_store [sends]
+"""
+import asyncio
+import socket
+import sys
+import threading
+import time
+
+from auth.otp_store import InProcessOTPStore, RedisOTPStore, OTPNotFound
+from pubsub.server import PubSubServer
+
+RATE = 50
+USERS = 2000
+
+
+class DictOTPStore:
+    """The previous storage: a module-level dict, no expiry"""
+
+    def __init__(self):
+        self.codes = {}
+
+    async def check_send(self, email, ip=None):
+        pass
+
+    async def issue(self, email, code):
+        self.codes[email] = code
+
+    async def verify(self, email, code):
+        if self.codes.get(email) is None:
+            raise OTPNotFound(email)
+        del self.codes[email]
+
+    async def close(self):
+        pass
+
+
+def start_server(server: PubSubServer, port: int):
+    ready = threading.Event()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(server.start("127.0.0.1", port))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def spam(store, sends: int, clock):
+    for i in range(sends):
+        clock[0] = i / RATE
+        email = f"spam{i}@example.com"
+        await store.check_send(email, f"10.0.0.{i % 256}")
+        await store.issue(email, f"{i % 1_000_000:06d}")
+
+
+async def shared(stores) -> int:
+    verified = 0
+    for i in range(USERS):
+        email = f"user{i}@example.com"
+        await stores[i % 2].issue(email, "123456")
+        try:
+            await stores[(i // 2 + i) % 2].verify(email, "123456")
+            verified += 1
+        except OTPNotFound:
+            pass
+    return verified
+
+
+async def cost(store) -> float:
+    started = time.perf_counter()
+    for i in range(USERS):
+        email = f"cost{i}@example.com"
+        await store.issue(email, "123456")
+        await store.verify(email, "123456")
+    return USERS / (time.perf_counter() - started)
+
+
+async def main():
+    sends = int(sys.argv[1]) if len(sys.argv) > 1 else RATE * 3600
+    clock = [0.0]
+
+    print(f"signup spam: {sends} sends at {RATE}/s ({sends / RATE / 60:.0f} simulated minutes)")
+    old = DictOTPStore()
+    await spam(old, sends, clock)
+    store = InProcessOTPStore(ip_sends=sends, email_sends=sends)
+    store.keys.clock = lambda: clock[0]
+    await spam(store, sends, clock)
+    print(f"  {'dict':<22} {len(old.codes):>9} keys")
+    print(f"  {'in-process store':<22} {len(store.keys):>9} keys  {store.stats()}")
+
+    port = free_port()
+    start_server(PubSubServer(), port)
+    url = f"redis://127.0.0.1:{port}"
+    print(f"\n{'store':<22} {'verified on 2 workers':>22} {'issue+verify/s':>15}")
+    for name, factory in (
+        ("dict", DictOTPStore),
+        ("in-process store", InProcessOTPStore),
+        ("redis (stand-in)", lambda: RedisOTPStore(url)),
+    ):
+        workers = [factory(), factory()]
+        verified = await shared(workers)
+        rate = await cost(workers[0])
+        print(f"{name:<22} {f'{verified}/{USERS}':>22} {rate:>15.0f}")
+        for worker in workers:
+            await worker.close()
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(line_buffering=True)
+    asyncio.run(main())
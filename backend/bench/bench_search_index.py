@@ -0,0 +1,112 @@
+"""
+Benchmark: project search over a synthetic corpus, inverted index vs scan.
+
+Generates ROWS app_projects-shaped rows (title, description,
+detailed_description, tags, tech_stack) from a Zipf-distributed vocabulary,
+loads them into the project SearchIndex and reports build time and memory.
+Then times typical queries (rare term, common term, two terms, a partial
+word as typed, a deep page via cursor) against a linear case-insensitive
+substring scan, which is what the ilike '%q%' filter does.
+
+Run from backend/:
+    python -m bench.bench_search_index [rows]
+"""
+import itertools
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from search.index import SearchIndex, project_index
+
+REPEAT = 20
+WORDS = 20_000
+TECH = ["python", "fastapi", "react", "rust", "go", "postgres", "redis", "docker",
+        "kubernetes", "typescript", "svelte", "django", "flask", "pytorch", "numpy"]
+
+
+def corpus(rows: int):
+    rng = random.Random(3)
+    vocabulary = [f"w{i}" for i in range(WORDS)]
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(WORDS)))
+
+    def words(count):
+        return " ".join(rng.choices(vocabulary, cum_weights=cumulative, k=count))
+
+    for i in range(rows):
+        yield {
+            "id": f"{i:08d}",
+            "title": words(4),
+            "description": words(12),
+            "detailed_description": words(24),
+            "tags": rng.sample(TECH, 2),
+            "tech_stack": rng.sample(TECH, 3),
+        }
+
+
+def build(rows):
+    index = SearchIndex(project_index.fields)
+    tracemalloc.start()
+    started = time.perf_counter()
+    for row in rows:
+        index.add(row)
+    index.finish_load()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, current, elapsed
+
+
+def scan(rows, q: str):
+    """Substring match on every row, like the unbounded ilike '%q%' it replaces"""
+    needles = q.lower().split()
+    hits = []
+    for row in rows:
+        text = " ".join([row["title"], row["description"], row["detailed_description"],
+                         *row["tags"], *row["tech_stack"]]).lower()
+        if all(needle in text for needle in needles):
+            hits.append(row["id"])
+    return hits
+
+
+def timed_ms(fn, repeat=REPEAT):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = list(corpus(count))
+    index, memory, seconds = build(rows)
+    print(f"rows={count} terms={index.stats()['terms']} postings={index.stats()['postings']}")
+    print(f"build {seconds:.1f}s, index memory {memory / 2**20:.0f} MB ({memory / count:.0f} bytes/row)")
+
+    _, cursor = index.search("python", 20)
+    for _ in range(49):
+        _, cursor = index.search("python", 20, cursor)
+
+    queries = [
+        ("rare term", "w15000"),
+        ("mid term", "w300"),
+        ("common term", "python"),
+        ("two terms", "w300 rust"),
+        ("partial word", "w1500"),
+        ("prefix while typing", "w15"),
+    ]
+    print(f"{'query':<22} {'q':<12} {'index ms':>9} {'scan ms':>9}")
+    for name, q in queries:
+        index_ms = timed_ms(lambda: index.search(q, 20))
+        scan_ms = timed_ms(lambda: scan(rows, q), repeat=3)
+        print(f"{name:<22} {q:<12} {index_ms:>9.2f} {scan_ms:>9.2f}")
+    deep_ms = timed_ms(lambda: index.search("python", 20, cursor))
+    print(f"{'page 51 via cursor':<22} {'python':<12} {deep_ms:>9.2f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(line_buffering=True)
+    main()
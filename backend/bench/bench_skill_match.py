@@ -0,0 +1,131 @@
+"""
+Benchmark: skill-match recommendations over a synthetic project catalogue.
+
+Generates PROJECTS projects whose required skills, tech stack and languages
+are drawn from a Zipf-distributed vocabulary of SKILLS skills, loads them
+into a SkillMatrix and reports build time and buffer size. Then times top-10
+recommendations for developer profiles of 3-15 skills with both metrics,
+plus single-project inserts, against a pure-Python loop over per-project
+dicts computing the same scores.
+
+The first answer for each profile is checked against the Python loop, so
+the numbers are for correct answers.
+
+Run from backend/:
+    python -m bench.bench_skill_match [projects] [skills]
+"""
+import itertools
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from recommend.skill_matrix import SkillMatrix, PROJECT_SKILL_WEIGHTS, project_skill_weights
+from recommend.vocabulary import SkillVocabulary
+
+PROFILES = 200
+REPEAT = 5
+TOP = 10
+
+
+def corpus(count: int, names, cumulative):
+    rng = random.Random(22)
+    for i in range(count):
+        row = {"id": f"{i:08d}", "created_by": f"user{rng.randrange(count // 5)}"}
+        for field in PROJECT_SKILL_WEIGHTS:
+            row[field] = rng.choices(names, cum_weights=cumulative, k=rng.randrange(1, 6))
+        yield row
+
+
+def python_top(projects, query, metric, limit=TOP):
+    """Same scores as SkillMatrix.top, one project at a time"""
+    query_total = sum(query.values())
+    query_norm = sum(w * w for w in query.values()) ** 0.5
+    scored = []
+    for key, weights in projects:
+        if metric == "cosine":
+            dot = sum(w * query[s] for s, w in weights.items() if s in query)
+            norm = sum(w * w for w in weights.values()) ** 0.5
+            score = dot / (norm * query_norm) if norm else 0.0
+        else:
+            shared = sum(min(w, query[s]) for s, w in weights.items() if s in query)
+            union = sum(weights.values()) + query_total - shared
+            score = shared / union if union else 0.0
+        if score > 0:
+            scored.append((-score, key))
+    scored.sort()
+    return [key for _, key in scored[:limit]]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    skills = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rng = random.Random(7)
+    names = [f"skill{i}" for i in range(skills)]
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(skills)))
+    rows = list(corpus(count, names, cumulative))
+
+    vocabulary = SkillVocabulary()
+    vocabulary.encode(names)
+    matrix = SkillMatrix(vocabulary)
+    weights = [project_skill_weights(row, vocabulary) for row in rows]
+    started = time.perf_counter()
+    for row, skill_weights in zip(rows, weights):
+        matrix.add(row["id"], skill_weights, True, row["created_by"])
+    matrix.ready = True
+    seconds = time.perf_counter() - started
+    stats = matrix.stats()
+    print(f"projects={count} skills={skills} {stats}")
+    print(f"build {seconds:.1f}s, matrix buffers {stats['buffer_bytes'] / 2**20:.0f} MB")
+
+    projects = [(row["id"], skill_weights) for row, skill_weights in zip(rows, weights)]
+    profiles = [
+        {vocabulary.id(skill): 1.0 for skill in rng.choices(names, cum_weights=cumulative, k=rng.randrange(3, 16))}
+        for _ in range(PROFILES)
+    ]
+
+    print(f"{'top-10 per profile':<24} {'p50 ms':>8} {'p99 ms':>8} {'python ms':>10}  check")
+    for metric in ("jaccard", "cosine"):
+        samples, mismatches = [], 0
+        for profile in profiles:
+            found = [match["id"] for match in matrix.top(profile, TOP, metric)]
+            # float32 weights: near-ties may order differently, so compare scores
+            scores = matrix.scores(profile, metric)
+            expected = python_top(projects, profile, metric)
+            if len(found) != len(expected) or not np.allclose(
+                scores[[matrix.rows[key] for key in found]], scores[[matrix.rows[key] for key in expected]], atol=1e-5
+            ):
+                mismatches += 1
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                matrix.top(profile, TOP, metric)
+                samples.append((time.perf_counter() - started) * 1000)
+        baseline = []
+        for profile in profiles[:10]:
+            started = time.perf_counter()
+            python_top(projects, profile, metric)
+            baseline.append((time.perf_counter() - started) * 1000)
+        p50, p99 = percentiles(samples)
+        check = "ok" if not mismatches else f"{mismatches} MISMATCH"
+        print(f"{metric:<24} {p50:>8.2f} {p99:>8.2f} {statistics.median(baseline):>10.1f}  {check}")
+
+    samples = []
+    for i in range(1000):
+        row = {"id": f"new{i}", **{field: rng.choices(names, k=3) for field in PROJECT_SKILL_WEIGHTS}}
+        started = time.perf_counter()
+        matrix.add(row["id"], project_skill_weights(row, vocabulary), True, "someone")
+        samples.append((time.perf_counter() - started) * 1000)
+    p50, p99 = percentiles(samples)
+    print(f"{'insert one project':<24} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(line_buffering=True)
+    main()
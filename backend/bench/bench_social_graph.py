@@ -0,0 +1,102 @@
+"""
+Benchmark: memory footprint and lookup latency of the follow graph index.
+
+Builds a synthetic follow graph (EDGES edges over USERS users, skewed so a
+few accounts have many followers) and loads it into SocialGraph, measuring
+allocated memory with tracemalloc next to a plain dict-of-sets baseline.
+Then times is_following, mutuals and friend-of-friend suggestions for
+random users.
+
+Run from backend/:
+    python -m bench.bench_social_graph [edges] [users]
+"""
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+
+from social_graph import SocialGraph
+
+SAMPLES = 2000
+
+
+def synthetic_edges(edges: int, users: int):
+    rng = random.Random(7)
+    ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(users)]
+    pairs = set()
+    while len(pairs) < edges:
+        follower = ids[rng.randrange(users)]
+        # Squaring skews followees towards the front: a long tail of popular accounts
+        followee = ids[int(users * rng.random() ** 2)]
+        if follower != followee:
+            pairs.add((follower, followee))
+    return ids, list(pairs)
+
+
+def measure(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def build_index(pairs):
+    graph = SocialGraph()
+    graph.begin_load()
+    graph.load_edges(pairs)
+    graph.finish_load()
+    return graph
+
+
+def build_sets(pairs):
+    following, followers = {}, {}
+    for follower, followee in pairs:
+        following.setdefault(follower, set()).add(followee)
+        followers.setdefault(followee, set()).add(follower)
+    return following, followers
+
+
+def timed_us(fn, args):
+    samples = []
+    for arg in args:
+        started = time.perf_counter()
+        fn(*arg)
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    edges = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    ids, pairs = synthetic_edges(edges, users)
+    print(f"edges={edges} users={users}")
+
+    # The id strings already exist (they come from the database rows), so only
+    # the structures built on top of them are counted.
+    graph, graph_bytes, graph_seconds = measure(lambda: build_index(pairs))
+    _, sets_bytes, sets_seconds = measure(lambda: build_sets(pairs))
+    print(f"{'structure':<24} {'MB':>8} {'bytes/edge':>11} {'build s':>8}")
+    print(f"{'SocialGraph (arrays)':<24} {graph_bytes / 2**20:>8.1f} {graph_bytes / edges:>11.1f} {graph_seconds:>8.2f}")
+    print(f"{'dict of sets':<24} {sets_bytes / 2**20:>8.1f} {sets_bytes / edges:>11.1f} {sets_seconds:>8.2f}")
+
+    rng = random.Random(11)
+    sample_pairs = [rng.choice(pairs) if i % 2 else (rng.choice(ids), rng.choice(ids)) for i in range(SAMPLES)]
+    sample_users = [(rng.choice(ids),) for _ in range(SAMPLES)]
+    print(f"{'query':<24} {'p50 us':>8} {'p99 us':>8}")
+    for name, fn, args in (
+        ("is_following", graph.is_following, sample_pairs),
+        ("mutuals", graph.mutuals, sample_users),
+        ("suggestions (top 10)", graph.suggestions, sample_users),
+    ):
+        p50, p99 = timed_us(fn, args)
+        print(f"{name:<24} {p50:>8.1f} {p99:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: typeahead latency over a synthetic developer directory.
+
+Loads USERS profiles (generated usernames and two-word full names, follower
+counts skewed towards a few popular accounts) into a Typeahead and reports
+build time and memory. Then measures lookup latency:
+
+- cold: every prefix of length 1-4 with the prefix cache cleared first,
+  i.e. the worst case of a binary search plus ranking the whole range;
+- typing: names typed one character at a time by many users, served the
+  way the endpoint serves them (per-prefix cache, parent narrowing).
+
+Run from backend/:
+    python -m bench.bench_typeahead [users]
+"""
+import random
+import statistics
+import string
+import sys
+import time
+import tracemalloc
+
+from search.typeahead import Typeahead
+
+TYPED = 5000
+FIRST = ["alex", "sam", "maria", "wei", "priya", "john", "fatima", "liam", "yuki", "omar",
+         "elena", "ravi", "chen", "sofia", "noah", "aisha", "lucas", "mei", "arjun", "zoe"]
+LAST = ["smith", "garcia", "kumar", "wang", "novak", "silva", "tanaka", "okafor", "muller",
+        "rossi", "khan", "nguyen", "cohen", "ivanova", "patel", "lopez", "kim", "berg"]
+
+
+def synthetic_profiles(users: int):
+    rng = random.Random(5)
+    for i in range(users):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        handle = rng.choice([first, last, first[0] + last]) + "".join(rng.choices(string.ascii_lowercase, k=3))
+        yield {
+            "id": f"{i:08d}",
+            "username": f"{handle}{i % 1000}",
+            "full_name": f"{first.title()} {last.title()}",
+            "followers": int(10 ** (rng.random() ** 3 * 5)),
+        }
+
+
+def build(profiles):
+    typeahead = Typeahead()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for profile in profiles:
+        typeahead.add(profile)
+    for profile in profiles:
+        typeahead.set_followers(profile["id"], profile["followers"])
+    typeahead.finish_load()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return typeahead, current, elapsed
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(len(samples) * 0.99)], samples[-1]
+
+
+def cold(typeahead, prefixes):
+    samples = []
+    for prefix in prefixes:
+        typeahead.cache.clear()
+        started = time.perf_counter()
+        typeahead.lookup(prefix)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def typing(typeahead, names):
+    typeahead.cache.clear()
+    samples = []
+    for name in names:
+        for end in range(1, len(name) + 1):
+            started = time.perf_counter()
+            typeahead.lookup(name[:end])
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    profiles = list(synthetic_profiles(users))
+    typeahead, memory, seconds = build(profiles)
+    print(f"users={users} keys={len(typeahead.keys)}")
+    print(f"build {seconds:.1f}s, memory {memory / 2**20:.0f} MB")
+
+    rng = random.Random(9)
+    alphabet = string.ascii_lowercase
+    print(f"{'lookup':<26} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for length in (1, 2, 3, 4):
+        prefixes = ["".join(rng.choices(alphabet, k=length)) for _ in range(200)]
+        if length == 1:
+            prefixes = list(alphabet)
+        samples = cold(typeahead, prefixes)
+        p50, p99, worst = percentiles(samples)
+        print(f"{f'cold, {length}-char prefix':<26} {len(samples):>7} {p50:>8.3f} {p99:>8.3f} {worst:>8.3f}")
+
+    # Popular names are typed more often, like real traffic
+    names = [rng.choice(profiles[: users // 10] if rng.random() < 0.7 else profiles)["username"]
+             for _ in range(TYPED)]
+    samples = typing(typeahead, names)
+    p50, p99, worst = percentiles(samples)
+    print(f"{'typing, cached':<26} {len(samples):>7} {p50:>8.3f} {p99:>8.3f} {worst:>8.3f}")
+    print(f"cache: {typeahead.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
-from db import get_user_conv, get_last_message, get_user_profile, get_user_stats, check_following_status, follow_user , unfollow_user,create_private_room,get_room_messages
+from db import get_inbox, mark_room_read, get_user_profile, follow_user , unfollow_user,create_private_room,get_room_messages,get_room_messages_page
 from fastapi import FastAPI , Depends , status , HTTPException
 from fastapi.responses import JSONResponse
 from auth.dependencies import get_current_user_id
 from pydantic import BaseModel
+from typing import Optional
+from chat.hot_window import hot_window
+from chat.profile_aggregate import get_profile_aggregate, server_timing
+from social_graph import social_graph
+import asyncio
 
 
 chat_app = FastAPI()
@@ -19,29 +24,20 @@ from fastapi.responses import JSONResponse
 @chat_app.get("/conversations")
 async def get_conversations(user_id: str = Depends(get_current_user_id)):
     """
-    Fetch all 1-1 conversations the authenticated user is part of.
+    Fetch all 1-1 conversations the authenticated user is part of,
+    each with its last message and unread count.
     """
     try:
         print("✅ Fetched userId through auth:", user_id)
-        conversations = await get_user_conv(user_id)  # Expected to return a list of private_rooms
+        # Rooms, last messages and unread counts in a constant number of queries
+        enriched_conversations = await get_inbox(user_id)
 
-        if not conversations:
+        if not enriched_conversations:
             return JSONResponse(
                 status_code=status.HTTP_204_NO_CONTENT,
                 content={"message": "No conversations found."}
             )
 
-        # Fetch last messages for each room
-        enriched_conversations = []
-        for conv in conversations:
-            room_id = conv["room_id"]
-            last_msg = await get_last_message(room_id)
-
-            enriched_conversations.append({
-                **conv,  # All room details
-                "last_message": last_msg  # Might be None if no messages yet
-            })
-
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={"conversations": enriched_conversations}
@@ -90,20 +86,43 @@ async def create_room(
 async def get_messages(
     room_id: str,
     limit: int = 50,
-    offset: int = 0,
+    offset: Optional[int] = None,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     user_id: str = Depends(get_current_user_id)
 ):
     """
-    Get messages for a specific room
+    Get messages for a specific room.
+    Without a cursor returns the newest page; pass next_cursor back as `before`
+    for older messages, or `after` to fetch newer ones. `offset` keeps the
+    legacy oldest-first offset paging.
     """
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either before or after, not both"
+        )
+
     try:
-        messages = await get_room_messages(room_id, limit, offset)
-        
+        if offset is not None:
+            messages = await get_room_messages(room_id, limit, offset)
+            return JSONResponse(
+                status_code=status.HTTP_200_OK,
+                content={"messages": messages or []}
+            )
+
+        page = await get_room_messages_page(room_id, limit, before=before, after=after)
+
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={"messages": messages or []}
+            content=page
         )
     
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         print(f"❌ Error fetching messages: {e}")
         raise HTTPException(
@@ -111,6 +130,107 @@ async def get_messages(
             detail="Internal server error while fetching messages."
         )
 
+@chat_app.post("/rooms/{room_id}/read")
+async def mark_room_read_route(
+    room_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Mark all messages in a room as read for the current user
+    """
+    try:
+        if not await mark_room_read(room_id, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to mark room as read"
+            )
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={"message": "Room marked as read"}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error marking room as read: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error while marking room as read."
+        )
+
+def require_social_graph():
+    if not social_graph.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Social graph is still loading"
+        )
+
+async def _profiles(user_ids: list):
+    # Coalesced into one query by the request's profile loader
+    profiles = await asyncio.gather(*(get_user_profile(user_id) for user_id in user_ids))
+    return [profile for profile in profiles if profile]
+
+@chat_app.get("/users/{user_id}/mutuals")
+async def get_mutual_follows(
+    user_id: str,
+    limit: int = 50,
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Users that user_id follows and who follow them back, from the graph index
+    """
+    require_social_graph()
+    mutual_ids = social_graph.mutuals(user_id)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "mutuals": await _profiles(mutual_ids[:max(1, min(limit, 200))]),
+            "total": len(mutual_ids)
+        }
+    )
+
+@chat_app.get("/suggestions")
+async def get_follow_suggestions(
+    limit: int = 10,
+    current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    People followed by the people you follow, ranked by how many of them do
+    """
+    require_social_graph()
+    ranked = social_graph.suggestions(current_user_id, max(1, min(limit, 50)))
+    profiles = {profile["id"]: profile for profile in await _profiles([item["user_id"] for item in ranked])}
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "suggestions": [
+                {"profile": profiles[item["user_id"]], "mutual_count": item["mutual_count"]}
+                for item in ranked if item["user_id"] in profiles
+            ]
+        }
+    )
+
+@chat_app.get("/social-graph/stats")
+async def social_graph_stats(user_id: str = Depends(get_current_user_id)):
+    """
+    Size and load state of this worker's follow graph index
+    """
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=social_graph.stats()
+    )
+
+@chat_app.get("/hot-window/stats")
+async def hot_window_stats(user_id: str = Depends(get_current_user_id)):
+    """
+    Hit/miss counters and size of this worker's recent-message cache
+    """
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=hot_window.stats()
+    )
+
 @chat_app.get("/profile/{user_id}")
 async def get_profile(
     user_id: str,
@@ -148,31 +268,39 @@ async def get_detailed_profile(
     current_user_id: str = Depends(get_current_user_id)
 ):
     """
-    Get detailed user profile with stats and following status
+    Get detailed user profile with stats and following status.
+    The parts are read concurrently under a deadline; if stats or the
+    following status miss it they come back null with "partial": true.
+    Per-part timings are in the Server-Timing header.
     """
     try:
-        profile = await get_user_profile(user_id)
-        
+        aggregate = await get_profile_aggregate(user_id, current_user_id)
+        headers = {"Server-Timing": server_timing(aggregate["timings"])}
+        profile = aggregate["profile"]
+
         if not profile:
+            if aggregate["timings"]["profile"]["status"] == "timeout":
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="Timed out loading profile",
+                    headers=headers
+                )
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        # Get user stats
-        stats = await get_user_stats(user_id)
-        
-        # Check if current user is following this user
-        is_following = await check_following_status(current_user_id, user_id)
-        
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "profile": profile,
-                "stats": stats,
-                "is_following": is_following,
-                "is_own_profile": current_user_id == user_id
-            }
+                "stats": aggregate["stats"],
+                "is_following": aggregate["is_following"],
+                "is_own_profile": aggregate["is_own_profile"],
+                "partial": aggregate["partial"],
+                "timings": aggregate["timings"]
+            },
+            headers=headers
         )
     
     except HTTPException:
@@ -0,0 +1,263 @@
+"""
+In-memory hot window of the newest messages per room.
+
+Opening a room asks for its newest page of history, and in an active room
+the same few dozen messages are read over and over. Each room seen by this
+worker gets a bounded ring buffer (HOT_WINDOW_SIZE messages) holding a
+contiguous, oldest-first suffix of its history:
+
+- a newest-page miss reads the database and seeds the window with the result
+- save_message, the write-behind writer and broker deliveries from other
+  workers append to windows that are already warm (duplicates are ignored)
+- newest-page requests that fit in the window are served without a query
+- a message the write-behind writer couldn't persist is removed again
+
+Rooms are kept in LRU order and whole windows are evicted once the estimated
+size of all windows exceeds HOT_WINDOW_MAX_BYTES. HOT_WINDOW_SIZE=0 turns the
+cache off.
+
+A window only ever grows by appends it actually sees, so a worker that is not
+subscribed to a room's broadcasts could miss messages saved elsewhere; the
+windows of such rooms are refreshed from the database after HOT_WINDOW_TTL
+seconds.
+"""
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+HOT_WINDOW_SIZE = int(os.getenv("HOT_WINDOW_SIZE", "200"))
+HOT_WINDOW_MAX_BYTES = int(os.getenv("HOT_WINDOW_MAX_BYTES", str(64 * 1024 * 1024)))
+HOT_WINDOW_TTL = float(os.getenv("HOT_WINDOW_TTL", "30"))
+
+
+def message_key(message: dict):
+    return (message.get("created_at") or "", message.get("id") or "")
+
+
+def message_size(message: dict) -> int:
+    """Rough footprint of a cached message: the dict plus its keys and values"""
+    return sys.getsizeof(message) + sum(
+        sys.getsizeof(key) + sys.getsizeof(value) for key, value in message.items()
+    )
+
+
+class RoomWindow:
+    def __init__(self, size: int):
+        self.messages = deque(maxlen=size)
+        self.ids = set()
+        self.bytes = 0
+        # True when the window reaches back to the room's first message
+        self.complete = False
+        self.seeded_at = time.monotonic()
+
+    def append(self, message: dict) -> int:
+        """Insert in (created_at, id) order; returns the change in bytes"""
+        if message.get("id") in self.ids:
+            return 0
+        key = message_key(message)
+        messages = self.messages
+        if messages and len(messages) == messages.maxlen:
+            if key < message_key(messages[0]):
+                # Older than everything kept: outside the window
+                return 0
+            before = self.bytes
+            self._discard_oldest()
+            delta = self.bytes - before
+        else:
+            delta = 0
+
+        # Appends almost always land at the end; walk back for the rare late one
+        position = len(messages)
+        while position and message_key(messages[position - 1]) > key:
+            position -= 1
+        messages.insert(position, message)
+        self.ids.add(message.get("id"))
+        size = message_size(message)
+        self.bytes += size
+        return delta + size
+
+    def remove(self, message_id: str) -> int:
+        """Drop a message by id; returns the change in bytes"""
+        if message_id not in self.ids:
+            return 0
+        for message in self.messages:
+            if message.get("id") == message_id:
+                self.messages.remove(message)
+                self.ids.discard(message_id)
+                size = message_size(message)
+                self.bytes -= size
+                return -size
+        return 0
+
+    def _discard_oldest(self):
+        oldest = self.messages.popleft()
+        self.ids.discard(oldest.get("id"))
+        self.bytes -= message_size(oldest)
+        self.complete = False
+
+
+class HotWindowCache:
+    def __init__(self, size: int = HOT_WINDOW_SIZE, max_bytes: int = HOT_WINDOW_MAX_BYTES,
+                 ttl: float = HOT_WINDOW_TTL):
+        self.size = size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.rooms: "OrderedDict[str, RoomWindow]" = OrderedDict()
+        # Rooms whose broadcasts this worker receives, so their windows stay current
+        self.live_rooms = set()
+        # Rooms with seeding reads in flight -> [reads, written to meanwhile]
+        self.seeding: Dict[str, list] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def _warm(self, room_id: str) -> Optional[RoomWindow]:
+        window = self.rooms.get(room_id)
+        if window is None:
+            return None
+        if room_id not in self.live_rooms and time.monotonic() - window.seeded_at > self.ttl:
+            self._drop(room_id)
+            return None
+        self.rooms.move_to_end(room_id)
+        return window
+
+    def _drop(self, room_id: str):
+        window = self.rooms.pop(room_id, None)
+        if window is not None:
+            self.bytes -= window.bytes
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and len(self.rooms) > 1:
+            room_id = next(iter(self.rooms))
+            self._drop(room_id)
+            self.evictions += 1
+
+    def newest(self, room_id: str, limit: int):
+        """
+        The newest `limit` messages (oldest first) and whether older ones exist,
+        or None when the window can't answer and the database must be read.
+        """
+        if not self.enabled:
+            return None
+        window = self._warm(room_id)
+        if window is None or (len(window.messages) < limit and not window.complete):
+            self.misses += 1
+            return None
+        self.hits += 1
+        messages = list(window.messages)
+        page = messages[-limit:]
+        has_more = len(messages) > limit or not window.complete
+        return page, has_more
+
+    def begin_seed(self, room_id: str):
+        """Called before reading the newest page from the database"""
+        if self.enabled:
+            self.seeding.setdefault(room_id, [0, False])[0] += 1
+
+    def abandon_seed(self, room_id: str) -> bool:
+        """End a seeding read without caching it; True if the room was written to meanwhile"""
+        pending = self.seeding.get(room_id)
+        if pending is None:
+            return False
+        pending[0] -= 1
+        if pending[0] <= 0:
+            del self.seeding[room_id]
+        return pending[1]
+
+    def seed(self, room_id: str, messages: list, complete: bool):
+        """
+        Install the newest page just read from the database (oldest first).
+        `complete` means nothing older exists. A read that raced with a new
+        message is discarded rather than cached with a gap.
+        """
+        if not self.enabled:
+            return
+        written = self.abandon_seed(room_id)
+        if len(messages) > self.size:
+            messages = messages[-self.size:]
+            complete = False
+        window = self._warm(room_id)
+
+        if window is not None:
+            # Already current: only extend it backwards with what the read adds
+            if not window.messages:
+                return
+            first_key = message_key(window.messages[0])
+            if not any(message_key(message) == first_key for message in messages):
+                return
+            older = [message for message in messages if message_key(message) < first_key]
+            room_complete = complete
+            for message in reversed(older):
+                if len(window.messages) == window.messages.maxlen:
+                    room_complete = False
+                    break
+                window.messages.appendleft(message)
+                window.ids.add(message.get("id"))
+                size = message_size(message)
+                window.bytes += size
+                self.bytes += size
+            window.complete = room_complete or (not older and window.complete)
+        else:
+            if written:
+                return
+            window = RoomWindow(self.size)
+            for message in messages:
+                window.append(message)
+            window.complete = complete
+            self.rooms[room_id] = window
+            self.bytes += window.bytes
+        self._evict()
+
+    def append(self, room_id: str, message: dict):
+        """Record a newly saved or delivered message"""
+        if not self.enabled:
+            return
+        window = self._warm(room_id)
+        if window is None:
+            if room_id in self.seeding:
+                self.seeding[room_id][1] = True
+            return
+        self.bytes += window.append(message)
+        self._evict()
+
+    def remove(self, room_id: str, message_id: str):
+        """Forget a message that turned out not to be saved"""
+        window = self.rooms.get(room_id)
+        if window is not None:
+            self.bytes += window.remove(message_id)
+
+    def watch(self, room_id: str):
+        """This worker now receives every broadcast for the room"""
+        self.live_rooms.add(room_id)
+
+    def unwatch(self, room_id: str):
+        self.live_rooms.discard(room_id)
+        window = self.rooms.get(room_id)
+        if window is not None:
+            # Current as of now; the TTL applies from here
+            window.seeded_at = time.monotonic()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "rooms": len(self.rooms),
+            "messages": sum(len(window.messages) for window in self.rooms.values()),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "window_size": self.size,
+        }
+
+
+hot_window = HotWindowCache()
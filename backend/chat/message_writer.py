@@ -0,0 +1,218 @@
+"""
+Write-behind persistence for chat messages.
+
+With CHAT_WRITE_BEHIND=1 the websocket path no longer waits for a
+single-row insert before broadcasting. Messages get a server-generated id
+and timestamp, are broadcast right away, and a background task flushes them
+to `messages` in bulk inserts once CHAT_WRITE_BATCH_SIZE messages are queued
+or CHAT_WRITE_FLUSH_MS has passed since the first one.
+
+Batches that fail for a transient reason (the database is unreachable, a
+deadlock) are retried with backoff until they succeed. Inserts are
+idempotent on the generated id, so a retry after an ambiguous failure never
+duplicates rows. A batch the database rejects (a broken foreign key, e.g. a
+message for a deleted room, or a check constraint) is tried
+CHAT_WRITE_MAX_ATTEMPTS times, then split in half and each half written on
+its own, until the offending messages are isolated; those are logged, set
+aside in `rejected` and taken back out of the hot window, and `on_reject`
+tells the room and the sender, so the rest of the stream keeps flowing. The
+queue is bounded (CHAT_WRITE_QUEUE_SIZE): when the database falls behind,
+submit() waits, which pushes back on the senders.
+
+Every queued message was already acknowledged, so shutdown doesn't drop
+any: drain() flushes the queue, and whatever is still unsaved when its
+timeout runs out is appended to CHAT_WRITE_SPOOL as JSON lines. replay()
+(run at startup) queues the spooled messages again.
+"""
+import asyncio
+import datetime
+import json
+import os
+import uuid
+
+from db import save_messages_bulk
+from storage.query import is_transient_db_error
+from chat.hot_window import hot_window
+
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "0") == "1"
+BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "200"))
+FLUSH_INTERVAL = int(os.getenv("CHAT_WRITE_FLUSH_MS", "50")) / 1000
+QUEUE_SIZE = int(os.getenv("CHAT_WRITE_QUEUE_SIZE", "10000"))
+MAX_ATTEMPTS = int(os.getenv("CHAT_WRITE_MAX_ATTEMPTS", "3"))
+SPOOL_PATH = os.getenv("CHAT_WRITE_SPOOL", "chat_write_spool.jsonl")
+MAX_BACKOFF = 5.0
+MAX_REJECTED = 1000
+
+
+class MessageWriter:
+    def __init__(self, insert_batch=save_messages_bulk, batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, queue_size: int = QUEUE_SIZE,
+                 max_attempts: int = MAX_ATTEMPTS, is_transient=is_transient_db_error,
+                 spool_path: str = SPOOL_PATH, on_reject=None):
+        self.insert_batch = insert_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.is_transient = is_transient
+        self.spool_path = spool_path
+        # `async def on_reject(message, error)`, called once a message is set aside
+        self.on_reject = on_reject
+        self.queue = None
+        self.task = None
+        # Taken off the queue but not yet persisted
+        self.inflight = []
+        self.flushed = 0
+        self.batches = 0
+        self.retries = 0
+        # Most recent messages the database refused, kept for inspection
+        self.rejected = []
+
+    def _ensure_started(self):
+        if self.task is None or self.task.done():
+            if self.queue is None:
+                self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self.task = asyncio.create_task(self._run())
+
+    async def submit(self, room_id: str, sender_id: str, content: str) -> dict:
+        """Assign id/timestamp, queue the message for persistence and return it"""
+        self._ensure_started()
+        message = {
+            "id": str(uuid.uuid4()),
+            "room_id": room_id,
+            "sender_id": sender_id,
+            "content": content,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        # Blocks while the queue is full: backpressure on the sending socket
+        await self.queue.put(message)
+        hot_window.append(room_id, message)
+        return message
+
+    async def _next_batch(self):
+        batch = self.inflight = []
+        batch.append(await self.queue.get())
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # A copy: rejected messages leave self.inflight while the batch is being split
+        return list(batch)
+
+    async def _flush(self, batch):
+        try:
+            await self._persist(batch)
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+    async def _persist(self, batch):
+        backoff = 0.1
+        attempts = 0
+        while True:
+            try:
+                await self.insert_batch(batch)
+                self.flushed += len(batch)
+                self.batches += 1
+                return
+            except Exception as e:
+                error = e
+            if not self.is_transient(error):
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    break
+            self.retries += 1
+            print(f"❌ Failed to persist {len(batch)} messages ({error}), retrying in {backoff:.1f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+        if len(batch) > 1:
+            # Some rows are bad: write each half on its own to narrow them down
+            middle = len(batch) // 2
+            await self._persist(batch[:middle])
+            await self._persist(batch[middle:])
+            return
+        message = batch[0]
+        print(f"❌ Setting aside message {message['id']} in room {message['room_id']}: {error}")
+        self.rejected.append(message)
+        del self.rejected[:-MAX_REJECTED]
+        if message in self.inflight:
+            self.inflight.remove(message)
+        # It was broadcast and cached as sent; take it back
+        hot_window.remove(message["room_id"], message["id"])
+        if self.on_reject:
+            try:
+                await self.on_reject(message, error)
+            except Exception as e:
+                print(f"❌ Error reporting rejected message {message['id']}: {e}")
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            await self._flush(batch)
+            self.inflight = []
+
+    async def drain(self, timeout: float = 30.0):
+        """
+        Flush everything queued so far, up to timeout (used on shutdown).
+        What's left unsaved after that is spooled for replay().
+        """
+        if self.queue is None:
+            return
+        if not self.queue.empty():
+            self._ensure_started()
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+        # Inserts are idempotent, so a batch cut off mid-insert is safe to spool too
+        unsaved, self.inflight = self.inflight, []
+        while not self.queue.empty():
+            unsaved.append(self.queue.get_nowait())
+            self.queue.task_done()
+        if unsaved:
+            self._spool(unsaved)
+        print(f"💾 Message writer drained: {self.flushed} messages in {self.batches} batches "
+              f"({self.retries} retries, {len(self.rejected)} rejected, {len(unsaved)} spooled)")
+
+    def _spool(self, messages):
+        lines = "".join(json.dumps(message) + "\n" for message in messages)
+        try:
+            # One append per worker, so workers sharing the file don't interleave
+            with open(self.spool_path, "a", encoding="utf-8") as spool:
+                spool.write(lines)
+            print(f"💾 Spooled {len(messages)} unsaved messages to {self.spool_path}")
+        except OSError as e:
+            print(f"❌ Message writer lost {len(messages)} unsaved messages: {e}")
+            for message in messages:
+                print(json.dumps(message))
+
+    async def replay(self):
+        """Queue the messages a previous shutdown spooled (used on startup)"""
+        claimed = f"{self.spool_path}.{os.getpid()}"
+        try:
+            # Renamed first, so only one worker replays a given spool
+            os.replace(self.spool_path, claimed)
+        except FileNotFoundError:
+            return
+        with open(claimed, encoding="utf-8") as spool:
+            messages = [json.loads(line) for line in spool if line.strip()]
+        self._ensure_started()
+        for message in messages:
+            await self.queue.put(message)
+        os.remove(claimed)
+        print(f"💾 Replaying {len(messages)} spooled messages")
+
+
+message_writer = MessageWriter()
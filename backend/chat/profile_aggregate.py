@@ -0,0 +1,80 @@
+"""
+Composition of the detailed profile view.
+
+The profile row, the stats counters and the viewer's following status are
+independent reads, so they run concurrently under one per-request deadline
+(PROFILE_DEADLINE_MS). Reads that miss the deadline are cancelled and
+reported as such; the caller gets whatever finished (partial=True) instead
+of waiting for the slowest one. Each part's time and outcome is returned so
+the route can expose it as a Server-Timing header.
+"""
+import asyncio
+import os
+import time
+
+from db import get_user_profile, get_user_stats, check_following_status
+
+PROFILE_DEADLINE_MS = int(os.getenv("PROFILE_DEADLINE_MS", "800"))
+
+
+async def _timed(name: str, coro, timings: dict):
+    started = time.perf_counter()
+    try:
+        result = await coro
+        timings[name] = {"ms": round((time.perf_counter() - started) * 1000, 2), "status": "ok"}
+        return result
+    except asyncio.CancelledError:
+        timings[name] = {"ms": round((time.perf_counter() - started) * 1000, 2), "status": "timeout"}
+        raise
+    except Exception as e:
+        timings[name] = {"ms": round((time.perf_counter() - started) * 1000, 2), "status": "error"}
+        print(f"❌ Error loading {name} for detailed profile: {e}")
+        return None
+
+
+async def get_profile_aggregate(user_id: str, viewer_id: str, deadline_ms: int = PROFILE_DEADLINE_MS) -> dict:
+    """
+    Returns {"profile", "stats", "is_following", "is_own_profile", "partial", "timings"}.
+    Parts that timed out or failed are None and make the result partial.
+    """
+    is_own_profile = viewer_id == user_id
+    parts = {
+        "profile": get_user_profile(user_id),
+        "stats": get_user_stats(user_id),
+    }
+    if not is_own_profile:
+        parts["is_following"] = check_following_status(viewer_id, user_id)
+
+    timings = {}
+    tasks = {
+        name: asyncio.ensure_future(_timed(name, coro, timings))
+        for name, coro in parts.items()
+    }
+    await asyncio.wait(tasks.values(), timeout=deadline_ms / 1000)
+
+    results = {}
+    for name, task in tasks.items():
+        if task.done():
+            results[name] = task.result()
+        else:
+            task.cancel()
+            results[name] = None
+    # Let cancelled parts record their timing before reporting
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    return {
+        "profile": results["profile"],
+        "stats": results["stats"],
+        "is_following": False if is_own_profile else results["is_following"],
+        "is_own_profile": is_own_profile,
+        "partial": any(timing["status"] != "ok" for timing in timings.values()),
+        "timings": timings,
+    }
+
+
+def server_timing(timings: dict) -> str:
+    """Format per-part timings as a Server-Timing header value"""
+    return ", ".join(
+        f'{name};dur={timing["ms"]};desc="{timing["status"]}"'
+        for name, timing in timings.items()
+    )
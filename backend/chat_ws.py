@@ -1,20 +1,31 @@
 from fastapi import WebSocket, WebSocketDisconnect, APIRouter , HTTPException
-from typing import Dict, List
+from typing import Dict, Set
 from jose import jwt, JWTError
 import os
 import json
+import uuid
 import jwt 
-from db import save_message, check_community_membership
+from db import save_message, check_community_membership, user_channel, publish_to_user
+from pubsub.broker import broker
+from pubsub.connection import ClientConnection
+from chat.message_writer import CHAT_WRITE_BEHIND, message_writer
+from chat.hot_window import hot_window
 
 ws_router = APIRouter()
 
-room_connection: Dict[str, List[WebSocket]] = {}
+# Sockets held by this worker; other workers reach them through the broker
+room_connection: Dict[str, Set[ClientConnection]] = {}
+# Multiplexed sockets per user, reached through the user's notification channel
+user_connection: Dict[str, Set[ClientConnection]] = {}
 
 # Replace with your actual values
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET") 
 
 ALGORITHM = "HS256"
 
+# Tags this worker's room publishes; its hot window already holds what it sent
+CHAT_ORIGIN = uuid.uuid4().hex
+
  
 def decode_jwt_token(token: str) -> str:
     try:
@@ -24,6 +35,100 @@ def decode_jwt_token(token: str) -> str:
         print("❌ JWT Decode Error:", e)
         return None
 
+def room_channel(room_id: str) -> str:
+    return f"room:{room_id}"
+
+async def publish_to_room(room_id: str, frame: dict):
+    """Broadcast a frame to the room on every worker, prefixed with this worker's origin"""
+    await broker.publish(room_channel(room_id), f"{CHAT_ORIGIN} {json.dumps(frame, default=str)}")
+
+async def deliver_to_room(channel: str, message: str):
+    """
+    Broker handler: queue a published room message on each local connection.
+    The frame is serialized once by the sender and shared by every recipient;
+    each connection's writer task sends it, so slow clients don't hold up the room.
+    """
+    room_id = channel.split(":", 1)[1]
+    origin, _, frame = message.partition(" ")
+    if origin != CHAT_ORIGIN:
+        # Keeps this worker's hot window current with messages saved on other workers
+        saved = json.loads(frame)
+        if saved.pop("type", None) == "message_rejected":
+            # Sent earlier but never saved: the write-behind writer gave up on it
+            hot_window.remove(room_id, saved["id"])
+        else:
+            hot_window.append(room_id, saved)
+    for client in list(room_connection.get(room_id, ())):
+        client.send(frame)
+
+async def join_room(room_id: str, client: ClientConnection):
+    if room_id not in room_connection:
+        room_connection[room_id] = set()
+        # First local socket for this room: start receiving its broadcasts
+        await broker.subscribe(room_channel(room_id), deliver_to_room)
+        hot_window.watch(room_id)
+    room_connection[room_id].add(client)
+
+async def leave_room(room_id: str, client: ClientConnection):
+    clients = room_connection.get(room_id)
+    if clients is None:
+        return
+    clients.discard(client)
+    if not clients:
+        del room_connection[room_id]
+        hot_window.unwatch(room_id)
+        await broker.unsubscribe(room_channel(room_id), deliver_to_room)
+
+async def deliver_to_user(channel: str, message: str):
+    """Broker handler: push a per-user frame (e.g. a notification) to that user's sockets"""
+    user_id = channel.split(":", 1)[1]
+    for client in list(user_connection.get(user_id, ())):
+        client.send(message)
+
+async def join_user(client: ClientConnection):
+    user_id = client.user_id
+    if user_id not in user_connection:
+        user_connection[user_id] = set()
+        await broker.subscribe(user_channel(user_id), deliver_to_user)
+    user_connection[user_id].add(client)
+
+async def leave_user(client: ClientConnection):
+    user_id = client.user_id
+    clients = user_connection.get(user_id)
+    if clients is None:
+        return
+    clients.discard(client)
+    if not clients:
+        del user_connection[user_id]
+        await broker.unsubscribe(user_channel(user_id), deliver_to_user)
+
+async def send_room_message(room_id: str, user_id: str, content: str) -> bool:
+    """Persist a chat message and broadcast it to the room on every worker"""
+    if CHAT_WRITE_BEHIND:
+        # Persisted in the background; broadcast without waiting for the insert
+        saved = await message_writer.submit(room_id, user_id, content)
+    else:
+        saved = await save_message(room_id, user_id, content)
+
+    if not saved:
+        return False
+
+    # Broadcast to all clients in the room, on every worker; the frame is the
+    # saved row itself, so other workers cache the same shape the database returns
+    await publish_to_room(room_id, {"type": "message", **saved})
+    return True
+
+async def reject_room_message(message: dict, error: Exception):
+    """
+    Message writer hook: the database refused a message that was already
+    broadcast. Room members drop it; the sender is told it wasn't saved.
+    """
+    frame = {"type": "message_rejected", "id": message["id"], "room_id": message["room_id"]}
+    await publish_to_room(message["room_id"], frame)
+    await publish_to_user(message["sender_id"], {**frame, "detail": "Message could not be saved"})
+
+message_writer.on_reject = reject_room_message
+
 @ws_router.websocket("/ws/{room_id}")
 async def websocket_endpoint(websocket: WebSocket, room_id: str):
     token = websocket.query_params.get("token")
@@ -46,10 +151,12 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
         return
     await websocket.accept()
 
-    if room_id not in room_connection:
-        room_connection[room_id] = []
+    async def on_close(connection: ClientConnection):
+        await leave_room(room_id, connection)
 
-    room_connection[room_id].append(websocket)
+    client = ClientConnection(websocket, user_id, on_close=on_close)
+    client.start()
+    await join_room(room_id, client)
     print(f"✅ Client [{user_id}] connected to room {room_id}")
 
     try:
@@ -57,35 +164,112 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
             data = await websocket.receive_text()
             parsed = json.loads(data)
 
-            content = parsed["content"]
-            saved = await save_message(room_id, user_id, content)
-
-            if saved:
-                broadcastData = json.dumps({
-                    "sender_id": user_id,
-                    "content": content,
-                    "room_id": room_id,
-                    "created_at": saved.get("created_at", "now")
-                })
-
-                # Broadcast to all connected clients in the room
-                for client in room_connection[room_id]:
-                    try:
-                        await client.send_text(broadcastData)
-                    except Exception as e:
-                        print(f"❌ Error sending message to client: {e}")
-                        # Remove disconnected client
-                        if client in room_connection[room_id]:
-                            room_connection[room_id].remove(client)
-            else:
+            if not await send_room_message(room_id, user_id, parsed["content"]):
                 print("❌ Error saving message")
 
     except WebSocketDisconnect:
-        if websocket in room_connection[room_id]:
-            room_connection[room_id].remove(websocket)
+        await client.close()
         print(f"❌ Client [{user_id}] disconnected from room {room_id}")
 
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
-        if websocket in room_connection[room_id]:
-            room_connection[room_id].remove(websocket)
+        await client.close()
+
+
+@ws_router.websocket("/ws")
+async def user_websocket_endpoint(websocket: WebSocket):
+    """
+    One multiplexed socket per user for every room, DM and community.
+
+    Client frames:
+        {"type": "subscribe", "room_id": ...}
+        {"type": "unsubscribe", "room_id": ...}
+        {"type": "message", "room_id": ..., "content": ...}
+    Server frames carry a "type" and, for room traffic, the "room_id":
+        "message" (same payload as /ws/{room_id}), "message_rejected" (an
+        earlier "message" that couldn't be saved; also pushed to its sender),
+        "subscribed", "unsubscribed", "error", plus per-user pushes such as
+        "notification".
+    The token is checked once on connect; each subscribe is a cached
+    membership check.
+    """
+    token = websocket.query_params.get("token")
+
+    if not token:
+        await websocket.close(code=1008)
+        return
+
+    user_id = decode_jwt_token(token)
+
+    if not user_id:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+
+    rooms: Set[str] = set()
+
+    async def on_close(connection: ClientConnection):
+        for room_id in list(rooms):
+            await leave_room(room_id, connection)
+        rooms.clear()
+        await leave_user(connection)
+
+    client = ClientConnection(websocket, user_id, on_close=on_close)
+    client.start()
+    await join_user(client)
+    print(f"✅ Client [{user_id}] connected to multiplexed socket")
+
+    def reply(frame_type: str, room_id: str = None, **fields):
+        client.send(json.dumps({"type": frame_type, "room_id": room_id, **fields}))
+
+    try:
+        while True:
+            data = await websocket.receive_text()
+            try:
+                parsed = json.loads(data)
+                frame_type = parsed.get("type")
+                room_id = parsed.get("room_id")
+            except (ValueError, AttributeError):
+                reply("error", detail="Invalid frame")
+                continue
+
+            if not room_id:
+                reply("error", detail="room_id is required")
+
+            elif frame_type == "subscribe":
+                if room_id in rooms:
+                    reply("subscribed", room_id)
+                elif await check_community_membership(room_id, user_id) != "approved":
+                    print(f"❌ User {user_id} not authorized for room {room_id}")
+                    reply("error", room_id, detail="Not authorized for this room")
+                else:
+                    rooms.add(room_id)
+                    await join_room(room_id, client)
+                    reply("subscribed", room_id)
+
+            elif frame_type == "unsubscribe":
+                if room_id in rooms:
+                    rooms.discard(room_id)
+                    await leave_room(room_id, client)
+                reply("unsubscribed", room_id)
+
+            elif frame_type == "message":
+                if room_id not in rooms:
+                    reply("error", room_id, detail="Subscribe to the room before sending")
+                elif not parsed.get("content"):
+                    reply("error", room_id, detail="content is required")
+                elif not await send_room_message(room_id, user_id, parsed["content"]):
+                    print("❌ Error saving message")
+                    reply("error", room_id, detail="Message could not be saved")
+
+            else:
+                reply("error", room_id, detail=f"Unknown frame type {frame_type!r}")
+
+    except WebSocketDisconnect:
+        await client.close()
+        print(f"❌ Client [{user_id}] disconnected from multiplexed socket")
+
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        await client.close()
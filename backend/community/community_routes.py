@@ -16,7 +16,9 @@ from db import (
     check_community_membership,
     get_community_members,
     get_pending_requests,
-    create_join_notification
+    create_join_notification,
+    get_room_messages,
+    get_room_messages_page
 )
 
 community_app = FastAPI()
@@ -366,11 +368,14 @@ async def get_community_details(
 async def get_community_messages(
     community_id: str,
     limit: int = 50,
-    offset: int = 0,
+    offset: Optional[int] = None,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     user_id: str = Depends(get_current_user_id)
 ):
     """
-    Get messages for a community (requires approved membership)
+    Get messages for a community (requires approved membership).
+    Cursor-paged like /chat/rooms/{room_id}/messages; `offset` keeps legacy paging.
     """
     try:
         # Check if user is an approved member
@@ -381,19 +386,36 @@ async def get_community_messages(
                 detail="Must be an approved member to view messages"
             )
 
-        from db import get_room_messages
-        messages = await get_room_messages(community_id, limit, offset)
+        if before and after:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either before or after, not both"
+            )
+
+        if offset is not None:
+            messages = await get_room_messages(community_id, limit, offset)
+            return JSONResponse(
+                status_code=status.HTTP_200_OK,
+                content={"messages": messages or []}
+            )
+
+        page = await get_room_messages_page(community_id, limit, before=before, after=after)
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={"messages": messages or []}
+            content=page
         )
 
     except HTTPException:
         raise
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         print(f"❌ Error fetching community messages: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error while fetching messages."
-        )
\ No newline at end of file
+        )
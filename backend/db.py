@@ -1,27 +1,34 @@
 import os
-from supabase import create_client , Client
-import logging
 import datetime
+import asyncio
+import base64
+import json
+import re
+import uuid
+from storage.query import supabase, run_query
+from loaders import current_loaders
+from chat.hot_window import hot_window
+from ttl_cache import TTLCache, MISSING
+from pubsub.broker import broker
+from social_graph import social_graph
+from search.typeahead import dev_typeahead
+from search.facets import project_facets, parse_filters, ARRAY_FIELDS, FACET_FIELDS
+from recommend.skill_matrix import SkillMatrix, project_matrix, developer_matrix, PROJECT_SKILL_WEIGHTS
+from recommend.skill_matrix import project_skill_weights, profile_skill_weights
+from recommend.vocabulary import normalize as normalize_skill
+from recommend.loader import PROJECT_MATCH_FIELDS, recommendable, add_developer_to_matrix
+from search.loader import SEARCH_INDEXES, index_document
+from social_graph_loader import publish_graph_change
+from notification_counts import get_unread_count, adjust_unread_count
+from pubsub.invalidation import broadcast_invalidation
 
 
-try:
-    url: str = os.environ["SUPABASE_URL"]
-    key: str = os.environ["SUPABASE_KEY"]
-    supabase:Client = create_client(url, key)
-    logging.info("Connected to Supabase" , url, key)
-
-except KeyError:
-    # handle the case where the environment variable is not set
-    print("Error: SUPABASE_URL or SUPABASE_KEY environment variable is not set")
-    # you can also raise a custom exception or exit the program here
-
 async def get_user_conv(user_id: str):
     try:
-        response = (
+        response = await run_query(
             supabase.table("private_room_details")
             .select("*")
             .or_(f"user1_id.eq.{user_id},user2_id.eq.{user_id}")
-            .execute()
         )
 
         conversations = []
@@ -64,13 +71,12 @@ async def get_user_conv(user_id: str):
 
 async def get_last_message(room_id: str):
     try:
-        response = (
+        response = await run_query(
             supabase.table("messages")
             .select("*")
             .eq("room_id", room_id)
             .order("created_at", desc=True)
             .limit(1)
-            .execute()
         )
 
         if response.data:
@@ -82,53 +88,264 @@ async def get_last_message(room_id: str):
         print(f"Error fetching last message: {e}")
         return {"error": str(e)}
 
-async def get_devs(q: str):
+async def get_inbox(user_id: str):
+    """
+    Fetch every conversation of a user with its latest message and unread count.
+    Uses the room_last_message projection (maintained on message insert), so the
+    number of round trips stays constant however many rooms the user has.
+    """
+    try:
+        conversations = await get_user_conv(user_id)
+        if not conversations:
+            return []
+
+        room_ids = [conv["room_id"] for conv in conversations]
+        last_messages, memberships = await asyncio.gather(
+            run_query(
+                supabase.table("room_last_message")
+                .select("*")
+                .in_("room_id", room_ids)
+            ),
+            run_query(
+                supabase.table("room_members")
+                .select("room_id, last_read_count")
+                .eq("user_id", user_id)
+                .in_("room_id", room_ids)
+            ),
+        )
+
+        last_by_room = {row["room_id"]: row for row in last_messages.data or []}
+        read_by_room = {row["room_id"]: row.get("last_read_count") or 0 for row in memberships.data or []}
+
+        inbox = []
+        for conv in conversations:
+            last = last_by_room.get(conv["room_id"])
+            if last:
+                last_message = {
+                    "id": last["message_id"],
+                    "room_id": last["room_id"],
+                    "sender_id": last["sender_id"],
+                    "content": last["content"],
+                    "created_at": last["created_at"],
+                }
+                unread_count = max(0, last["message_count"] - read_by_room.get(conv["room_id"], 0))
+            else:
+                last_message = {"message": "No messages found or error occurred."}
+                unread_count = 0
+
+            inbox.append({
+                **conv,
+                "last_message": last_message,
+                "unread_count": unread_count
+            })
+
+        # Most recently active conversations first
+        inbox.sort(key=lambda conv: conv["last_message"].get("created_at") or "", reverse=True)
+        return inbox
+
+    except Exception as e:
+        print(f"❌ Error fetching inbox: {e}")
+        return []
+
+async def mark_room_read(room_id: str, user_id: str):
+    """Mark every message currently in the room as read for this member"""
     try:
-        response = (
+        last = await run_query(
+            supabase.table("room_last_message")
+            .select("message_count")
+            .eq("room_id", room_id)
+        )
+        message_count = last.data[0]["message_count"] if last.data else 0
+
+        await run_query(
+            supabase.table("room_members")
+            .update({"last_read_count": message_count})
+            .eq("room_id", room_id)
+            .eq("user_id", user_id)
+        )
+        return True
+    except Exception as e:
+        print(f"Error marking room as read: {e}")
+        return False
+
+# /search/devs and /search/projects are served from the in-memory inverted
+# indexes in search/index.py once they have loaded (search/loader.py); until
+# then (or if loading failed) they fall back to an ilike scan with the query
+# escaped.
+def _ilike_any(columns: list, q: str, prefix: bool = False) -> str:
+    """or_() filter matching q literally as a substring (or prefix) of any column"""
+    # LIKE wildcards become literals, then the value is quoted for PostgREST
+    pattern = re.sub(r"([\\%_])", r"\\\1", q.replace("*", ""))
+    quoted = pattern.replace("\\", "\\\\").replace('"', '\\"')
+    leading = "" if prefix else "%"
+    return ",".join(f'{column}.ilike."{leading}{quoted}%"' for column in columns)
+
+async def _search(kind: str, q: str, limit: int, cursor: str):
+    table, index, columns = SEARCH_INDEXES[kind]
+    limit = max(1, min(limit, 100))
+
+    if index.ready:
+        ids, next_cursor = index.search(q, limit, cursor)
+        if not ids:
+            return {"results": [], "next_cursor": None}
+        response = await run_query(supabase.table(table).select(columns).in_("id", ids))
+        rows = {row["id"]: row for row in response.data or []}
+        return {"results": [rows[i] for i in ids if i in rows], "next_cursor": next_cursor}
+
+    fields = columns.replace(" ", "").split(",")[1:]
+    response = await run_query(
+        supabase.table(table)
+        .select(columns)
+        .or_(_ilike_any(fields, q))
+        .limit(limit)
+    )
+    return {"results": response.data, "next_cursor": None}
+
+async def get_dev_suggestions(q: str, limit: int = 10):
+    """
+    Typeahead: developers whose username or a word of their full name starts
+    with q, most followed first, from the in-memory prefix index.
+    """
+    if dev_typeahead.ready:
+        return dev_typeahead.lookup(q, limit)
+    try:
+        response = await run_query(
             supabase.table("profiles")
-            .select("id, full_name, username")  # Only fetch what you need
-            .or_(f"full_name.ilike.%{q}%,username.ilike.%{q}%")  # Case-insensitive filter
-            .execute()
+            .select("id, username, full_name")
+            .or_(_ilike_any(["username", "full_name"], q.strip(), prefix=True))
+            .order("username")
+            .limit(max(1, min(limit, dev_typeahead.top_k)))
         )
-        return response.data
+        return response.data or []
+    except Exception as e:
+        print(f"Error fetching developer suggestions: {e}")
+        return []
+
+async def get_devs(q: str, limit: int = 20, cursor: str = None):
+    """
+    Ranked developer search over username and full_name.
+    Returns {"results", "next_cursor"}; raises ValueError for a bad cursor.
+    """
+    try:
+        return await _search("devs", q, limit, cursor)
+    except ValueError:
+        raise
     except Exception as e:
         print(f"Error fetching developers: {e}")
         return None
 
-async def get_projects_with_members():
+# What the project cards render; member_count is kept by app_projects_feed.sql
+PROJECT_CARD_COLUMNS = (
+    "id, title, description, status, project_type, domain, difficulty_level, "
+    "required_skills, tech_stack, tags, estimated_duration, team_size_min, team_size_max, "
+    "is_remote, is_recruiting, is_public, github_url, image_url, view_count, like_count, "
+    "created_by, created_at, member_count"
+)
+PROJECT_MEMBER_COLUMNS = "id, project_id, user_id, role, status, joined_at, profiles(id, username, full_name, avatar_url)"
+
+async def get_projects_with_members(
+    limit: int = 20,
+    cursor: str = None,
+    status: str = None,
+    is_recruiting: bool = None,
+    is_public: bool = None,
+    member_limit: int = 8,
+    viewer_id: str = None,
+):
+    """
+    Keyset-paginated project cards, newest first on (created_at, id).
+    Each card carries its first `member_limit` members (by joined_at) and the
+    total in member_count; the viewer's own membership is always included so
+    the client can tell which projects it has applied to.
+    Returns {"projects", "next_cursor"}; raises ValueError for a bad cursor.
+    """
+    limit = max(1, min(limit, 50))
+    member_limit = max(0, min(member_limit, 20))
+    position = decode_cursor(cursor) if cursor else None
+
     try:
-        response = (
+        query = (
             supabase.table("app_projects")
-            .select("*, app_project_members(*, profiles(*))")
-            .execute()
+            .select(f"{PROJECT_CARD_COLUMNS}, app_project_members({PROJECT_MEMBER_COLUMNS})")
         )
-        return response.data
+        if status is not None:
+            query = query.eq("status", status)
+        if is_recruiting is not None:
+            query = query.eq("is_recruiting", is_recruiting)
+        if is_public is not None:
+            query = query.eq("is_public", is_public)
+        if position:
+            created_at, row_id = position
+            query = query.lte("created_at", created_at).or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+            )
+        response = await run_query(
+            query
+            .order("created_at", desc=True)
+            .order("id", desc=True)
+            .order("joined_at", foreign_table="app_project_members")
+            .limit(member_limit, foreign_table="app_project_members")
+            .limit(limit + 1)
+        )
+
+        projects = response.data or []
+        has_more = len(projects) > limit
+        projects = projects[:limit]
+
+        if viewer_id and projects:
+            # One indexed lookup for the viewer's rows the member cap may have cut
+            own = await run_query(
+                supabase.table("app_project_members")
+                .select(PROJECT_MEMBER_COLUMNS)
+                .eq("user_id", viewer_id)
+                .in_("project_id", [project["id"] for project in projects])
+            )
+            own_rows = {row["project_id"]: row for row in own.data or []}
+            for project in projects:
+                members = project["app_project_members"]
+                row = own_rows.get(project["id"])
+                if row and not any(member["user_id"] == viewer_id for member in members):
+                    members.append(row)
+
+        return {"projects": projects, "next_cursor": encode_cursor(projects[-1]) if has_more else None}
     except Exception as e:
         print(f"Error fetching projects with members: {e}")
         return None
     
-async def get_projects(q:str):
+async def get_projects(q: str, limit: int = 20, cursor: str = None):
+    """
+    Ranked app project search over title, descriptions, tags and tech stack.
+    Returns {"results", "next_cursor"}; raises ValueError for a bad cursor.
+    """
     try:
-        response = (
-            supabase.table("app_projects")
-            .select("id , title , detailed_description")
-            .or_(f"title.ilike.%{q}%,detailed_description.ilike.%{q}%")
-            .execute()
-        )
-        return response.data
+        return await _search("projects", q, limit, cursor)
+    except ValueError:
+        raise
     except Exception as e:
         print(f"Error fetching projects: {e}")
         return None
     
+async def _batch_profiles(user_ids: list):
+    """Loader batch: one IN query for every profile id requested this tick"""
+    response = await run_query(
+        supabase.table("profiles")
+        .select("*")
+        .in_("id", user_ids)
+    )
+    return {profile["id"]: profile for profile in response.data or []}
+
 async def get_user_profile(user_id: str):
     """Get user profile by ID"""
     try:
-        response = (
+        loaders = current_loaders()
+        if loaders:
+            return await loaders.loader("profiles", _batch_profiles).load(user_id)
+
+        response = await run_query(
             supabase.table("profiles")
             .select("*")
             .eq("id", user_id)
             .single()
-            .execute()
         )
         return response.data
     except Exception as e:
@@ -140,11 +357,10 @@ async def create_private_room(user1_id: str, user2_id: str):
     """Create or get existing private room between two users"""
     try:
         # Check if room already exists
-        existing_room = (
+        existing_room = await run_query(
             supabase.table("private_rooms")
             .select("*, rooms(*)")
             .or_(f"and(user1_id.eq.{user1_id},user2_id.eq.{user2_id}),and(user1_id.eq.{user2_id},user2_id.eq.{user1_id})")
-            .execute()
         )
         
         if existing_room.data:
@@ -158,7 +374,7 @@ async def create_private_room(user1_id: str, user2_id: str):
             "created_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
         
-        room_result = supabase.table("rooms").insert(room_data).execute()
+        room_result = await run_query(supabase.table("rooms").insert(room_data))
         
         if room_result.data:
             room_id = room_result.data[0]["id"]
@@ -170,7 +386,7 @@ async def create_private_room(user1_id: str, user2_id: str):
                 "user2_id": user2_id
             }
             
-            private_result = supabase.table("private_rooms").insert(private_room_data).execute()
+            private_result = await run_query(supabase.table("private_rooms").insert(private_room_data))
             
             # Add both users as room members
             members_data = [
@@ -178,7 +394,7 @@ async def create_private_room(user1_id: str, user2_id: str):
                 {"room_id": room_id, "user_id": user2_id, "role": "member"}
             ]
             
-            supabase.table("room_members").insert(members_data).execute()
+            await run_query(supabase.table("room_members").insert(members_data))
             
             return {
                 **private_result.data[0],
@@ -197,7 +413,7 @@ async def get_room_messages(room_id: str, limit: int = 50, offset: int = 0):
     Returns a list of messages, sorted by creation time.
     """
     try:
-        response = (
+        response = await run_query(
             supabase
             .table("messages")
             .select("*")   
@@ -205,7 +421,6 @@ async def get_room_messages(room_id: str, limit: int = 50, offset: int = 0):
             .order("created_at", desc=False)
             .limit(limit)
             .offset(offset)
-            .execute()
         )
 
         messages = response.data or []
@@ -216,20 +431,103 @@ async def get_room_messages(room_id: str, limit: int = 50, offset: int = 0):
         print(f"❌ Error fetching messages for room {room_id}: {e}")
         return []
 
+CURSOR_ID = re.compile(r"^[A-Za-z0-9-]{1,64}$")
+
+def encode_cursor(row: dict) -> str:
+    """Opaque keyset cursor for a row's (created_at, id) position"""
+    raw = json.dumps([row["created_at"], row["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Return (created_at, id) from a cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        datetime.datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    # Values end up inside a PostgREST filter string, so only accept plain ids
+    if not isinstance(row_id, str) or not CURSOR_ID.match(row_id) or '"' in created_at:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+async def get_room_messages_page(room_id: str, limit: int = 50, before: str = None, after: str = None):
+    """
+    Keyset-paginated message history on (created_at, id).
+    No cursor returns the newest page; `before` pages towards older messages and
+    `after` towards newer ones. Messages are always returned oldest first, with
+    next_cursor continuing in the same direction (None when there is nothing more).
+    Raises ValueError for a malformed cursor.
+    """
+    limit = max(1, min(limit, 200))
+    forward = after is not None
+    cursor = decode_cursor(after if forward else before) if (after or before) else None
+
+    if cursor is None:
+        cached = hot_window.newest(room_id, limit)
+        if cached is not None:
+            rows, has_more = cached
+            print(f"📩 {len(rows)} messages served from hot window for room {room_id}")
+            return {"messages": rows, "next_cursor": encode_cursor(rows[0]) if has_more and rows else None}
+        hot_window.begin_seed(room_id)
+
+    try:
+        query = (
+            supabase
+            .table("messages")
+            .select("*")
+            .eq("room_id", room_id)
+        )
+        if cursor:
+            created_at, row_id = cursor
+            op = "gt" if forward else "lt"
+            # The plain bound lets the planner seek the (room_id, created_at, id)
+            # index; the or_ breaks ties on id within the same timestamp.
+            query = (query.gte if forward else query.lte)("created_at", created_at).or_(
+                f'created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}.{row_id})'
+            )
+        response = await run_query(
+            query
+            .order("created_at", desc=not forward)
+            .order("id", desc=not forward)
+            .limit(limit + 1)
+        )
+
+        rows = response.data or []
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]) if has_more else None
+        if not forward:
+            rows.reverse()
+        if cursor is None:
+            hot_window.seed(room_id, rows, complete=not has_more)
+
+        print(f"📩 {len(rows)} messages fetched for room {room_id}")
+        return {"messages": rows, "next_cursor": next_cursor}
+
+    except Exception as e:
+        print(f"❌ Error fetching messages for room {room_id}: {e}")
+        if cursor is None:
+            hot_window.abandon_seed(room_id)
+        return {"messages": [], "next_cursor": None}
+
 
 async def follow_user(follower_id: str, following_id: str):
     """Follow a user"""
     try:
         # Check if already following
-        existing = (
-            supabase.table("user_connections")
-            .select("*")
-            .eq("follower_id", follower_id)
-            .eq("following_id", following_id)
-            .execute()
-        )
+        if social_graph.ready:
+            already_following = social_graph.is_following(follower_id, following_id)
+        else:
+            existing = await run_query(
+                supabase.table("user_connections")
+                .select("id")
+                .eq("follower_id", follower_id)
+                .eq("following_id", following_id)
+            )
+            already_following = bool(existing.data)
         
-        if existing.data:
+        if already_following:
             return {"success": False, "message": "Already following"}
         
         connection_data = {
@@ -237,8 +535,13 @@ async def follow_user(follower_id: str, following_id: str):
             "following_id": following_id
         }
         
-        result = supabase.table("user_connections").insert(connection_data).execute()
-        return {"success": True, "data": result.data[0]} if result.data else {"success": False}
+        result = await run_query(supabase.table("user_connections").insert(connection_data))
+        if not result.data:
+            return {"success": False}
+        _adjust_profile_stats(follower_id, "following", 1)
+        _adjust_profile_stats(following_id, "followers", 1)
+        await publish_graph_change("follow", follower_id, following_id)
+        return {"success": True, "data": result.data[0]}
     except Exception as e:
         print(f"Error following user: {e}")
         return {"success": False, "message": str(e)}
@@ -246,13 +549,16 @@ async def follow_user(follower_id: str, following_id: str):
 async def unfollow_user(follower_id: str, following_id: str):
     """Unfollow a user"""
     try:
-        response = (
+        response = await run_query(
             supabase.table("user_connections")
             .delete()
             .eq("follower_id", follower_id)
             .eq("following_id", following_id)
-            .execute()
         )
+        if response.data:
+            _adjust_profile_stats(follower_id, "following", -1)
+            _adjust_profile_stats(following_id, "followers", -1)
+            await publish_graph_change("unfollow", follower_id, following_id)
         return {"success": True}
     except Exception as e:
         print(f"Error unfollowing user: {e}")
@@ -260,51 +566,54 @@ async def unfollow_user(follower_id: str, following_id: str):
 
 async def check_following_status(follower_id: str, following_id: str):
     """Check if user is following another user"""
+    if social_graph.ready:
+        return social_graph.is_following(follower_id, following_id)
     try:
-        response = (
+        response = await run_query(
             supabase.table("user_connections")
             .select("*")
             .eq("follower_id", follower_id)
             .eq("following_id", following_id)
-            .execute()
         )
         return len(response.data) > 0
     except Exception as e:
         print(f"Error checking following status: {e}")
         return False
 
+# Follower/following/project counts from the trigger-maintained profile_stats
+# table, cached in-process and adjusted in place by follow/unfollow here.
+# Changes made on other workers or outside the API show up after
+# PROFILE_STATS_CACHE_TTL seconds.
+PROFILE_STATS_CACHE_TTL = float(os.getenv("PROFILE_STATS_CACHE_TTL", "60"))
+profile_stats_cache = TTLCache(PROFILE_STATS_CACHE_TTL)
+
+def _adjust_profile_stats(user_id: str, field: str, delta: int):
+    cached = profile_stats_cache.get(user_id)
+    if cached is not MISSING:
+        profile_stats_cache.set(user_id, {**cached, field: max(cached[field] + delta, 0)})
+
 async def get_user_stats(user_id: str):
     """Get user statistics (followers, following, projects)"""
+    cached = profile_stats_cache.get(user_id)
+    if cached is not MISSING:
+        return dict(cached)
+    generation = profile_stats_cache.generation
+
     try:
-        # Get followers count
-        followers = (
-            supabase.table("user_connections")
-            .select("*", count="exact")
-            .eq("following_id", user_id)
-            .execute()
-        )
-        
-        # Get following count
-        following = (
-            supabase.table("user_connections")
-            .select("*", count="exact")
-            .eq("follower_id", user_id)
-            .execute()
-        )
-        
-        # Get projects count
-        projects = (
-            supabase.table("projects")
-            .select("*", count="exact")
-            .eq("profile_id", user_id)
-            .execute()
+        response = await run_query(
+            supabase.table("profile_stats")
+            .select("followers, following, projects")
+            .eq("user_id", user_id)
+            .limit(1)
         )
-        
-        return {
-            "followers": followers.count or 0,
-            "following": following.count or 0,
-            "projects": projects.count or 0
+        row = response.data[0] if response.data else {}
+        stats = {
+            "followers": row.get("followers") or 0,
+            "following": row.get("following") or 0,
+            "projects": row.get("projects") or 0
         }
+        profile_stats_cache.set(user_id, stats, generation=generation)
+        return dict(stats)
     except Exception as e:
         print(f"Error fetching user stats: {e}")
         return {"followers": 0, "following": 0, "projects": 0}
@@ -321,10 +630,11 @@ async def save_message(room_id: str, sender_id: str, content: str):
             "content": content
         }
         
-        result = supabase.table("messages").insert(message_data).execute()
+        result = await run_query(supabase.table("messages").insert(message_data))
         
         if result.data:
             print(f"✅ Message saved successfully: {result.data[0]}")
+            hot_window.append(room_id, result.data[0])
             return result.data[0]
         else:
             print("❌ No data returned from message insert")
@@ -333,22 +643,267 @@ async def save_message(room_id: str, sender_id: str, content: str):
     except Exception as e:
         print(f"❌ Error saving message: {e}")
         return None
+
+async def save_messages_bulk(messages: list):
+    """
+    Insert a batch of messages that already carry their id and created_at.
+    Idempotent on id, so a retried batch never duplicates rows. Raises the
+    query's error on failure; the message writer decides whether to retry.
+    """
+    await run_query(
+        supabase.table("messages")
+        .upsert(messages, on_conflict="id", ignore_duplicates=True, returning="minimal")
+    )
     
 # async def get_projects():
 
 # Insert a new project into app_projects
-def insert_app_project(project_data: dict):
+async def discover_projects(
+    filters: list,
+    limit: int = 20,
+    cursor: str = None,
+    facets: list = None,
+    facet_limit: int = 10,
+):
+    """
+    Project cards matching facet filters (`field:a|b`, ORed within a filter,
+    ANDed across filters), newest first, with counts of the top values of
+    each facet. Served from the in-memory discovery index; until it has
+    loaded, the filters run in the database and no counts are returned.
+    Returns {"projects", "total", "facets", "next_cursor"}; raises ValueError
+    for a bad filter or cursor.
+    """
+    clauses = parse_filters(filters)
+    unknown = [field for field in facets or [] if field not in FACET_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown facet {unknown[0]!r}")
+    position = decode_cursor(cursor) if cursor else None
+    limit = max(1, min(limit, 50))
+
+    try:
+        if project_facets.ready:
+            found = project_facets.query(clauses, limit, position, facets, max(1, min(facet_limit, 50)))
+            rows = {}
+            if found["ids"]:
+                response = await run_query(
+                    supabase.table("app_projects").select(PROJECT_CARD_COLUMNS).in_("id", found["ids"])
+                )
+                rows = {row["id"]: row for row in response.data or []}
+            projects = [rows[i] for i in found["ids"] if i in rows]
+            last = found["ids"][-1] if found["ids"] else None
+            next_cursor = None
+            if found["has_more"]:
+                created_at = project_facets.created_at[project_facets.doc_numbers[last]]
+                next_cursor = encode_cursor({"created_at": created_at, "id": last})
+            return {"projects": projects, "total": found["total"], "facets": found["facets"], "next_cursor": next_cursor}
+
+        query = supabase.table("app_projects").select(PROJECT_CARD_COLUMNS)
+        for field, values in clauses:
+            if field in ARRAY_FIELDS:
+                query = query.overlaps(field, values)
+            elif field == "is_remote":
+                query = query.in_(field, [value.lower() == "true" for value in values])
+            else:
+                query = query.in_(field, values)
+        if position:
+            created_at, row_id = position
+            query = query.lte("created_at", created_at).or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+            )
+        response = await run_query(
+            query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1)
+        )
+        projects = response.data or []
+        has_more = len(projects) > limit
+        projects = projects[:limit]
+        return {
+            "projects": projects,
+            "total": None,
+            "facets": {},
+            "next_cursor": encode_cursor(projects[-1]) if has_more else None,
+        }
+    except Exception as e:
+        print(f"Error discovering projects: {e}")
+        return None
+
+# Rows scored by the throwaway matrix while the real one is loading (recommend/loader.py)
+RECOMMEND_FALLBACK_ROWS = 500
+
+async def _match(matrix: SkillMatrix, table: str, columns: str, skill_field: str, skills: list, add_row):
+    """
+    The loaded matrix, or until it is ready a throwaway one over the rows
+    whose skill_field shares a skill with the query, as typed or normalized.
+    """
+    if matrix.ready:
+        return matrix
+    spellings = list(dict.fromkeys([*map(str, skills), *filter(None, map(normalize_skill, skills))]))
+    response = await run_query(
+        supabase.table(table).select(columns).overlaps(skill_field, spellings).limit(RECOMMEND_FALLBACK_ROWS)
+    )
+    fallback = SkillMatrix()
+    for row in response.data or []:
+        add_row(fallback, row)
+    return fallback
+
+async def get_recommended_projects(user_id: str, limit: int = 10, metric: str = "jaccard"):
+    """
+    Open projects whose required skills, stack and languages best match the
+    user's profile skills, best first. Projects the user created or has
+    joined are left out.
+    Returns {"results": [project card + "score", "matched"]}.
+    """
+    try:
+        profile = await run_query(supabase.table("profiles").select("id, skills").eq("id", user_id))
+        skills = (profile.data[0].get("skills") if profile.data else None) or []
+        if not skills:
+            return {"results": []}
+        # The profile was just read, so score with its current skills
+        add_developer_to_matrix({"id": user_id, "skills": skills})
+        memberships = await run_query(
+            supabase.table("app_project_members").select("project_id").eq("user_id", user_id)
+        )
+
+        matrix = await _match(
+            project_matrix, "app_projects", ", ".join(["id", *PROJECT_MATCH_FIELDS]), "required_skills", skills,
+            lambda fallback, row: fallback.add(
+                row["id"], project_skill_weights(row), recommendable(row), row.get("created_by")
+            ),
+        )
+        matches = matrix.top(
+            profile_skill_weights(skills), limit, metric,
+            exclude_owner=user_id, exclude=[row["project_id"] for row in memberships.data or []],
+        )
+        if not matches:
+            return {"results": []}
+        response = await run_query(
+            supabase.table("app_projects").select(PROJECT_CARD_COLUMNS).in_("id", [m["id"] for m in matches])
+        )
+        rows = {row["id"]: row for row in response.data or []}
+        return {"results": [{**rows[m["id"]], "score": m["score"], "matched": m["matched"]}
+                            for m in matches if m["id"] in rows]}
+    except Exception as e:
+        print(f"Error recommending projects: {e}")
+        return None
+
+async def get_recommended_developers(project_id: str, limit: int = 10, metric: str = "jaccard"):
+    """
+    Developers whose profile skills best fit the project, best first. The
+    creator and existing members are left out.
+    Returns {"results": [profile + "score", "matched"]}; raises LookupError
+    for an unknown project.
+    """
+    project = await run_query(
+        supabase.table("app_projects").select(", ".join(["id", *PROJECT_MATCH_FIELDS])).eq("id", project_id)
+    )
+    if not project.data:
+        raise LookupError("Project not found")
+    project = project.data[0]
+    try:
+        query = project_skill_weights(project)
+        if not query:
+            return {"results": []}
+        members = await run_query(
+            supabase.table("app_project_members").select("user_id").eq("project_id", project_id)
+        )
+        skills = list(dict.fromkeys(
+            skill for field in PROJECT_SKILL_WEIGHTS for skill in project.get(field) or []
+        ))
+
+        matrix = await _match(
+            developer_matrix, "profiles", "id, skills", "skills", skills,
+            lambda fallback, row: fallback.add(row["id"], profile_skill_weights(row.get("skills"))),
+        )
+        exclude = [row["user_id"] for row in members.data or []]
+        if project.get("created_by"):
+            exclude.append(project["created_by"])
+        matches = matrix.top(query, limit, metric, exclude=exclude)
+        if not matches:
+            return {"results": []}
+        response = await run_query(
+            supabase.table("profiles")
+            .select("id, username, full_name, avatar_url, skills")
+            .in_("id", [m["id"] for m in matches])
+        )
+        rows = {row["id"]: row for row in response.data or []}
+        return {"results": [{**rows[m["id"]], "score": m["score"], "matched": m["matched"]}
+                            for m in matches if m["id"] in rows]}
+    except Exception as e:
+        print(f"Error recommending developers: {e}")
+        return None
+
+# Resume uploads parsed in the background (resume/ingest.py); see resume_jobs.sql
+RESUME_JOB_COLUMNS = "id, status, filename, skills, added_skills, error, created_at, finished_at"
+
+async def create_resume_job(user_id: str, filename: str):
+    try:
+        response = await run_query(
+            supabase.table("resume_jobs").insert({
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "filename": filename,
+                "status": "queued",
+            })
+        )
+        return {key: response.data[0].get(key) for key in RESUME_JOB_COLUMNS.split(", ")} if response.data else None
+    except Exception as e:
+        print(f"❌ Error creating resume job: {e}")
+        return None
+
+async def update_resume_job(job_id: str, fields: dict) -> bool:
+    try:
+        await run_query(supabase.table("resume_jobs").update(fields).eq("id", job_id))
+        return True
+    except Exception as e:
+        print(f"❌ Error updating resume job {job_id}: {e}")
+        return False
+
+async def get_resume_job(job_id: str, user_id: str):
+    """The user's own job, or None"""
     try:
-        response = supabase.table("app_projects").insert(project_data).execute()
+        response = await run_query(
+            supabase.table("resume_jobs").select(RESUME_JOB_COLUMNS).eq("id", job_id).eq("user_id", user_id)
+        )
         return response.data[0] if response.data else None
+    except Exception as e:
+        print(f"Error fetching resume job: {e}")
+        return None
+
+async def add_profile_skills(user_id: str, skills: list):
+    """
+    Append the skills the profile doesn't list yet (compared normalized, so
+    "ReactJS" doesn't duplicate "React") and return them; None on failure.
+    """
+    try:
+        profile = await run_query(supabase.table("profiles").select("id, skills").eq("id", user_id))
+        if not profile.data:
+            return None
+        current = profile.data[0].get("skills") or []
+        known = {normalize_skill(skill) for skill in current}
+        added = [skill for skill in dict.fromkeys(skills) if normalize_skill(skill) not in known]
+        if added:
+            merged = [*current, *added]
+            await run_query(supabase.table("profiles").update({"skills": merged}).eq("id", user_id))
+            add_developer_to_matrix({"id": user_id, "skills": merged})
+        return added
+    except Exception as e:
+        print(f"❌ Error adding skills to profile {user_id}: {e}")
+        return None
+
+async def insert_app_project(project_data: dict):
+    try:
+        response = await run_query(supabase.table("app_projects").insert(project_data))
+        if not response.data:
+            return None
+        await index_document("projects", response.data[0])
+        return response.data[0]
     except Exception as e:
         print(f"Error inserting project: {e}")
         return None
 
 # Insert a new member into app_project_members
-def insert_app_project_member(member_data: dict):
+async def insert_app_project_member(member_data: dict):
     try:
-        response = supabase.table("app_project_members").insert(member_data).execute()
+        response = await run_query(supabase.table("app_project_members").insert(member_data))
         return response.data[0] if response.data else None
     except Exception as e:
         print(f"Error inserting project member: {e}")
@@ -356,40 +911,71 @@ def insert_app_project_member(member_data: dict):
 
 async def get_notifications(user_id: str):
     try:
-        notif = (supabase.table("notification_with_sender")
+        notif = await run_query(supabase.table("notification_with_sender")
                .select("*")
                .eq("recipient_id", user_id)
                .order("created_at", desc=True)
-               .limit(20)
-               .execute())
-        
-        unread = (supabase.table("notifications")
-                .select("count", count="exact")
-                .eq("recipient_id", user_id)
-                .eq("is_read", False)
-                .execute())
+               .order("id", desc=True)
+               .limit(20))
         
         return {
             "notifications": notif.data,
-            "unread_count": unread.count or 0
+            "unread_count": await get_unread_count(user_id),
+            # Pass back to mark-all-read?up_to= to clear exactly what was shown
+            "cursor": encode_cursor(notif.data[0]) if notif.data else None
         }
     except Exception as e:
         print(f"Error fetching notifications: {e}")
         return {"notifications": [], "unread_count": 0}
     
     
+def user_channel(user_id: str) -> str:
+    """Broker channel for pushes to one user's live connections (sockets and SSE streams)"""
+    return f"user:{user_id}"
+
+async def publish_to_user(user_id: str, frame: dict):
+    try:
+        await broker.publish(user_channel(user_id), json.dumps(frame, default=str))
+    except Exception as e:
+        print(f"❌ Error publishing to user {user_id}: {e}")
+
+async def create_notification(notification_data: dict):
+    """
+    Insert a notification and push it to the recipient's live connections,
+    shaped like a notification_with_sender row, with their new unread count.
+    """
+    response = await run_query(supabase.table("notifications").insert(notification_data))
+    if not response.data:
+        return None
+    notification = response.data[0]
+    if not notification.get("is_read"):
+        await adjust_unread_count(notification["recipient_id"], 1)
+
+    # The notification is stored; a failed push must not turn that into an error for the caller
+    try:
+        sender = await get_user_profile(notification["sender_id"]) if notification.get("sender_id") else None
+        await publish_to_user(notification["recipient_id"], {
+            "type": "notification",
+            "notification": {
+                **notification,
+                "sender": {key: sender.get(key) for key in ("id", "full_name", "username", "avatar_url")} if sender else None,
+            },
+            "unread_count": await get_unread_count(notification["recipient_id"]),
+        })
+    except Exception as e:
+        print(f"❌ Error pushing notification {notification.get('id')} to user {notification['recipient_id']}: {e}")
+    return notification
+
 async def get_unread_notifications(user_id: str):
     """
     Get all unread notifications for a specific user
     Returns: List of notification dictionaries or empty list on error
     """
     try:
-        res = (supabase.table("notifications")
+        res = await run_query(supabase.table("notifications")
                .select("*")
                .eq("recipient_id", user_id)
-               .eq("is_read", False)
-               .execute()
-              )
+               .eq("is_read", False))
         return res.data
     except Exception as e:
         print(f"Error fetching unread notifications: {e}")
@@ -397,28 +983,51 @@ async def get_unread_notifications(user_id: str):
 
 async def Update_notif(notif_id:str):
     try:
-        res = (supabase.table("notifications")
+        res = await run_query(supabase.table("notifications")
                .update({
                    "is_read":True,
                    "read_at":datetime.datetime.now().isoformat()
                })
-               .eq("id",notif_id)
-               .execute()
-               )
+               .eq("id",notif_id))
         
         return res.data
     except Exception as e:
         print(f"Error fetching notifications: {e}")
         return []   
     
+async def mark_notifications_read(user_id: str, up_to: str = None) -> int:
+    """
+    Mark the user's unread notifications read in one set-based update and
+    return how many changed. With `up_to` (the cursor from get_notifications)
+    only notifications at or before it are marked, so ones that arrived after
+    the client last looked stay unread. Raises ValueError for a malformed cursor.
+    """
+    query = (
+        supabase.table("notifications")
+        .update({"is_read": True, "read_at": datetime.datetime.now().isoformat()},
+                count="exact", returning="minimal")
+        .eq("recipient_id", user_id)
+        .eq("is_read", False)
+    )
+    if up_to:
+        created_at, row_id = decode_cursor(up_to)
+        query = query.lte("created_at", created_at).or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lte.{row_id})'
+        )
+    response = await run_query(query)
+    updated = response.count or 0
+    if up_to:
+        await adjust_unread_count(user_id, -updated)
+    else:
+        await adjust_unread_count(user_id, value=0)
+    return updated
+
 async def get_communities(user_id: str):
     try:
-        response = (supabase.table("rooms")
+        response = await run_query(supabase.table("rooms")
                     .select("*")
                     .eq("type",  "group")
-                    .neq("created_by", user_id)
-                    .execute()
-                    )
+                    .neq("created_by", user_id))
         if response.data:
             return response.data
         else:
@@ -429,12 +1038,10 @@ async def get_communities(user_id: str):
     
 async def get_comminities_by_userid(userId : str):
     try:
-        response = ( supabase.table("rooms")
+        response = await run_query(supabase.table("rooms")
                     .select("*")
                     .eq("type", "group")
-                    .eq("created_by", userId)
-                    .execute()
-                    )
+                    .eq("created_by", userId))
         if response.data:
             return response.data
         else:
@@ -453,12 +1060,11 @@ async def get_joined_communities(user_id: str):
     """
     try:
         # First get all room IDs the user is an approved member of
-        member_response = (
+        member_response = await run_query(
             supabase.table("room_members")
             .select("room_id")
             .eq("user_id", user_id)
             .eq("request_status", True)
-            .execute()
         )
         
         if not member_response.data:
@@ -467,12 +1073,11 @@ async def get_joined_communities(user_id: str):
         room_ids = [member["room_id"] for member in member_response.data]
         
         # Then fetch full details of those rooms
-        rooms_response = (
+        rooms_response = await run_query(
             supabase.table("rooms")
             .select("*")
             .eq("type", "group")
             .in_("id", room_ids)
-            .execute()
         )
         
         return rooms_response.data
@@ -483,7 +1088,7 @@ async def get_joined_communities(user_id: str):
     
 async def add_community(room: dict):
     try:
-        response = supabase.table("rooms").insert({"name":room['name'] , "type": "group" , "description":room['description'] , "created_by":room['created_by']}).execute()
+        response = await run_query(supabase.table("rooms").insert({"name":room['name'] , "type": "group" , "description":room['description'] , "created_by":room['created_by']}))
         
         member_data = {
             "room_id":response.data[0]['id'],
@@ -491,7 +1096,8 @@ async def add_community(room: dict):
             "role":"admin",
             "request_status": True
         }
-        supabase.table("room_members").insert(member_data).execute()
+        await run_query(supabase.table("room_members").insert(member_data))
+        await _forget_membership(member_data["room_id"], member_data["user_id"])
         
         return response.data[0]
     except Exception as e:
@@ -510,7 +1116,8 @@ async def request_join_community(community_id: str, user_id: str):
             "request_status": False
         }
         
-        response = supabase.table("room_members").insert(member_data).execute()
+        response = await run_query(supabase.table("room_members").insert(member_data))
+        await _forget_membership(community_id, user_id)
         return response.data[0] if response.data else None
         
     except Exception as e:
@@ -523,13 +1130,12 @@ async def approve_join_request(request_id: str, admin_user_id: str):
     """
     try:
         # First get the request details
-        request_response = (
+        request_response = await run_query(
             supabase.table("room_members")
             .select("*, rooms(*)")
             .eq("id", request_id)
             .eq("request_status", False)
             .single()
-            .execute()
         )
         
         if not request_response.data:
@@ -542,12 +1148,12 @@ async def approve_join_request(request_id: str, admin_user_id: str):
             return {"success": False, "message": "Only community admin can approve requests"}
         
         # Approve the request
-        update_response = (
+        update_response = await run_query(
             supabase.table("room_members")
             .update({"request_status": True})
             .eq("id", request_id)
-            .execute()
         )
+        await _forget_membership(request_data["room_id"], request_data["user_id"])
         
         # Create approval notification
         notification_data = {
@@ -557,7 +1163,7 @@ async def approve_join_request(request_id: str, admin_user_id: str):
             "reference_id": request_data["room_id"],
             "message": f"Your request to join {request_data['rooms']['name']} has been approved!"
         }
-        supabase.table("notifications").insert(notification_data).execute()
+        await create_notification(notification_data)
         
         return {"success": True}
         
@@ -571,13 +1177,12 @@ async def reject_join_request(request_id: str, admin_user_id: str):
     """
     try:
         # First get the request details
-        request_response = (
+        request_response = await run_query(
             supabase.table("room_members")
             .select("*, rooms(*)")
             .eq("id", request_id)
             .eq("request_status", False)
             .single()
-            .execute()
         )
         
         if not request_response.data:
@@ -590,7 +1195,8 @@ async def reject_join_request(request_id: str, admin_user_id: str):
             return {"success": False, "message": "Only community admin can reject requests"}
         
         # Delete the request
-        supabase.table("room_members").delete().eq("id", request_id).execute()
+        await run_query(supabase.table("room_members").delete().eq("id", request_id))
+        await _forget_membership(request_data["room_id"], request_data["user_id"])
         
         # Create rejection notification
         notification_data = {
@@ -600,7 +1206,7 @@ async def reject_join_request(request_id: str, admin_user_id: str):
             "reference_id": request_data["room_id"],
             "message": f"Your request to join {request_data['rooms']['name']} has been rejected."
         }
-        supabase.table("notifications").insert(notification_data).execute()
+        await create_notification(notification_data)
         
         return {"success": True}
         
@@ -613,12 +1219,11 @@ async def get_pending_requests(community_id: str):
     Get all pending join requests for a community
     """
     try:
-        response = (
+        response = await run_query(
             supabase.table("room_members")
             .select("*, profiles(*)")
             .eq("room_id", community_id)
             .eq("request_status", False)
-            .execute()
         )
         return response.data
         
@@ -635,18 +1240,12 @@ async def create_join_notification(admin_id: str, requester_id: str, community_i
         community = await get_community_by_id(community_id)
         community_name = community["name"] if community else "Unknown Community"
         
-        # Get requester profile
-        requester_response = (
-            supabase.table("profiles")
-            .select("full_name, username")
-            .eq("id", requester_id)
-            .single()
-            .execute()
-        )
+        # Get requester profile (shares the request's profile loader)
+        requester = await get_user_profile(requester_id)
         
         requester_name = "Unknown User"
-        if requester_response.data:
-            requester_name = requester_response.data.get("full_name") or requester_response.data.get("username") or "Unknown User"
+        if requester:
+            requester_name = requester.get("full_name") or requester.get("username") or "Unknown User"
         
         notification_data = {
             "recipient_id": admin_id,
@@ -656,7 +1255,7 @@ async def create_join_notification(admin_id: str, requester_id: str, community_i
             "message": f"{requester_name} wants to join {community_name}"
         }
         
-        supabase.table("notifications").insert(notification_data).execute()
+        await create_notification(notification_data)
         return True
         
     except Exception as e:
@@ -668,31 +1267,44 @@ async def leave_community(community_id: str, user_id: str):
     Remove user from community
     """
     try:
-        response = (
+        response = await run_query(
             supabase.table("room_members")
             .delete()
             .eq("room_id", community_id)
             .eq("user_id", user_id)
-            .execute()
         )
+        await _forget_membership(community_id, user_id)
         return True
         
     except Exception as e:
         print(f"Error leaving community: {e}")
         return False
 
+async def _batch_communities(community_ids: list):
+    """Loader batch: one IN query for every community id requested this tick"""
+    response = await run_query(
+        supabase.table("rooms")
+        .select("*")
+        .in_("id", community_ids)
+        .eq("type", "group")
+    )
+    return {room["id"]: room for room in response.data or []}
+
 async def get_community_by_id(community_id: str):
     """
     Get community details by ID
     """
     try:
-        response = (
+        loaders = current_loaders()
+        if loaders:
+            return await loaders.loader("communities", _batch_communities).load(community_id)
+
+        response = await run_query(
             supabase.table("rooms")
             .select("*")
             .eq("id", community_id)
             .eq("type", "group")
             .single()
-            .execute()
         )
         return response.data
         
@@ -700,24 +1312,68 @@ async def get_community_by_id(community_id: str):
         print(f"Error fetching community by ID: {e}")
         return None
 
+async def _batch_memberships(keys: list):
+    """Loader batch: (community_id, user_id) pairs resolved with one room_members query"""
+    response = await run_query(
+        supabase.table("room_members")
+        .select("room_id, user_id, request_status")
+        .in_("room_id", sorted({room_id for room_id, _ in keys}))
+        .in_("user_id", sorted({user_id for _, user_id in keys}))
+    )
+    statuses = {
+        (row["room_id"], row["user_id"]): "approved" if row["request_status"] else "pending"
+        for row in response.data or []
+    }
+    return {key: statuses.get(key) for key in keys}
+
+# Membership statuses shared across requests. Approved members are kept for
+# MEMBERSHIP_CACHE_TTL seconds; pending and non-members only for
+# MEMBERSHIP_NEGATIVE_TTL so a fresh join request is picked up quickly.
+MEMBERSHIP_CACHE_TTL = float(os.getenv("MEMBERSHIP_CACHE_TTL", "30"))
+MEMBERSHIP_NEGATIVE_TTL = float(os.getenv("MEMBERSHIP_NEGATIVE_TTL", "5"))
+MEMBERSHIP_CHANNEL = "invalidate:membership"
+membership_cache = TTLCache(MEMBERSHIP_CACHE_TTL, MEMBERSHIP_NEGATIVE_TTL)
+membership_changes = broadcast_invalidation(
+    MEMBERSHIP_CHANNEL, lambda community_id, user_id: membership_cache.invalidate((community_id, user_id))
+)
+
+async def _forget_membership(community_id: str, user_id: str):
+    """Drop a membership that just changed from the request's loader and every worker's cache"""
+    loaders = current_loaders()
+    if loaders:
+        loaders.clear("memberships", (community_id, user_id))
+    membership_cache.invalidate((community_id, user_id))
+    await membership_changes.publish(community_id, user_id)
+
 async def check_community_membership(community_id: str, user_id: str):
     """
     Check user's membership status in the community
     Returns: "approved", "pending", or None
     """
+    key = (community_id, user_id)
+    cached = membership_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    generation = membership_cache.generation
+
     try:
-        response = (
-            supabase.table("room_members")
-            .select("request_status")
-            .eq("room_id", community_id)
-            .eq("user_id", user_id)
-            .single()
-            .execute()
-        )
-        
-        if response.data:
-            return "approved" if response.data["request_status"] else "pending"
-        return None
+        loaders = current_loaders()
+        if loaders:
+            status = await loaders.loader("memberships", _batch_memberships).load(key)
+        else:
+            response = await run_query(
+                supabase.table("room_members")
+                .select("request_status")
+                .eq("room_id", community_id)
+                .eq("user_id", user_id)
+                .limit(1)
+            )
+            rows = response.data or []
+            status = ("approved" if rows[0]["request_status"] else "pending") if rows else None
+
+        ttl = MEMBERSHIP_CACHE_TTL if status == "approved" else MEMBERSHIP_NEGATIVE_TTL
+        membership_cache.set(key, status, ttl=ttl, generation=generation)
+        return status
         
     except Exception as e:
         print(f"Error checking community membership: {e}")
@@ -728,12 +1384,11 @@ async def get_community_members(community_id: str):
     Get all approved members of a community with their profile details
     """
     try:
-        response = (
+        response = await run_query(
             supabase.table("room_members")
             .select("*, profiles(*)")
             .eq("room_id", community_id)
             .eq("request_status", True)
-            .execute()
         )
         return response.data
         
@@ -4,7 +4,7 @@ from email.mime.multipart import MIMEMultipart
 import os
 from dotenv import load_dotenv
 import random
-from typing import Optional
+from typing import Optional, Tuple
 
 load_dotenv()  # Load environment variables
 
@@ -20,23 +20,32 @@ SMTP_SERVER = get_env_var("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(get_env_var("SMTP_PORT", "587"))
 EMAIL_ADDRESS = get_env_var("EMAIL_ADDRESS")
 EMAIL_PASSWORD = get_env_var("EMAIL_PASSWORD")
+# Off for plaintext relays such as the local stand-in (python -m mail.smtp_server)
+SMTP_STARTTLS = get_env_var("SMTP_STARTTLS", "1") == "1"
 
-def send_email(to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> bool:
-    """Send an email using SMTP."""
-    try:
-        msg = MIMEMultipart()
-        msg["From"] = EMAIL_ADDRESS
-        msg["To"] = to_email
-        msg["Subject"] = subject
+def build_message(to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg["From"] = EMAIL_ADDRESS
+    msg["To"] = to_email
+    msg["Subject"] = subject
 
-        # Attach both plain text and HTML versions
-        msg.attach(MIMEText(body, "plain", _charset="utf-8"))
-        if html_body:
-            msg.attach(MIMEText(html_body, "html", _charset="utf-8"))
+    # Attach both plain text and HTML versions
+    msg.attach(MIMEText(body, "plain", _charset="utf-8"))
+    if html_body:
+        msg.attach(MIMEText(html_body, "html", _charset="utf-8"))
+    return msg
 
+def send_email(to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> bool:
+    """
+    Send one email over its own SMTP connection, blocking until it's done.
+    Request handlers queue mail on the outbox (mail/outbox.py) instead.
+    """
+    try:
+        msg = build_message(to_email, subject, body, html_body)
 
         with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
+            if SMTP_STARTTLS:
+                server.starttls()
             server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
             server.send_message(msg)
 
@@ -45,8 +54,8 @@ def send_email(to_email: str, subject: str, body: str, html_body: Optional[str]
         print(f"Error sending email: {e}")
         return False
 
-def send_otp_email(to_email: str) -> Optional[str]:
-    """Generate and send an OTP email."""
+def otp_email(to_email: str) -> Tuple[str, MIMEMultipart]:
+    """Generate an OTP and the email carrying it."""
     otp = str(random.randint(100000, 999999))  # 6-digit OTP
     subject = "Your OTP Code"
     body = f"Your OTP code is: {otp}"
@@ -61,6 +70,4 @@ def send_otp_email(to_email: str) -> Optional[str]:
     </html>
     """
 
-    if send_email(to_email, subject, body, html_body):
-        return otp
-    return None
\ No newline at end of file
+    return otp, build_message(to_email, subject, body, html_body)
@@ -0,0 +1,123 @@
+"""
+Request-scoped batching loaders.
+
+Point lookups made while handling one HTTP request (profiles, communities,
+memberships) go through a DataLoader: loads issued in the same event-loop tick
+are coalesced into a single .in_() query, and repeated keys are served from
+the request's cache. RequestLoaderMiddleware installs a fresh set of loaders
+per request and reports how many queries were issued versus loads served in
+the X-DB-Queries / X-DB-Loads response headers.
+"""
+import asyncio
+from contextvars import ContextVar
+from typing import Optional
+
+_current_loaders: ContextVar[Optional["RequestLoaders"]] = ContextVar("request_loaders", default=None)
+
+
+def current_loaders() -> Optional["RequestLoaders"]:
+    """Loaders for the request being handled, or None outside a request"""
+    return _current_loaders.get()
+
+
+class DataLoader:
+    """
+    Coalesces concurrent load(key) calls into one batch_fn(keys) call.
+    batch_fn receives a list of unique keys and returns a dict of key -> value;
+    missing keys resolve to None.
+    """
+
+    def __init__(self, batch_fn, stats: "RequestLoaders"):
+        self.batch_fn = batch_fn
+        self.stats = stats
+        self.cache = {}
+        self.pending = {}
+
+    async def load(self, key):
+        self.stats.loads += 1
+        future = self.cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.cache[key] = future
+            if not self.pending:
+                loop.call_soon(self._dispatch)
+            self.pending[key] = future
+        else:
+            self.stats.cache_hits += 1
+        return await asyncio.shield(future)
+
+    def clear(self, key):
+        """Forget a cached key, e.g. after the request itself wrote it"""
+        self.cache.pop(key, None)
+
+    def _dispatch(self):
+        batch, self.pending = self.pending, {}
+        asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        self.stats.batches += 1
+        try:
+            results = await self.batch_fn(list(batch))
+        except Exception as e:
+            for key, future in batch.items():
+                self.cache.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+
+class RequestLoaders:
+    """Per-request registry of DataLoaders plus query/load counters"""
+
+    def __init__(self):
+        self.loaders = {}
+        self.queries = 0
+        self.loads = 0
+        self.cache_hits = 0
+        self.batches = 0
+
+    def loader(self, name: str, batch_fn) -> DataLoader:
+        if name not in self.loaders:
+            self.loaders[name] = DataLoader(batch_fn, self)
+        return self.loaders[name]
+
+    def clear(self, name: str, key):
+        if name in self.loaders:
+            self.loaders[name].clear(key)
+
+
+class RequestLoaderMiddleware:
+    """Pure ASGI middleware so the context variable is visible to mounted sub-apps"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        loaders = RequestLoaders()
+        token = _current_loaders.set(loaders)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(loaders.queries).encode()))
+                headers.append((b"x-db-loads", str(loaders.loads).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_loaders.reset(token)
+            if loaders.loads:
+                print(
+                    f"📊 {scope['path']}: {loaders.queries} queries for {loaders.loads} loads "
+                    f"({loaders.batches} batches, {loaders.cache_hits} cache hits)"
+                )
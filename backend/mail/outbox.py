@@ -0,0 +1,274 @@
+"""
+Asynchronous email outbox.
+
+Request handlers queue mail with email_outbox.submit() and return at once;
+EMAIL_OUTBOX_WORKERS background sender workers deliver it. Each worker owns
+one SMTP connection that stays open, STARTTLS-negotiated and logged in,
+across emails, so the handshake is paid once per worker rather than once
+per email. smtplib is blocking, so each delivery runs on a worker thread.
+
+A worker takes up to EMAIL_OUTBOX_BATCH_SIZE queued emails at a time
+(waiting at most EMAIL_OUTBOX_BATCH_MS after the first) and sends them back
+to back over its connection in one thread hop. Temporary failures (4xx
+replies, dropped connections) are retried with exponential backoff up to
+EMAIL_OUTBOX_MAX_ATTEMPTS times; permanent 5xx rejections are dropped and
+logged. When the connection itself fails (relay unreachable, login refused,
+connection dropped) the rest of the batch isn't tried: it goes back for a
+retry without using up an attempt, so one batch can't spend SMTP_TIMEOUT
+per email on a dead relay. Connections idle for EMAIL_OUTBOX_IDLE_SECONDS are closed and
+reopened on demand.
+
+The queue is bounded (EMAIL_OUTBOX_QUEUE_SIZE): when the relay falls
+behind, submit() raises OutboxFull and the caller reports it, instead of
+mail piling up in memory.
+"""
+import asyncio
+import os
+import smtplib
+import ssl
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+
+from email_utils import SMTP_SERVER, SMTP_PORT, SMTP_STARTTLS, EMAIL_ADDRESS, EMAIL_PASSWORD
+
+OUTBOX_WORKERS = int(os.getenv("EMAIL_OUTBOX_WORKERS", "2"))
+OUTBOX_QUEUE_SIZE = int(os.getenv("EMAIL_OUTBOX_QUEUE_SIZE", "1000"))
+OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_BATCH_INTERVAL = int(os.getenv("EMAIL_OUTBOX_BATCH_MS", "20")) / 1000
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_IDLE_SECONDS = float(os.getenv("EMAIL_OUTBOX_IDLE_SECONDS", "60"))
+SMTP_TIMEOUT = 30.0
+MAX_BACKOFF = 30.0
+# _send_batch's result for emails it didn't try after the connection failed
+NOT_SENT = object()
+
+
+class OutboxFull(Exception):
+    pass
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies won't succeed on a retry; everything else might"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class SMTPSession:
+    """
+    One reused SMTP connection. Only ever used from one thread at a time
+    (its worker's deliveries are sequential).
+    """
+
+    def __init__(self, host: str = SMTP_SERVER, port: int = SMTP_PORT, username: str = EMAIL_ADDRESS,
+                 password: str = EMAIL_PASSWORD, starttls: bool = SMTP_STARTTLS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.smtp = None
+        self.opened = 0
+
+    def _open(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.password:
+                smtp.login(self.username, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        self.smtp = smtp
+        self.opened += 1
+
+    def send(self, message: Message):
+        fresh = self.smtp is None
+        if fresh:
+            self._open()
+        # smtplib resets the transaction itself after a refused MAIL/RCPT/DATA
+        try:
+            self.smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            if fresh:
+                raise
+            # The relay dropped the kept-alive connection: reconnect once
+            self._open()
+            self.smtp.send_message(message)
+        except smtplib.SMTPException:
+            # A refusal; the connection itself is still good
+            raise
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        smtp, self.smtp = self.smtp, None
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+
+
+class OutboxItem:
+    __slots__ = ("message", "attempts")
+
+    def __init__(self, message: Message):
+        self.message = message
+        self.attempts = 0
+
+
+class EmailOutbox:
+    def __init__(self, workers: int = OUTBOX_WORKERS, queue_size: int = OUTBOX_QUEUE_SIZE,
+                 batch_size: int = OUTBOX_BATCH_SIZE, batch_interval: float = OUTBOX_BATCH_INTERVAL,
+                 max_attempts: int = OUTBOX_MAX_ATTEMPTS, idle_seconds: float = OUTBOX_IDLE_SECONDS,
+                 session_factory=SMTPSession):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_attempts = max_attempts
+        self.idle_seconds = idle_seconds
+        self.session_factory = session_factory
+        self.queue = None
+        self.tasks = []
+        self.sessions = []
+        self.executor = None
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    def _ensure_started(self):
+        if self.tasks and not all(task.done() for task in self.tasks):
+            return
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="smtp")
+        self.sessions = [self.session_factory() for _ in range(self.workers)]
+        self.tasks = [asyncio.create_task(self._run(session)) for session in self.sessions]
+
+    def submit(self, message: Message):
+        """Queue an email for delivery; raises OutboxFull when the queue is full"""
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(OutboxItem(message))
+        except asyncio.QueueFull:
+            raise OutboxFull("Email outbox is full")
+
+    async def _next_batch(self, idle_timeout: float = None):
+        # Only the wait for the first email times out, so nothing taken is lost
+        batch = [await asyncio.wait_for(self.queue.get(), idle_timeout)]
+        deadline = asyncio.get_running_loop().time() + self.batch_interval
+        while len(batch) < self.batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    @staticmethod
+    def _send_batch(session: SMTPSession, batch):
+        """
+        Worker thread: send each email in turn, returning its error (or None).
+        Stops at the first failure that leaves no connection; the emails
+        after it get NOT_SENT.
+        """
+        errors = []
+        for item in batch:
+            try:
+                session.send(item.message)
+                errors.append(None)
+            except Exception as error:
+                errors.append(error)
+                if session.smtp is None:
+                    break
+        return errors + [NOT_SENT] * (len(batch) - len(errors))
+
+    async def _deliver(self, session: SMTPSession, batch):
+        loop = asyncio.get_running_loop()
+        pending = batch
+        while pending:
+            errors = await loop.run_in_executor(self.executor, self._send_batch, session, pending)
+            self.batches += 1
+            retry = []
+            for item, error in zip(pending, errors):
+                if error is None:
+                    self.sent += 1
+                    continue
+                if error is NOT_SENT:
+                    retry.append(item)
+                    continue
+                item.attempts += 1
+                if is_permanent(error) or item.attempts >= self.max_attempts:
+                    self.failed += 1
+                    print(f"❌ Dropping email to {item.message['To']} after {item.attempts} attempts: {error}")
+                else:
+                    retry.append(item)
+            if retry:
+                self.retries += len(retry)
+                backoff = min(0.5 * 2 ** max(max(item.attempts for item in retry) - 1, 0), MAX_BACKOFF)
+                await asyncio.sleep(backoff)
+            pending = retry
+
+    async def _run(self, session: SMTPSession):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = await self._next_batch(self.idle_seconds if session.smtp is not None else None)
+            except asyncio.TimeoutError:
+                await loop.run_in_executor(self.executor, session.close)
+                continue
+            try:
+                await self._deliver(session, batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+            "connections_opened": sum(session.opened for session in self.sessions),
+        }
+
+    async def drain(self, timeout: float = 10.0):
+        """Deliver what's queued (up to timeout), then stop the workers (used on shutdown)"""
+        if self.queue is None:
+            return
+        if any(not task.done() for task in self.tasks):
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"❌ Email outbox shut down with {self.queue.qsize()} emails unsent")
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        for session in self.sessions:
+            await loop.run_in_executor(self.executor, session.close)
+        self.executor.shutdown(wait=False)
+        self.executor = None
+        self.tasks = []
+        self.queue = None
+        print(f"📮 Email outbox drained: {self.stats()}")
+
+
+email_outbox = EmailOutbox()
@@ -0,0 +1,124 @@
+"""
+Local SMTP server, a stand-in for the real relay when running the app or
+the outbox benchmark on one machine. Accepts every message and keeps
+count; nothing is delivered.
+
+Supports EHLO/HELO, AUTH PLAIN/LOGIN (any credentials), MAIL, RCPT, DATA,
+RSET, NOOP and QUIT; no STARTTLS, so run the app with SMTP_STARTTLS=0.
+
+    python -m mail.smtp_server --port 8025 [--latency-ms 5] [--auth-ms 150]
+
+then start the app with SMTP_SERVER=127.0.0.1 SMTP_PORT=8025 SMTP_STARTTLS=0.
+--latency-ms delays every reply (a network round trip) and --auth-ms adds
+to AUTH (TLS negotiation and password check on a real relay), so the cost
+of opening a connection per email shows up locally. --fail-every N answers
+every Nth RCPT with a temporary 451, to exercise retries.
+"""
+import argparse
+import asyncio
+import base64
+
+
+class SMTPServer:
+    def __init__(self, latency: float = 0.0, auth_delay: float = 0.0, fail_every: int = 0):
+        self.latency = latency
+        self.auth_delay = auth_delay
+        self.fail_every = fail_every
+        self.server = None
+        self.connections = 0
+        self.received = 0
+        self.recipients = 0
+        self.rejected = 0
+
+    async def _reply(self, writer: asyncio.StreamWriter, *lines: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write("".join(f"{line}\r\n" for line in lines).encode())
+        await writer.drain()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        recipients = 0
+        try:
+            await self._reply(writer, "220 localhost devconnect SMTP stand-in")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                verb, _, argument = line.decode(errors="replace").strip().partition(" ")
+                verb = verb.upper()
+                if verb == "EHLO":
+                    await self._reply(writer, "250-localhost", "250-8BITMIME", "250 AUTH PLAIN LOGIN")
+                elif verb == "HELO":
+                    await self._reply(writer, "250 localhost")
+                elif verb == "AUTH":
+                    mechanism, _, initial = argument.partition(" ")
+                    if mechanism.upper() == "LOGIN":
+                        for prompt in ("Username:", "Password:"):
+                            await self._reply(writer, f"334 {base64.b64encode(prompt.encode()).decode()}")
+                            await reader.readline()
+                    elif not initial:
+                        await self._reply(writer, "334 ")
+                        await reader.readline()
+                    await asyncio.sleep(self.auth_delay)
+                    await self._reply(writer, "235 2.7.0 Authentication successful")
+                elif verb == "MAIL":
+                    recipients = 0
+                    await self._reply(writer, "250 2.1.0 OK")
+                elif verb == "RCPT":
+                    self.recipients += 1
+                    if self.fail_every and self.recipients % self.fail_every == 0:
+                        self.rejected += 1
+                        await self._reply(writer, "451 4.3.0 Try again later")
+                    else:
+                        recipients += 1
+                        await self._reply(writer, "250 2.1.5 OK")
+                elif verb == "DATA":
+                    if not recipients:
+                        await self._reply(writer, "503 5.5.1 No valid recipients")
+                        continue
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    self.received += 1
+                    recipients = 0
+                    await self._reply(writer, "250 2.0.0 OK queued")
+                elif verb in ("RSET", "NOOP"):
+                    recipients = 0 if verb == "RSET" else recipients
+                    await self._reply(writer, "250 2.0.0 OK")
+                elif verb == "QUIT":
+                    await self._reply(writer, "221 2.0.0 Bye")
+                    break
+                else:
+                    await self._reply(writer, "502 5.5.2 Command not recognized")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8025):
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+async def serve(host: str, port: int, latency: float, auth_delay: float, fail_every: int):
+    server = await SMTPServer(latency, auth_delay, fail_every).start(host, port)
+    print(f"📮 SMTP stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--auth-ms", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    options = parser.parse_args()
+    asyncio.run(serve(options.host, options.port, options.latency_ms / 1000, options.auth_ms / 1000, options.fail_every))
@@ -1,21 +1,33 @@
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Request
 from pydantic import BaseModel
-from email_utils import send_otp_email  # Ensure this module is correctly implemented
+from email_utils import otp_email
 from fastapi.middleware.cors import CORSMiddleware
-from supabase import create_client
 import os
+import asyncio
 from dotenv import load_dotenv
-from fastapi import UploadFile, File, Form
-from typing import Optional
-from fastapi import Depends
+from fastapi import UploadFile, File, Form, Query
+from typing import Literal, Optional
+from fastapi import Depends, Header
 from auth.auth import verify_token
 from chat.chat_routes import chat_app
 from search.searchRoute import search_app
 from chat_ws import ws_router
-from db import get_projects_with_members
 from db import get_projects_with_members, insert_app_project, insert_app_project_member
-from notification import notifrouter
+from storage.client import create_auth_client
+from db import supabase, run_query, get_recommended_projects, get_recommended_developers, get_resume_job
+from social_graph_loader import load_social_graph
+from search.loader import load_search_indexes, index_document, load_facet_index
+from recommend.loader import load_skill_matrices, run_developer_matrix_refresh
+from pubsub.invalidation import watch_invalidations
+from resume.ingest import resume_ingest, ResumeTooLarge, IngestBusy
+from notification import notifrouter, run_unread_reconciler
 from community.community_routes import community_app
+from loaders import RequestLoaderMiddleware
+from chat.message_writer import message_writer
+from mail.outbox import email_outbox, OutboxFull
+from pubsub.broker import broker
+from auth.otp_store import otp_store, OTPNotFound, OTPInvalid, TooManyAttempts, RateLimited, OTPStoreUnavailable
+from contextlib import asynccontextmanager
 
 
 
@@ -26,7 +38,35 @@ from community.community_routes import community_app
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Chat messages a previous shutdown couldn't save in time
+    await message_writer.replay()
+    # Cross-worker changes (memberships, follows, search documents, unread counts),
+    # subscribed before the indexes start loading so none are missed
+    await watch_invalidations()
+    graph_loader = asyncio.create_task(load_social_graph())
+    search_loader = asyncio.create_task(load_search_indexes())
+    facet_loader = asyncio.create_task(load_facet_index())
+    matrix_loader = asyncio.create_task(load_skill_matrices())
+    reconciler = asyncio.create_task(run_unread_reconciler())
+    matrix_refresher = asyncio.create_task(run_developer_matrix_refresh())
+    yield
+    reconciler.cancel()
+    matrix_refresher.cancel()
+    graph_loader.cancel()
+    search_loader.cancel()
+    facet_loader.cancel()
+    matrix_loader.cancel()
+    await resume_ingest.close()
+    # Persist any chat messages still queued by the write-behind pipeline
+    await message_writer.drain()
+    await email_outbox.drain()
+    await otp_store.close()
+    # Last: the drains above may still publish
+    await broker.close()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,18 +74,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Loads", "Server-Timing", "X-Next-Cursor"],
 )
+app.add_middleware(RequestLoaderMiddleware)
 
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-
-if not supabase_url or not supabase_key:
+# Shared with db.py so the whole app runs against one storage backend
+if supabase is None:
     raise RuntimeError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
 
-supabase = create_client(
-    supabase_url,
-    supabase_key
-)
+# Sign-up/in/out only; a signed-in session must never reach the shared data client
+auth_client = create_auth_client()
 
 app.mount("/chat", chat_app)
 app.mount("/search", search_app)
@@ -55,10 +93,6 @@ app.include_router(ws_router)
 app.include_router(notifrouter)
 
 
-# Temporary storage (replace with database in production)
-otp_storage = {}
-
-
 class EmailRequest(BaseModel):
     email: str
 
@@ -67,13 +101,24 @@ class VerifyOTPRequest(BaseModel):
     otp: str
 
 @app.post("/send-otp")
-async def send_otp(request: EmailRequest):
-    otp = send_otp_email(request.email)
-    if not otp:
-        raise HTTPException(status_code=500, detail="Failed to send OTP")
-    
-    # Store OTP with email (in production, use database with expiration)
-    otp_storage[request.email] = otp
+async def send_otp(request: EmailRequest, http_request: Request):
+    client_ip = http_request.client.host if http_request.client else None
+    otp, message = otp_email(request.email)
+    try:
+        await otp_store.check_send(request.email, client_ip)
+        # Stored before the email is queued, so a code that reaches the user can be verified.
+        # Expires after OTP_TTL_SECONDS; shared across workers via OTP_STORE_URL (or BROKER_URL)
+        await otp_store.issue(request.email, otp)
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(max(1, round(e.retry_after)))})
+    except OTPStoreUnavailable:
+        raise HTTPException(status_code=503, detail="Failed to send OTP, try again shortly")
+
+    try:
+        # Delivered in the background by the outbox's pooled SMTP connections
+        email_outbox.submit(message)
+    except OutboxFull:
+        raise HTTPException(status_code=503, detail="Failed to send OTP, try again shortly")
     
     return {
         "status": 200,
@@ -83,22 +128,15 @@ async def send_otp(request: EmailRequest):
 
 @app.post("/verify-otp")
 async def verify_otp(request: VerifyOTPRequest):
-    stored_otp = otp_storage.get(request.email)
-    
-    if not stored_otp:
-        raise HTTPException(
-            status_code=400,
-            detail="No OTP found for this email. Request a new one."
-        )
-    
-    if request.otp != stored_otp:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid OTP"
-        )
-    
-    # Clear OTP after successful verification
-    del otp_storage[request.email]
+    try:
+        # Consumes the code on success
+        await otp_store.verify(request.email, request.otp)
+    except (OTPNotFound, OTPInvalid) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TooManyAttempts as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except OTPStoreUnavailable:
+        raise HTTPException(status_code=503, detail="Couldn't verify OTP, try again shortly")
     
     return {
         "success": True,
@@ -119,7 +157,7 @@ async def register(
 ):
     try:
         # Register user with Supabase
-        auth_response = supabase.auth.sign_up({
+        auth_response = auth_client.auth.sign_up({
             "email": email,
             "password": password,
             "options": {
@@ -141,7 +179,8 @@ async def register(
                 "username": auth_response.user.user_metadata.get("username", username),
                 "full_name": auth_response.user.user_metadata.get("username", username),  
             }
-            supabase.table("profiles").insert(user_data).execute()
+            await run_query(supabase.table("profiles").insert(user_data))
+            await index_document("devs", user_data)
             print("User data inserted into profiles table:", user_data)
 
             # Check if session exists before accessing tokens
@@ -174,7 +213,7 @@ async def register(
 async def login(request: UserRegister):
     try:
         # Authenticate user with Supabase
-        auth_response = supabase.auth.sign_in_with_password({
+        auth_response = auth_client.auth.sign_in_with_password({
             "email": request.email,
             "password":request.password
         })
@@ -211,10 +250,11 @@ async def login(request: UserRegister):
         raise HTTPException(status_code=400, detail=error_detail)
     
 @app.post("/logout")
-async def logout():
+async def logout(authorization: str = Header(None)):
     try:
-        # Sign out user from Supabase
-        supabase.auth.sign_out()
+        # Revoke the caller's own session, not whichever one this client saw last
+        if authorization and authorization.startswith("Bearer "):
+            auth_client.auth.admin.sign_out(authorization.replace("Bearer ", ""))
         return {"status": "success", "message": "User logged out successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e) or "Logout failed")
@@ -229,11 +269,84 @@ async def protected(payload: dict = Depends(verify_token)):
     }
 
 @app.get("/api/app_projects_with_members")
-async def api_get_projects_with_members(payload: dict = Depends(verify_token)):
-    data = await get_projects_with_members()
+async def api_get_projects_with_members(
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None,
+    status: Optional[Literal["active", "completed", "on_hold", "cancelled"]] = None,
+    is_recruiting: Optional[bool] = None,
+    is_public: Optional[bool] = None,
+    member_limit: int = Query(8, ge=0, le=20),
+    payload: dict = Depends(verify_token)
+):
+    """
+    Project cards, newest first, `limit` per page. Pass `next_cursor` back as
+    `cursor` for the next page.
+    """
+    try:
+        data = await get_projects_with_members(
+            limit, cursor, status, is_recruiting, is_public, member_limit, viewer_id=payload["sub"]
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     if data is None:
         raise HTTPException(status_code=500, detail="Failed to fetch projects with members")
-    return {"projects": data}
+    return data
+
+@app.get("/api/recommendations/projects")
+async def api_recommended_projects(
+    limit: int = Query(10, ge=1, le=50),
+    metric: Literal["jaccard", "cosine"] = "jaccard",
+    payload: dict = Depends(verify_token)
+):
+    """Open projects that best match the current user's skills, with the skills they share"""
+    data = await get_recommended_projects(payload["sub"], limit, metric)
+    if data is None:
+        raise HTTPException(status_code=500, detail="Failed to recommend projects")
+    return data
+
+@app.get("/api/app_projects/{project_id}/recommended_developers")
+async def api_recommended_developers(
+    project_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    metric: Literal["jaccard", "cosine"] = "jaccard",
+    payload: dict = Depends(verify_token)
+):
+    """Developers whose skills best fit the project, with the skills they share"""
+    try:
+        data = await get_recommended_developers(project_id, limit, metric)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if data is None:
+        raise HTTPException(status_code=500, detail="Failed to recommend developers")
+    return data
+
+@app.post("/api/profile/resume", status_code=202)
+async def upload_resume(file: UploadFile = File(...), payload: dict = Depends(verify_token)):
+    """
+    Queue a PDF/DOCX resume for skill extraction. Returns the job; poll
+    GET /api/profile/resume/{id} or wait for the `resume_parsed` push.
+    """
+    try:
+        job = await resume_ingest.submit(payload["sub"], file)
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IngestBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    finally:
+        await file.close()
+    if job is None:
+        raise HTTPException(status_code=500, detail="Failed to queue resume")
+    return job
+
+@app.get("/api/profile/resume/{job_id}")
+async def resume_job_status(job_id: str, payload: dict = Depends(verify_token)):
+    """status is queued, processing, done (skills, added_skills) or failed (error)"""
+    job = await get_resume_job(job_id, payload["sub"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 from fastapi import Request
 
@@ -279,7 +392,7 @@ async def create_app_project(project: AppProjectCreate, payload: dict = Depends(
     project_data = project.dict()
     # Set the created_by field to the authenticated user's ID
     project_data['created_by'] = payload["sub"]
-    created = insert_app_project(project_data)
+    created = await insert_app_project(project_data)
     if created:
         return {"status": "success", "project": created}
     else:
@@ -291,7 +404,7 @@ async def create_app_project_member(member: AppProjectMemberCreate, payload: dic
     member_data['status'] = 'pending'  # Always set to pending
     # Set the user_id field to the authenticated user's ID
     member_data['user_id'] = payload["sub"]
-    created = insert_app_project_member(member_data)
+    created = await insert_app_project_member(member_data)
     if created:
         return {"status": "success", "member": created}
     else:
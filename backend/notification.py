@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
+import asyncio
+import json
+import os
 from auth.dependencies import get_current_user_id
-from db import get_unread_notifications, get_notifications, Update_notif
+from db import get_notifications, mark_notifications_read, publish_to_user, user_channel
+from notification_counts import get_unread_count, reconcile_unread_counts
+from pubsub.broker import broker
+
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "64"))
+UNREAD_RECONCILE_SECONDS = float(os.getenv("UNREAD_RECONCILE_SECONDS", "300"))
 
 notifrouter = APIRouter()
 
@@ -19,6 +29,7 @@ class NotificationsResponse(BaseModel):
     status: str
     notifications: List[NotificationResponse]
     unread_count: int
+    cursor: Optional[str] = None
 
 @notifrouter.get("/notifications", response_model=NotificationsResponse)
 async def notifications(current_user_id: str = Depends(get_current_user_id)):
@@ -28,7 +39,8 @@ async def notifications(current_user_id: str = Depends(get_current_user_id)):
         return {
             "status": "success",
             "notifications": result["notifications"],
-            "unread_count": result["unread_count"]
+            "unread_count": result["unread_count"],
+            "cursor": result.get("cursor")
         }
     except Exception as e:
         raise HTTPException(
@@ -38,21 +50,99 @@ async def notifications(current_user_id: str = Depends(get_current_user_id)):
 
 @notifrouter.patch("/notifications/mark-all-read")
 async def mark_all_notifications_as_read(
+    up_to: Optional[str] = None,
     current_user_id: str = Depends(get_current_user_id)
 ):
+    """
+    Mark every unread notification read, or only those up to the `up_to`
+    cursor returned by GET /notifications, in a single update.
+    """
     try:
-        # Get all unread notifications for the user
-        unread_notifications = await get_unread_notifications(current_user_id)
-        
-        # Mark all as read
-        for notification in unread_notifications:
-            await Update_notif(notification['id'])
-        
-            print("✅ All notifications marked as read")
-            
-        return {"status": "success", "message": "All notifications marked as read"}
+        updated = await mark_notifications_read(current_user_id, up_to)
+        print(f"✅ {updated} notifications marked as read")
+
+        unread_count = await get_unread_count(current_user_id)
+        await publish_to_user(current_user_id, {"type": "unread_count", "unread_count": unread_count})
+
+        return {
+            "status": "success",
+            "message": "All notifications marked as read",
+            "updated": updated,
+            "unread_count": unread_count
+        }
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+
+def get_stream_user_id(request: Request, token: Optional[str] = None) -> str:
+    """EventSource can't send headers, so the stream also accepts ?token="""
+    authorization = request.headers.get("Authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return get_current_user_id(token)
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@notifrouter.get("/notifications/stream")
+async def notification_stream(request: Request, current_user_id: str = Depends(get_stream_user_id)):
+    """
+    Server-Sent Events replacing /notifications polling. Sends the unread
+    count once on connect, then a `notification` event (with the new unread
+    count) whenever one is created for the user and an `unread_count` event
+    when it changes otherwise. Idle streams don't touch the database.
+    The same frames reach the multiplexed /ws socket.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+
+    async def on_push(channel: str, message: str):
+        if queue.full():
+            # Slow reader: the newest frame carries the current unread count
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    channel = user_channel(current_user_id)
+
+    async def events():
+        # Subscribed only once the response starts streaming, so the finally below always runs
+        await broker.subscribe(channel, on_push)
+        try:
+            unread_count = await get_unread_count(current_user_id)
+            yield sse_event("unread_count", {"type": "unread_count", "unread_count": unread_count})
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                frame = json.loads(message)
+                yield sse_event(frame.get("type", "message"), frame)
+        finally:
+            await broker.unsubscribe(channel, on_push)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def run_unread_reconciler(interval: float = UNREAD_RECONCILE_SECONDS):
+    """Background job: periodically correct drift in the cached unread counters"""
+    while True:
+        await asyncio.sleep(interval)
+        fixed = await reconcile_unread_counts()
+        if fixed:
+            print(f"🔧 Reconciled {fixed} unread notification counters")
@@ -0,0 +1,82 @@
+"""
+Unread notification badge counts, read from the trigger-maintained
+notification_unread_counts table (notification_unread_counts.sql) and cached
+in-process. The worker that makes a change adjusts its cached count in place
+and broadcasts the user id; every other worker drops its copy and re-reads
+the table on the next lookup.
+"""
+import os
+
+from storage.query import supabase, run_query
+from pubsub.invalidation import broadcast_invalidation
+from ttl_cache import TTLCache, MISSING
+
+UNREAD_COUNT_CACHE_TTL = float(os.getenv("UNREAD_COUNT_CACHE_TTL", "60"))
+UNREAD_COUNT_CHANNEL = "invalidate:unread_count"
+unread_counts = TTLCache(UNREAD_COUNT_CACHE_TTL)
+unread_count_changes = broadcast_invalidation(UNREAD_COUNT_CHANNEL, unread_counts.invalidate)
+
+
+async def count_unread_notifications(user_id: str) -> int:
+    """Exact unread count over notifications; used to reconcile the counters"""
+    unread = await run_query(supabase.table("notifications")
+            .select("count", count="exact")
+            .eq("recipient_id", user_id)
+            .eq("is_read", False))
+    return unread.count or 0
+
+
+async def get_unread_count(user_id: str) -> int:
+    """Unread badge count: a cache hit or one primary-key lookup"""
+    cached = unread_counts.get(user_id)
+    if cached is not MISSING:
+        return cached
+    generation = unread_counts.generation
+    response = await run_query(supabase.table("notification_unread_counts")
+            .select("unread_count")
+            .eq("user_id", user_id)
+            .limit(1))
+    count = response.data[0]["unread_count"] if response.data else 0
+    unread_counts.set(user_id, count, generation=generation)
+    return count
+
+
+async def adjust_unread_count(user_id: str, delta: int = None, value: int = None):
+    """
+    Apply this worker's own change to its cached count and invalidate the
+    count in every other worker (the table itself is updated by triggers)
+    """
+    cached = unread_counts.get(user_id)
+    if cached is not MISSING:
+        unread_counts.set(user_id, max(cached + delta, 0) if value is None else value)
+    await unread_count_changes.publish(user_id)
+
+
+async def reconcile_unread_counts(user_ids=None) -> int:
+    """
+    Correct drift between notification_unread_counts and the notifications it
+    summarises, for the given users (default: everyone in this worker's cache).
+    A mismatch is re-checked before it is written, so a notification landing
+    between the two reads isn't mistaken for drift. Returns how many were fixed.
+    """
+    fixed = 0
+    for user_id in list(user_ids if user_ids is not None else unread_counts.entries):
+        try:
+            exact = await count_unread_notifications(user_id)
+            unread_counts.invalidate(user_id)
+            stored = await get_unread_count(user_id)
+            if exact == stored:
+                continue
+            exact = await count_unread_notifications(user_id)
+            unread_counts.invalidate(user_id)
+            if exact == await get_unread_count(user_id):
+                continue
+            await run_query(supabase.table("notification_unread_counts")
+                    .upsert({"user_id": user_id, "unread_count": exact}, on_conflict="user_id"))
+            unread_counts.invalidate(user_id)
+            await unread_count_changes.publish(user_id)
+            print(f"🔧 Unread count for {user_id} corrected from {stored} to {exact}")
+            fixed += 1
+        except Exception as e:
+            print(f"❌ Error reconciling unread count for {user_id}: {e}")
+    return fixed
@@ -0,0 +1,183 @@
+"""
+Pub/sub brokers for fanning chat traffic out across uvicorn workers.
+
+Each worker keeps its own sockets and subscribes to the channels (rooms) it
+has local clients for. Publishing goes through the broker, so a message sent
+on one worker reaches sockets held by every other worker.
+
+BROKER_URL selects the implementation:
+    unset / "memory://"          InProcessBroker (single worker)
+    "redis://host:port"          RedisBroker over TCP (Redis or pubsub.server)
+    "unix:///path/to/socket"     RedisBroker over a Unix socket
+"""
+import abc
+import asyncio
+import os
+from urllib.parse import urlparse
+
+from pubsub.resp import encode_command, read_reply, open_connection, RespError
+
+
+class Broker(abc.ABC):
+    """Channel-based pub/sub. Handlers are `async def handler(channel, message)`."""
+
+    def __init__(self):
+        self.handlers = {}
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, message: str):
+        ...
+
+    async def subscribe(self, channel: str, handler):
+        """Register handler; returns True if this is the channel's first local handler"""
+        handlers = self.handlers.setdefault(channel, [])
+        if handler not in handlers:
+            handlers.append(handler)
+        return len(handlers) == 1
+
+    async def unsubscribe(self, channel: str, handler):
+        """Remove handler; returns True if the channel has no local handlers left"""
+        handlers = self.handlers.get(channel, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self.handlers.pop(channel, None)
+            return True
+        return False
+
+    async def dispatch(self, channel: str, message: str):
+        for handler in list(self.handlers.get(channel, [])):
+            try:
+                await handler(channel, message)
+            except Exception as e:
+                print(f"❌ Broker handler error on {channel}: {e}")
+
+
+class InProcessBroker(Broker):
+    """Delivers to handlers in this process only"""
+
+    async def publish(self, channel: str, message: str):
+        await self.dispatch(channel, message)
+
+
+class RedisBroker(Broker):
+    """
+    Cross-process broker speaking the Redis pub/sub protocol. Uses one
+    connection for PUBLISH and one for SUBSCRIBE; reconnects with backoff
+    and re-subscribes every active channel after a connection loss.
+    """
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = urlparse(url)
+        self.publisher = None
+        self.subscriber = None
+        self.publish_lock = asyncio.Lock()
+        self.start_lock = asyncio.Lock()
+        self.reader_task = None
+        self.closed = False
+
+    async def _open(self):
+        return await open_connection(self.url)
+
+    async def start(self):
+        async with self.start_lock:
+            if self.reader_task and not self.reader_task.done():
+                return
+            self.closed = False
+            self.publisher = await self._open()
+            self.subscriber = await self._open()
+            if self.handlers:
+                self.subscriber[1].write(encode_command("SUBSCRIBE", *self.handlers))
+                await self.subscriber[1].drain()
+            self.reader_task = asyncio.create_task(self._read_loop())
+
+    async def close(self):
+        self.closed = True
+        if self.reader_task:
+            self.reader_task.cancel()
+            try:
+                await self.reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        for connection in (self.publisher, self.subscriber):
+            if connection:
+                connection[1].close()
+                try:
+                    await connection[1].wait_closed()
+                except OSError:
+                    pass
+        self.publisher = self.subscriber = self.reader_task = None
+
+    async def publish(self, channel: str, message: str):
+        await self.start()
+        async with self.publish_lock:
+            for attempt in range(2):
+                try:
+                    reader, writer = self.publisher
+                    writer.write(encode_command("PUBLISH", channel, message))
+                    await writer.drain()
+                    reply = await read_reply(reader)
+                    if isinstance(reply, RespError):
+                        raise reply
+                    return reply
+                except (ConnectionError, OSError):
+                    if attempt:
+                        raise
+                    self.publisher = await self._open()
+
+    async def subscribe(self, channel: str, handler):
+        first = await super().subscribe(channel, handler)
+        await self.start()
+        if first:
+            self.subscriber[1].write(encode_command("SUBSCRIBE", channel))
+            await self.subscriber[1].drain()
+        return first
+
+    async def unsubscribe(self, channel: str, handler):
+        last = await super().unsubscribe(channel, handler)
+        if last and self.subscriber:
+            self.subscriber[1].write(encode_command("UNSUBSCRIBE", channel))
+            await self.subscriber[1].drain()
+        return last
+
+    async def _read_loop(self):
+        backoff = 0.1
+        while not self.closed:
+            try:
+                reply = await read_reply(self.subscriber[0])
+                backoff = 0.1
+                if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                    await self.dispatch(reply[1].decode(), reply[2].decode())
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, OSError, asyncio.IncompleteReadError) as e:
+                print(f"❌ Broker connection lost: {e}; reconnecting in {backoff:.1f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+                try:
+                    self.subscriber = await self._open()
+                    if self.handlers:
+                        self.subscriber[1].write(encode_command("SUBSCRIBE", *self.handlers))
+                        await self.subscriber[1].drain()
+                except OSError:
+                    continue
+
+
+def create_broker(url: str = None) -> Broker:
+    url = url if url is not None else os.getenv("BROKER_URL", "")
+    if not url or url.startswith("memory://"):
+        return InProcessBroker()
+    if url.startswith(("redis://", "unix://")):
+        return RedisBroker(url)
+    raise RuntimeError(f"Unsupported BROKER_URL {url!r}")
+
+
+# Process-wide broker shared by the websocket endpoints
+broker = create_broker()
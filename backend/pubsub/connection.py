@@ -0,0 +1,85 @@
+"""
+Per-socket outbound queue for websocket fan-out.
+
+Broadcasting only enqueues the (already serialized) frame on each
+recipient's bounded queue; a writer task per connection drains it to the
+socket. A slow client therefore only delays itself. When its queue is full
+the slow-consumer policy decides what happens:
+
+    WS_SLOW_CONSUMER_POLICY=drop_oldest   discard the oldest queued frame (default)
+    WS_SLOW_CONSUMER_POLICY=disconnect    close the socket with 1013 (try again later)
+"""
+import asyncio
+import os
+
+from fastapi import WebSocket
+
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+
+class ClientConnection:
+    def __init__(self, websocket: WebSocket, user_id: str, queue_size: int = SEND_QUEUE_SIZE,
+                 policy: str = SLOW_CONSUMER_POLICY, on_close=None):
+        if policy not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Unknown slow consumer policy {policy!r}")
+        self.websocket = websocket
+        self.user_id = user_id
+        self.policy = policy
+        self.on_close = on_close
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.writer_task = None
+        self.closed = False
+        self.dropped = 0
+
+    def start(self):
+        self.writer_task = asyncio.create_task(self._drain())
+
+    def send(self, payload: str) -> bool:
+        """Queue a frame without waiting; returns False if the connection is gone"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == DISCONNECT:
+            print(f"❌ Disconnecting slow consumer [{self.user_id}] ({self.queue.qsize()} frames queued)")
+            asyncio.create_task(self.close(code=1013))
+            return False
+
+        self.queue.get_nowait()
+        self.queue.put_nowait(payload)
+        self.dropped += 1
+        return True
+
+    async def _drain(self):
+        try:
+            while True:
+                payload = await self.queue.get()
+                await self.websocket.send_text(payload)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"❌ Error sending message to client [{self.user_id}]: {e}")
+            await self.close()
+
+    async def close(self, code: int = 1000):
+        if self.closed:
+            return
+        self.closed = True
+        if self.writer_task and self.writer_task is not asyncio.current_task():
+            self.writer_task.cancel()
+        if self.dropped:
+            print(f"⚠️ Dropped {self.dropped} frames for slow consumer [{self.user_id}]")
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+        if self.on_close:
+            await self.on_close(self)
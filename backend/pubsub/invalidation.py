@@ -0,0 +1,56 @@
+"""
+Changes every worker applies to its own in-memory state, over the broker.
+
+The worker that makes a change applies it locally, then publishes it; every
+other worker applies it when the broadcast arrives. Messages carry the
+publishing worker's ORIGIN so it can skip its own echo:
+
+    graph_changes = broadcast_invalidation("graph:follows", apply_graph_change)
+    ...
+    apply_graph_change("follow", follower_id, following_id)
+    await graph_changes.publish("follow", follower_id, following_id)
+
+watch_invalidations() subscribes every channel created this way (run at
+startup, before the in-memory indexes start loading, so no change is missed).
+"""
+import json
+import uuid
+
+from pubsub.broker import broker
+
+# Tags this worker's publications, which it has already applied
+ORIGIN = uuid.uuid4().hex
+
+
+class Invalidation:
+    def __init__(self, channel: str, apply):
+        self.channel = channel
+        self.apply = apply
+
+    async def _receive(self, channel: str, message: str):
+        origin, *args = json.loads(message)
+        if origin != ORIGIN:
+            self.apply(*args)
+
+    async def publish(self, *args):
+        """Send args (JSON-serializable) to apply(*args) on every other worker"""
+        try:
+            await broker.publish(self.channel, json.dumps([ORIGIN, *args], default=str))
+        except Exception as e:
+            # The other workers catch up on their next restart or cache expiry
+            print(f"❌ Error publishing to {self.channel}: {e}")
+
+
+invalidations = []
+
+
+def broadcast_invalidation(channel: str, apply) -> Invalidation:
+    invalidation = Invalidation(channel, apply)
+    invalidations.append(invalidation)
+    return invalidation
+
+
+async def watch_invalidations():
+    """Subscribe to every broadcast_invalidation channel"""
+    for invalidation in invalidations:
+        await broker.subscribe(invalidation.channel, invalidation._receive)
@@ -0,0 +1,76 @@
+"""
+Minimal RESP (Redis serialization protocol) codec over asyncio streams.
+
+Shared by the Redis-protocol broker client and the local stand-in server, so
+the backend can talk to a real Redis or to pubsub.server without any
+extra dependency.
+"""
+import asyncio
+from urllib.parse import ParseResult
+
+
+class RespError(Exception):
+    """An error reply (-ERR ...) from the server"""
+
+
+async def open_connection(url: ParseResult):
+    """Connect to a redis:// (TCP) or unix:// (socket path) URL"""
+    if url.scheme == "unix":
+        return await asyncio.open_unix_connection(url.path)
+    return await asyncio.open_connection(url.hostname or "127.0.0.1", url.port or 6379)
+
+
+def encode_command(*args) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        else:
+            data = str(arg).encode()
+        parts.append(f"${len(data)}\r\n".encode())
+        parts.append(data + b"\r\n")
+    return b"".join(parts)
+
+
+def encode_reply(value) -> bytes:
+    """Encode a Python value as a RESP reply"""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespError):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, bool):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, (list, tuple)):
+        return f"*{len(value)}\r\n".encode() + b"".join(encode_reply(item) for item in value)
+    if isinstance(value, str):
+        value = value.encode()
+    return f"${len(value)}\r\n".encode() + value + b"\r\n"
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """Read one RESP value; bulk strings come back as bytes"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("connection closed by peer")
+    prefix, body = line[:1], line[1:-2]
+    if prefix == b"+":
+        return body.decode()
+    if prefix == b"-":
+        return RespError(body.decode())
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"unexpected RESP prefix {prefix!r}")
@@ -0,0 +1,139 @@
+"""
+Local Redis-protocol pub/sub server, a stand-in for Redis when running
+several uvicorn workers on one machine (dev, benchmarks, soak tests).
+
+Supports PING, SUBSCRIBE, UNSUBSCRIBE, PUBLISH and QUIT, plus the expiring
+string keys the shared OTP store needs: GET, SET (with EX/PX), DEL, INCR,
+PEXPIRE and PTTL.
+
+    python -m pubsub.server --port 6380
+    python -m pubsub.server --unix /tmp/devconnect-broker.sock
+
+then start workers with BROKER_URL=redis://127.0.0.1:6380 (or unix:///tmp/...).
+"""
+import argparse
+import asyncio
+import math
+
+from pubsub.resp import encode_reply, read_reply, RespError
+from ttl_cache import ExpiringMap
+
+NOT_INTEGER = RespError("ERR value is not an integer or out of range")
+
+
+class PubSubServer:
+    def __init__(self):
+        self.channels = {}
+        self.keys = ExpiringMap(max_entries=1_000_000)
+        self.server = None
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscriptions = set()
+        try:
+            while True:
+                try:
+                    command = await read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(command, list) or not command:
+                    writer.write(encode_reply(RespError("ERR protocol error")))
+                    continue
+
+                name = command[0].decode().upper()
+                args = [arg.decode() if isinstance(arg, bytes) else str(arg) for arg in command[1:]]
+
+                if name == "PING":
+                    writer.write(encode_reply("PONG"))
+                elif name == "SUBSCRIBE":
+                    for channel in args:
+                        subscriptions.add(channel)
+                        self.channels.setdefault(channel, set()).add(writer)
+                        writer.write(encode_reply(["subscribe", channel, len(subscriptions)]))
+                elif name == "UNSUBSCRIBE":
+                    for channel in args or list(subscriptions):
+                        subscriptions.discard(channel)
+                        self._remove(channel, writer)
+                        writer.write(encode_reply(["unsubscribe", channel, len(subscriptions)]))
+                elif name == "PUBLISH" and len(args) == 2:
+                    channel, message = args
+                    receivers = list(self.channels.get(channel, ()))
+                    frame = encode_reply(["message", channel, message])
+                    for receiver in receivers:
+                        receiver.write(frame)
+                    writer.write(encode_reply(len(receivers)))
+                elif name == "GET" and len(args) == 1:
+                    value = self.keys.get(args[0])
+                    writer.write(encode_reply(None if value is None else str(value)))
+                elif name == "SET" and len(args) >= 2:
+                    writer.write(encode_reply(self._set(args)))
+                elif name == "DEL" and args:
+                    writer.write(encode_reply(sum(self.keys.delete(key) for key in args)))
+                elif name == "INCR" and len(args) == 1:
+                    try:
+                        writer.write(encode_reply(self.keys.incr(args[0])[0]))
+                    except ValueError:
+                        writer.write(encode_reply(NOT_INTEGER))
+                elif name == "PEXPIRE" and len(args) == 2 and args[1].lstrip("-").isdigit():
+                    writer.write(encode_reply(self.keys.expire(args[0], int(args[1]) / 1000)))
+                elif name == "PTTL" and len(args) == 1:
+                    remaining = self.keys.ttl(args[0])
+                    if remaining is None:
+                        writer.write(encode_reply(-2))
+                    else:
+                        writer.write(encode_reply(-1 if remaining == math.inf else math.ceil(remaining * 1000)))
+                elif name == "QUIT":
+                    writer.write(encode_reply("OK"))
+                    break
+                else:
+                    writer.write(encode_reply(RespError(f"ERR unknown command '{name}'")))
+                await writer.drain()
+        finally:
+            for channel in subscriptions:
+                self._remove(channel, writer)
+            writer.close()
+
+    def _set(self, args):
+        """SET key value [EX seconds | PX milliseconds]"""
+        key, value, options = args[0], args[1], [option.upper() for option in args[2:]]
+        ttl = None
+        if options:
+            if len(options) != 2 or options[0] not in ("EX", "PX") or not options[1].isdigit():
+                return RespError("ERR syntax error")
+            ttl = int(options[1]) / (1 if options[0] == "EX" else 1000)
+        self.keys.set(key, value, ttl)
+        return "OK"
+
+    def _remove(self, channel, writer):
+        subscribers = self.channels.get(channel)
+        if subscribers:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self.channels[channel]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 6380, unix_path: str = None):
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+async def serve(host: str, port: int, unix_path: str = None):
+    server = await PubSubServer().start(host, port, unix_path)
+    print(f"📡 pub/sub stand-in listening on {unix_path or f'{host}:{port}'}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    parser.add_argument("--unix", dest="unix_path")
+    options = parser.parse_args()
+    asyncio.run(serve(options.host, options.port, options.unix_path))
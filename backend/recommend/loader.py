@@ -0,0 +1,79 @@
+"""
+Loading the skill-match matrices (recommend/skill_matrix.py) from the
+database and keeping them current. New projects reach the project matrix
+through search.loader.index_document; profile skills are edited by the
+client directly in Supabase, so the developer matrix is re-read every
+RECOMMEND_REFRESH_SECONDS (only changed rows are rewritten).
+"""
+import asyncio
+import os
+
+from storage.query import supabase, run_query
+from recommend.skill_matrix import project_matrix, developer_matrix, PROJECT_SKILL_WEIGHTS
+from recommend.skill_matrix import project_skill_weights, profile_skill_weights
+
+RECOMMEND_REFRESH_SECONDS = float(os.getenv("RECOMMEND_REFRESH_SECONDS", "600"))
+MATRIX_LOAD_PAGE = int(os.getenv("MATRIX_LOAD_PAGE", "10000"))
+PROJECT_MATCH_FIELDS = ("created_by", "status", "is_public", "is_recruiting", *PROJECT_SKILL_WEIGHTS)
+
+
+def recommendable(project: dict) -> bool:
+    """Only open, public projects are suggested to developers"""
+    return (
+        project.get("is_public") is not False
+        and project.get("is_recruiting") is not False
+        and (project.get("status") or "active") == "active"
+    )
+
+
+def add_project_to_matrix(project: dict, loading: bool = False):
+    project_matrix.add(
+        project["id"], project_skill_weights(project), recommendable(project), project.get("created_by"), loading
+    )
+
+
+def add_developer_to_matrix(profile: dict, loading: bool = False):
+    developer_matrix.add(profile["id"], profile_skill_weights(profile.get("skills")), loading=loading)
+
+
+async def _load_matrix(table: str, columns: str, add_row, loading: bool):
+    last_id = None
+    while True:
+        query = supabase.table(table).select(columns)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        response = await run_query(query.order("id").limit(MATRIX_LOAD_PAGE))
+        rows = response.data or []
+        for row in rows:
+            add_row(row, loading)
+        if len(rows) < MATRIX_LOAD_PAGE:
+            break
+        last_id = rows[-1]["id"]
+
+
+async def load_skill_matrices():
+    """Page app_projects and profile skills into the recommendation matrices"""
+    for name, matrix, table, columns, add_row in (
+        ("projects", project_matrix, "app_projects", ", ".join(["id", *PROJECT_MATCH_FIELDS]), add_project_to_matrix),
+        ("developers", developer_matrix, "profiles", "id, skills", add_developer_to_matrix),
+    ):
+        matrix.begin_load()
+        try:
+            await _load_matrix(table, columns, add_row, loading=True)
+            matrix.finish_load()
+            print(f"🧭 Skill matrix for {name} loaded: {matrix.stats()}")
+        except Exception as e:
+            matrix.loading = False
+            print(f"❌ Error loading {name} skill matrix, falling back to queries: {e}")
+
+
+async def run_developer_matrix_refresh(interval: float = RECOMMEND_REFRESH_SECONDS):
+    """Background job: pick up profile skills edited outside the API"""
+    while True:
+        await asyncio.sleep(interval)
+        if not developer_matrix.ready:
+            continue
+        try:
+            await _load_matrix("profiles", "id, skills", add_developer_to_matrix, loading=False)
+        except Exception as e:
+            print(f"❌ Error refreshing developer skill matrix: {e}")
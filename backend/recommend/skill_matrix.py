@@ -0,0 +1,253 @@
+"""
+Skill-match recommendations over sparse NumPy matrices.
+
+A SkillMatrix holds one row per project (or developer) over the columns of
+the shared skill vocabulary. The non-zero weights are stored twice:
+
+- by row (CSR): each row's skill ids and weights, contiguous in buffers that
+  double when full, so new rows append in amortized O(1);
+- by column: per skill, the rows holding it and their weights.
+
+Scoring a query against every row is one batched pass over the columns of
+the query's skills only: concatenate their entries, combine each with the
+query's weight, and sum per row with np.bincount. Per-row totals and norms
+are kept up to date on insert, so the denominators are a vector operation.
+
+Metrics:
+- weighted Jaccard: sum(min(q, r)) / sum(max(q, r)), using
+  sum(max) = sum(q) + sum(r) - sum(min) so only the min needs gathering;
+- cosine: q . r / (|q| |r|).
+
+Rows can be replaced (re-adding a key) or removed; their old entries stay
+in the buffers but are masked out, and the buffers are compacted once dead
+entries outnumber live ones.
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from recommend.vocabulary import SkillVocabulary, skill_vocabulary
+
+METRICS = ("jaccard", "cosine")
+# A skill listed under several project fields counts with its highest weight
+PROJECT_SKILL_WEIGHTS = {"required_skills": 1.0, "tech_stack": 0.8, "programming_languages": 0.6}
+
+
+def _grow(buffer: np.ndarray, needed: int) -> np.ndarray:
+    if needed <= len(buffer):
+        return buffer
+    grown = np.empty(max(needed, 2 * len(buffer)), dtype=buffer.dtype)
+    grown[:len(buffer)] = buffer
+    return grown
+
+
+def project_skill_weights(row: dict, vocabulary: SkillVocabulary = skill_vocabulary) -> Dict[int, float]:
+    weights: Dict[int, float] = {}
+    for field, weight in PROJECT_SKILL_WEIGHTS.items():
+        for skill_id in vocabulary.encode(row.get(field) or ()):
+            weights[skill_id] = max(weights.get(skill_id, 0.0), weight)
+    return weights
+
+
+def profile_skill_weights(skills: Iterable, vocabulary: SkillVocabulary = skill_vocabulary) -> Dict[int, float]:
+    return {skill_id: 1.0 for skill_id in vocabulary.encode(skills or ())}
+
+
+class SkillMatrix:
+    def __init__(self, vocabulary: SkillVocabulary = skill_vocabulary, capacity: int = 1024):
+        self.vocabulary = vocabulary
+        self.keys: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.owners: Dict[str, List[int]] = {}
+        # By row
+        self.columns = np.empty(capacity * 8, dtype=np.int32)
+        self.weights = np.empty(capacity * 8, dtype=np.float32)
+        self.starts = np.empty(capacity, dtype=np.int64)
+        self.totals = np.empty(capacity, dtype=np.float32)
+        self.norms = np.empty(capacity, dtype=np.float32)
+        self.active = np.empty(capacity, dtype=bool)
+        # By column
+        self.posting_rows: List[array] = []
+        self.posting_weights: List[array] = []
+        self.nnz = 0
+        self.dead = 0
+        self.ready = False
+        self.loading = False
+        self.pending = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    # Loading
+
+    def begin_load(self):
+        self.__init__(self.vocabulary)
+        self.loading = True
+
+    def finish_load(self):
+        self.loading = False
+        self.ready = True
+        pending, self.pending = self.pending, []
+        for args in pending:
+            self.add(*args)
+
+    # Writes
+
+    def add(self, key: str, skills: Dict[int, float], active: bool = True,
+            owner: Optional[str] = None, loading: bool = False):
+        """
+        Add or replace the row for key. Inactive rows (closed or private
+        projects) stay indexed but are never recommended.
+        """
+        if self.loading and not loading:
+            self.pending.append((key, skills, active, owner))
+            return
+        key = str(key)
+        row = self.rows.get(key)
+        if row is not None and self._unchanged(row, skills, active):
+            # Periodic refreshes re-add every row; only real changes cost an entry
+            return
+        self.remove(key)
+
+        row = len(self.keys)
+        start, end = self.nnz, self.nnz + len(skills)
+        self.columns = _grow(self.columns, end)
+        self.weights = _grow(self.weights, end)
+        for buffer in ("starts", "totals", "norms", "active"):
+            setattr(self, buffer, _grow(getattr(self, buffer), row + 1))
+
+        total = squares = 0.0
+        for offset, (skill_id, weight) in enumerate(skills.items(), start):
+            self.columns[offset] = skill_id
+            self.weights[offset] = weight
+            total += weight
+            squares += weight * weight
+            while skill_id >= len(self.posting_rows):
+                self.posting_rows.append(array("i"))
+                self.posting_weights.append(array("f"))
+            self.posting_rows[skill_id].append(row)
+            self.posting_weights[skill_id].append(weight)
+        self.starts[row] = start
+        self.totals[row] = total
+        self.norms[row] = squares ** 0.5
+        self.active[row] = active and bool(skills)
+        self.nnz = end
+
+        self.keys.append(key)
+        self.rows[key] = row
+        if owner:
+            self.owners.setdefault(str(owner), []).append(row)
+
+    def remove(self, key: str):
+        row = self.rows.pop(str(key), None)
+        if row is None:
+            return
+        self.keys[row] = None
+        self.active[row] = False
+        self.dead += self._row_end(row) - int(self.starts[row])
+        if self.dead > self.nnz // 2 and self.dead > 4096:
+            self.compact()
+
+    def _row_end(self, row: int) -> int:
+        return int(self.starts[row + 1]) if row + 1 < len(self.keys) else self.nnz
+
+    def compact(self):
+        """Rebuild the buffers without removed rows"""
+        live = [(key, row) for row, key in enumerate(self.keys) if key is not None]
+        rows = [(key, self._row_skills(row), bool(self.active[row])) for key, row in live]
+        owners = {row: owner for owner, owned in self.owners.items() for row in owned}
+        owner_of = {key: owners.get(row) for key, row in live}
+        ready, loading, pending = self.ready, self.loading, self.pending
+        self.__init__(self.vocabulary, capacity=max(len(rows), 1024))
+        for key, skills, active in rows:
+            self.add(key, skills, active, owner_of[key])
+        self.ready, self.loading, self.pending = ready, loading, pending
+
+    def _unchanged(self, row: int, skills: Dict[int, float], active: bool) -> bool:
+        if bool(self.active[row]) != (active and bool(skills)):
+            return False
+        stored = self._row_skills(row)
+        return stored.keys() == skills.keys() and all(abs(stored[k] - w) < 1e-6 for k, w in skills.items())
+
+    def _row_skills(self, row: int) -> Dict[int, float]:
+        start, end = int(self.starts[row]), self._row_end(row)
+        return dict(zip(self.columns[start:end].tolist(), self.weights[start:end].tolist()))
+
+    # Reads
+
+    def _candidates(self, query: Dict[int, float], metric: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Active rows sharing a skill with query, and their scores"""
+        rows = len(self.keys)
+        columns = [skill_id for skill_id in query if skill_id < len(self.posting_rows)]
+        if not columns or not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        row_of = np.concatenate([np.frombuffer(self.posting_rows[s], dtype=np.int32) for s in columns])
+        weights = [np.frombuffer(self.posting_weights[s], dtype=np.float32) for s in columns]
+        if metric == "cosine":
+            combined = np.concatenate([w * query[s] for s, w in zip(columns, weights)])
+        else:
+            combined = np.concatenate([np.minimum(w, query[s]) for s, w in zip(columns, weights)])
+        shared = np.bincount(row_of, weights=combined, minlength=rows)
+
+        candidates = np.flatnonzero((shared > 0) & self.active[:rows])
+        shared = shared[candidates]
+        query_weights = np.fromiter(query.values(), dtype=np.float64, count=len(query))
+        if metric == "cosine":
+            scores = shared / (self.norms[candidates] * np.sqrt(np.dot(query_weights, query_weights)))
+        else:
+            scores = shared / (self.totals[candidates] + query_weights.sum() - shared)
+        return candidates, scores
+
+    def scores(self, query: Dict[int, float], metric: str = "jaccard") -> np.ndarray:
+        """Similarity of query to every row (0 for inactive rows)"""
+        scores = np.zeros(len(self.keys))
+        candidates, candidate_scores = self._candidates(query, metric)
+        scores[candidates] = candidate_scores
+        return scores
+
+    def top(self, query: Dict[int, float], limit: int = 10, metric: str = "jaccard",
+            exclude_owner: Optional[str] = None, exclude: Iterable[str] = ()) -> List[dict]:
+        """
+        Best `limit` rows for query: [{"id", "score", "matched"}], where
+        matched names the query skills the row shares.
+        """
+        candidates, scores = self._candidates(query, metric)
+        excluded = list(self.owners.get(str(exclude_owner), [])) if exclude_owner else []
+        excluded += [self.rows[str(key)] for key in exclude if str(key) in self.rows]
+        if excluded:
+            keep = ~np.isin(candidates, excluded)
+            candidates, scores = candidates[keep], scores[keep]
+
+        if len(candidates) > limit:
+            # Everything tied with the limit-th best stays in for the tie-break
+            cut = len(scores) - limit
+            keep = scores >= np.partition(scores, cut)[cut]
+            candidates, scores = candidates[keep], scores[keep]
+        # Highest score first, older rows first on ties
+        order = np.lexsort((candidates, -scores))[:limit]
+        ranked = zip(scores[order].tolist(), candidates[order].tolist())
+        names = self.vocabulary.names
+        return [
+            {
+                "id": self.keys[row],
+                "score": round(score, 4),
+                "matched": [names[skill_id] for skill_id in self._row_skills(row) if skill_id in query],
+            }
+            for score, row in ranked
+        ]
+
+    def stats(self) -> dict:
+        buffers = (self.columns, self.weights, self.starts, self.totals, self.norms, self.active)
+        postings = sum(len(rows) * 8 for rows in self.posting_rows)
+        return {
+            "ready": self.ready,
+            "rows": len(self.rows),
+            "entries": self.nnz - self.dead,
+            "skills": len(self.vocabulary),
+            "buffer_bytes": sum(buffer.nbytes for buffer in buffers) + postings,
+        }
+
+
+project_matrix = SkillMatrix()
+developer_matrix = SkillMatrix()
@@ -0,0 +1,79 @@
+"""
+Shared skill vocabulary.
+
+Skills come from free-text inputs (profile skills, a project's required
+skills / tech stack / languages, resumes), so "ReactJS", "react.js" and
+"React" must land on the same id. normalize() lowercases, trims, collapses
+whitespace and maps common aliases; SkillVocabulary interns the result to a
+dense int id used as a column index by the recommendation matrices.
+"""
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nextjs": "next.js",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "tf": "tensorflow",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "aws lambda": "lambda",
+}
+
+SPACES = re.compile(r"\s+")
+
+
+def normalize(skill) -> Optional[str]:
+    if skill is None:
+        return None
+    name = SPACES.sub(" ", str(skill).strip().lower())
+    if not name:
+        return None
+    return ALIASES.get(name, name)
+
+
+class SkillVocabulary:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        # Interning happens on the event loop and in executor threads (resume parsing)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def id(self, skill, grow: bool = True) -> Optional[int]:
+        name = normalize(skill)
+        if name is None:
+            return None
+        skill_id = self.ids.get(name)
+        if skill_id is None and grow:
+            with self.lock:
+                skill_id = self.ids.get(name)
+                if skill_id is None:
+                    skill_id = len(self.names)
+                    self.names.append(name)
+                    self.ids[name] = skill_id
+        return skill_id
+
+    def encode(self, skills: Iterable, grow: bool = True) -> List[int]:
+        """Distinct ids of the known (or, with grow, all) skills, in input order"""
+        ids = (self.id(skill, grow) for skill in skills or ())
+        return list(dict.fromkeys(skill_id for skill_id in ids if skill_id is not None))
+
+
+skill_vocabulary = SkillVocabulary()
@@ -0,0 +1,221 @@
+"""
+Resume ingest: upload -> spool file -> process pool -> profile skills.
+
+POST /api/profile/resume copies the upload into a spool file under
+RESUME_SPOOL_DIR, one chunk at a time on a worker thread (the multipart
+parser has already rolled anything over 1 MB to disk, so an upload is never
+held in memory whole), records a queued row in resume_jobs and returns it.
+A background task then parses the file in a pool of RESUME_WORKERS
+processes: PDF and DOCX parsing is CPU-bound pure Python, so it runs
+outside this process's GIL and the event loop keeps serving. The skills
+found are matched against the shared skill vocabulary and the ones the
+profile doesn't list yet are appended to it.
+
+At most RESUME_WORKERS jobs are in the pool at once, so the
+RESUME_PARSE_TIMEOUT clock only runs while a file is actually being
+parsed. A parse can't be cancelled once it runs (a hostile PDF can keep
+pypdf looping), so on timeout the pool's processes are terminated and a
+fresh pool started; a job that was sharing the killed pool is retried once.
+
+Skills are matched against the vocabulary load_skill_matrices fills at
+startup. A job waits up to RESUME_VOCABULARY_WAIT seconds for it and
+otherwise fails, rather than report a resume as having no skills.
+
+The client polls GET /api/profile/resume/{job_id}, or listens for the
+`resume_parsed` frame on its notification stream / socket.
+"""
+import asyncio
+import datetime
+import multiprocessing
+import os
+import tempfile
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from db import create_resume_job, update_resume_job, add_profile_skills, publish_to_user
+from recommend.vocabulary import skill_vocabulary
+from recommend.skill_matrix import project_matrix, developer_matrix
+from resume.parser import parse_resume, PDF, DOCX
+
+RESUME_WORKERS = int(os.getenv("RESUME_WORKERS", "2"))
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(5 * 2**20)))
+RESUME_MAX_PENDING = int(os.getenv("RESUME_MAX_PENDING", "32"))
+RESUME_PARSE_TIMEOUT = float(os.getenv("RESUME_PARSE_TIMEOUT", "60"))
+RESUME_VOCABULARY_WAIT = float(os.getenv("RESUME_VOCABULARY_WAIT", "30"))
+RESUME_SPOOL_DIR = os.getenv("RESUME_SPOOL_DIR") or tempfile.gettempdir()
+CHUNK_BYTES = 256 * 1024
+EXTENSIONS = {".pdf": PDF, ".docx": DOCX}
+# What each kind's bytes start with (a DOCX is a zip archive)
+SIGNATURES = {PDF: b"%PDF", DOCX: b"PK\x03\x04"}
+
+
+class ResumeTooLarge(ValueError):
+    pass
+
+
+class IngestBusy(Exception):
+    pass
+
+
+class VocabularyNotReady(Exception):
+    pass
+
+
+def _spool(source, kind: str, max_bytes: int) -> str:
+    """Copy an upload's file object into a new spool file and return its path"""
+    descriptor, path = tempfile.mkstemp(prefix="resume-", suffix=f".{kind}", dir=RESUME_SPOOL_DIR)
+    size = 0
+    try:
+        with os.fdopen(descriptor, "wb") as spool:
+            while chunk := source.read(CHUNK_BYTES):
+                if size == 0 and not chunk.startswith(SIGNATURES[kind]):
+                    raise ValueError(f"Not a {kind.upper()} file")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResumeTooLarge(f"Resumes are limited to {max_bytes // 2**20} MB")
+                spool.write(chunk)
+        if size == 0:
+            raise ValueError("Empty file")
+        return path
+    except BaseException:
+        os.unlink(path)
+        raise
+
+
+class ResumeIngest:
+    def __init__(self, workers: int = RESUME_WORKERS, max_bytes: int = RESUME_MAX_BYTES,
+                 max_pending: int = RESUME_MAX_PENDING, timeout: float = RESUME_PARSE_TIMEOUT,
+                 vocabulary_wait: float = RESUME_VOCABULARY_WAIT):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.vocabulary_wait = vocabulary_wait
+        self.executor = None
+        # Pools this instance killed on purpose, so their BrokenProcessPool is retried
+        self.terminated = weakref.WeakSet()
+        self.slots = None
+        self.tasks = set()
+        self.parsed = 0
+        self.failed = 0
+        self.timeouts = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            # spawn: forking a process that runs threads and an event loop is unsafe
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    def _discard_pool(self, executor: ProcessPoolExecutor, terminate: bool = False):
+        """Stop using executor; with terminate, kill its processes too (a running parse can't be cancelled)"""
+        if self.executor is executor:
+            self.executor = None
+        if terminate:
+            self.terminated.add(executor)
+            if hasattr(executor, "terminate_workers"):
+                executor.terminate_workers()
+                return
+            # Before Python 3.14 the worker processes are only reachable through the pool's internals
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        # Futures still in the pool fail with BrokenProcessPool rather than being cancelled
+        executor.shutdown(wait=False)
+
+    async def _wait_for_vocabulary(self) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.vocabulary_wait
+        while not (project_matrix.ready and developer_matrix.ready):
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.5)
+        return True
+
+    async def _parse(self, path: str, kind: str) -> dict:
+        """Parse in the pool, killing it on timeout; retried once if another job's timeout killed it"""
+        loop = asyncio.get_running_loop()
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.workers)
+        async with self.slots:
+            for attempt in range(2):
+                executor = self._executor()
+                parsing = loop.run_in_executor(executor, parse_resume, path, kind, list(skill_vocabulary.names))
+                try:
+                    return await asyncio.wait_for(parsing, self.timeout)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    self._discard_pool(executor, terminate=True)
+                    raise
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory on a hostile file), or a timeout killed the pool
+                    self._discard_pool(executor)
+                    if attempt or executor not in self.terminated:
+                        raise
+
+    async def submit(self, user_id: str, upload) -> dict:
+        """
+        Spool the upload and queue it for parsing; returns the job row (None
+        if it couldn't be recorded). Raises ValueError for an unsupported or
+        empty file, ResumeTooLarge, and IngestBusy when RESUME_MAX_PENDING
+        jobs are already waiting.
+        """
+        extension = os.path.splitext(upload.filename or "")[1].lower()
+        kind = EXTENSIONS.get(extension)
+        if kind is None:
+            raise ValueError("Upload a PDF or DOCX file")
+        if upload.size is not None and upload.size > self.max_bytes:
+            raise ResumeTooLarge(f"Resumes are limited to {self.max_bytes // 2**20} MB")
+        if len(self.tasks) >= self.max_pending:
+            raise IngestBusy("Too many resumes are being processed, try again shortly")
+
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(None, _spool, upload.file, kind, self.max_bytes)
+        job = await create_resume_job(user_id, upload.filename)
+        if job is None:
+            os.unlink(path)
+            return None
+        task = asyncio.create_task(self._process(job, user_id, path, kind))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return job
+
+    async def _process(self, job: dict, user_id: str, path: str, kind: str):
+        try:
+            if not await self._wait_for_vocabulary():
+                raise VocabularyNotReady()
+            await update_resume_job(job["id"], {"status": "processing"})
+            result = await self._parse(path, kind)
+            added = await add_profile_skills(user_id, result["skills"])
+            if added is None:
+                fields = {"status": "failed", "error": "Could not update the profile"}
+            else:
+                fields = {"status": "done", "skills": result["skills"], "added_skills": added}
+        except VocabularyNotReady:
+            fields = {"status": "failed", "error": "Skill matching isn't available yet, try again shortly"}
+        except asyncio.TimeoutError:
+            fields = {"status": "failed", "error": "Timed out reading the file"}
+        except BrokenProcessPool:
+            fields = {"status": "failed", "error": "Could not read the file"}
+        except Exception as e:
+            print(f"❌ Error parsing resume {job['id']}: {e}")
+            fields = {"status": "failed", "error": "Could not read the file"}
+        finally:
+            os.unlink(path)
+
+        fields["finished_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        if fields["status"] == "done":
+            self.parsed += 1
+        else:
+            self.failed += 1
+        await update_resume_job(job["id"], fields)
+        await publish_to_user(user_id, {"type": "resume_parsed", "job": {**job, **fields}})
+
+    async def close(self):
+        """Stop parsing (used on shutdown); unfinished jobs stay queued/processing"""
+        for task in list(self.tasks):
+            task.cancel()
+        if self.executor is not None:
+            self._discard_pool(self.executor, terminate=True)
+
+
+resume_ingest = ResumeIngest()
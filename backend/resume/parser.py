@@ -0,0 +1,71 @@
+"""
+Resume text extraction and skill matching.
+
+Runs inside the resume process pool (see resume/ingest.py), so everything
+here is a plain function over a file path and picklable arguments, with no
+event loop or database access.
+
+Skills are matched against the names of the shared skill vocabulary: the
+text is split into word runs that keep skill punctuation ("c++", "node.js",
+"c#"), every run of 1 to MAX_WORDS words is normalized the same way
+vocabulary entries are, and the ones that are vocabulary names count.
+Very short names ("Go", "R", "C") only count when capitalized, so prose
+like "go live" doesn't match.
+"""
+import re
+from collections import Counter
+from typing import Iterable, List
+
+from recommend.vocabulary import normalize
+
+PDF = "pdf"
+DOCX = "docx"
+MAX_WORDS = 3
+MAX_SKILLS = 50
+SHORT_NAME = 2
+
+WORDS = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#.\-]*")
+
+
+def extract_text(path: str, kind: str) -> str:
+    if kind == PDF:
+        from pypdf import PdfReader
+
+        return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    if kind == DOCX:
+        import docx
+
+        document = docx.Document(path)
+        lines = [paragraph.text for paragraph in document.paragraphs]
+        # Skills sections are often laid out as tables
+        for table in document.tables:
+            for row in table.rows:
+                lines.extend(cell.text for cell in row.cells)
+        return "\n".join(lines)
+    raise ValueError(f"Unsupported resume type {kind!r}")
+
+
+def find_skills(text: str, names: Iterable[str], limit: int = MAX_SKILLS) -> List[str]:
+    """Vocabulary names mentioned in text, most mentioned first"""
+    names = set(names)
+    words = [word.rstrip(".-") for word in WORDS.findall(text)]
+    counts = Counter()
+    for start, word in enumerate(words):
+        for length in range(1, MAX_WORDS + 1):
+            phrase = " ".join(words[start:start + length])
+            if length > 1 and start + length > len(words):
+                break
+            name = normalize(phrase)
+            if name not in names:
+                continue
+            if len(name) <= SHORT_NAME and not word[:1].isupper():
+                continue
+            counts[name] += 1
+    # Counter keeps first-seen order among equal counts
+    return [name for name, _ in counts.most_common(limit)]
+
+
+def parse_resume(path: str, kind: str, names: List[str]) -> dict:
+    """Process-pool entry point: {"skills", "characters"} for the file at path"""
+    text = extract_text(path, kind)
+    return {"skills": find_skills(text, names), "characters": len(text)}
@@ -0,0 +1,305 @@
+"""
+Faceted project discovery index.
+
+Every (field, value) pair of the facet columns (the skill / stack / tag
+arrays and a few scalar columns) gets a sorted array of internal doc
+numbers. Values held by at least DENSE_MIN docs also keep a bitmap: a
+Python int with bit n set for doc n, so AND / OR / counting are single C
+operations over the whole corpus. Rare values are turned into a bitmap
+only when a query touches them.
+
+Values match case-insensitively and are reported as first seen.
+
+A filter is a list of clauses, each `field:value|value...`: values within a
+clause are ORed, clauses are ANDed. Docs are numbered in created_at order
+(the bulk load pages on (created_at, id) and new projects come last), so
+the highest set bits of the result are the newest projects and a page is
+read off from the top.
+
+Facet counts are disjunctive: a field's counts apply every clause except
+the field's own, so picking "python" still shows how many projects "rust"
+would add. Small bases are counted through each doc's values; large ones
+by ANDing value bitmaps, most frequent values first, stopping once no
+remaining value can enter the top `facet_limit`.
+"""
+import heapq
+from array import array
+from collections import Counter
+from itertools import chain
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+ARRAY_FIELDS = ("required_skills", "tech_stack", "programming_languages", "tags")
+SCALAR_FIELDS = ("domain", "difficulty_level", "is_remote", "status")
+FACET_FIELDS = ARRAY_FIELDS + SCALAR_FIELDS
+DENSE_MIN = 64
+FORWARD_COUNT_MAX = 2000
+MAX_CLAUSES = 16
+MAX_CLAUSE_VALUES = 32
+
+
+def facet_value(value) -> Optional[str]:
+    """Display form of a value: stripped, booleans as true/false"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    value = str(value).strip()
+    return value or None
+
+
+def parse_filters(expressions: List[str]) -> List[Tuple[str, List[str]]]:
+    """`field:a|b` strings -> [(field, [a, b])]; raises ValueError"""
+    if len(expressions) > MAX_CLAUSES:
+        raise ValueError(f"At most {MAX_CLAUSES} filters")
+    clauses = []
+    for expression in expressions:
+        field, _, raw = expression.partition(":")
+        field = field.strip()
+        if field not in FACET_FIELDS:
+            raise ValueError(f"Unknown facet {field!r}")
+        values = list({value.lower(): value for value in map(facet_value, raw.split("|")) if value}.values())
+        if not values or len(values) > MAX_CLAUSE_VALUES:
+            raise ValueError(f"Filter {expression!r} needs 1 to {MAX_CLAUSE_VALUES} values")
+        clauses.append((field, values))
+    return clauses
+
+
+def _bits_of(bitmap: int):
+    """Set bit positions of a bitmap, lowest first"""
+    raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for index, byte in enumerate(raw):
+        while byte:
+            low = byte & -byte
+            yield index * 8 + low.bit_length() - 1
+            byte ^= low
+
+
+class FacetIndex:
+    def __init__(self, fields=FACET_FIELDS):
+        self.fields = fields
+        self.doc_keys: List[Optional[str]] = []
+        self.doc_numbers: Dict[str, int] = {}
+        self.created_at: List[str] = []
+        self.doc_values: List[Tuple[int, ...]] = []
+        self.live = 0
+        self.value_ids: Dict[Tuple[str, str], int] = {}
+        self.value_names: List[Tuple[str, str]] = []
+        self.postings: List[array] = []
+        self.bitmaps: Dict[int, int] = {}
+        self.field_values: Dict[str, List[int]] = {field: [] for field in fields}
+        self.frequency_order: Dict[str, List[int]] = {}
+        self.ready = False
+        self.loading = False
+        self.pending = []
+
+    # Loading
+
+    def begin_load(self):
+        self.__init__(self.fields)
+        self.loading = True
+
+    def finish_load(self):
+        self.live = self._build_bitmap(doc for doc, key in enumerate(self.doc_keys) if key is not None)
+        self.build_bitmaps()
+        self.loading = False
+        self.ready = True
+        pending, self.pending = self.pending, []
+        for row in pending:
+            self.add(row)
+
+    # Writes
+
+    def _value_id(self, field: str, value: str) -> int:
+        # Matched case-insensitively, shown as first seen
+        key = (field, value.lower())
+        vid = self.value_ids.get(key)
+        if vid is None:
+            vid = len(self.value_names)
+            self.value_ids[key] = vid
+            self.value_names.append((field, value))
+            self.postings.append(array("i"))
+            self.field_values[field].append(vid)
+        return vid
+
+    def add(self, row: dict, loading: bool = False):
+        """
+        Index (or re-index) a project row. Rows from the bulk load pass
+        loading=True; others arriving during the load are replayed after it,
+        so doc numbers stay in created_at order.
+        """
+        if self.loading and not loading:
+            self.pending.append(row)
+            return
+        key = str(row["id"])
+        self.remove(key)
+
+        doc = len(self.doc_keys)
+        self.doc_keys.append(key)
+        self.doc_numbers[key] = doc
+        self.created_at.append(str(row.get("created_at") or ""))
+        if not loading:
+            self.live |= 1 << doc
+
+        vids = set()
+        for field in self.fields:
+            raw = row.get(field)
+            for value in raw if isinstance(raw, (list, tuple)) else [raw]:
+                value = facet_value(value)
+                if value is not None:
+                    vids.add(self._value_id(field, value))
+        for vid in vids:
+            self.postings[vid].append(doc)
+            if vid in self.bitmaps:
+                self.bitmaps[vid] |= 1 << doc
+            elif len(self.postings[vid]) >= DENSE_MIN and not loading:
+                self.bitmaps[vid] = self._build_bitmap(self.postings[vid])
+        self.doc_values.append(tuple(vids))
+        self.frequency_order.clear()
+
+    def remove(self, key: str):
+        doc = self.doc_numbers.pop(str(key), None)
+        if doc is not None:
+            self.doc_keys[doc] = None
+            self.live &= ~(1 << doc)
+
+    def build_bitmaps(self):
+        """Bitmaps for every dense value, once after a bulk load"""
+        for vid, postings in enumerate(self.postings):
+            if len(postings) >= DENSE_MIN:
+                self.bitmaps[vid] = self._build_bitmap(postings)
+
+    # Reads
+
+    def _by_frequency(self, field: str) -> List[int]:
+        order = self.frequency_order.get(field)
+        if order is None:
+            order = self.frequency_order[field] = sorted(
+                self.field_values[field], key=lambda vid: -len(self.postings[vid])
+            )
+        return order
+
+    def _build_bitmap(self, postings) -> int:
+        raw = bytearray((len(self.doc_keys) + 7) // 8)
+        for doc in postings:
+            raw[doc >> 3] |= 1 << (doc & 7)
+        return int.from_bytes(raw, "little")
+
+    def _bitmap(self, vid: int) -> int:
+        bitmap = self.bitmaps.get(vid)
+        return self._build_bitmap(self.postings[vid]) if bitmap is None else bitmap
+
+    def _clause_bitmap(self, field: str, values: List[str]) -> int:
+        bitmap = 0
+        for value in values:
+            vid = self.value_ids.get((field, value.lower()))
+            if vid is not None:
+                bitmap |= self._bitmap(vid)
+        return bitmap
+
+    def _position(self, cursor: Tuple[str, str]) -> int:
+        """Doc number to continue below for a (created_at, id) cursor"""
+        created_at, key = cursor
+        doc = self.doc_numbers.get(key)
+        if doc is not None:
+            return doc
+        # Not indexed here (yet): the first doc created at or after it
+        return bisect_left(self.created_at, created_at)
+
+    def _top(self, counts: Dict[int, int], facet_limit: int) -> List[dict]:
+        best = heapq.nsmallest(facet_limit, counts.items(), key=lambda item: (-item[1], self.value_names[item[0]][1]))
+        return [{"value": self.value_names[vid][1], "count": count} for vid, count in best]
+
+    def _counts(self, fields: List[str], base: int, facet_limit: int) -> Dict[str, List[dict]]:
+        """Top values of each field among the docs in base"""
+        size = base.bit_count()
+        if not size:
+            return {field: [] for field in fields}
+        if size <= FORWARD_COUNT_MAX:
+            # Few docs: one pass over their values counts every field at once
+            doc_values = self.doc_values
+            counts = Counter(chain.from_iterable(doc_values[doc] for doc in _bits_of(base)))
+            by_field: Dict[str, Dict[int, int]] = {field: {} for field in fields}
+            for vid, count in counts.items():
+                field_counts = by_field.get(self.value_names[vid][0])
+                if field_counts is not None:
+                    field_counts[vid] = count
+            return {field: self._top(by_field[field], facet_limit) for field in fields}
+
+        result = {}
+        for field in fields:
+            # A value can't count more docs than it has postings, so stop once
+            # the remaining values are too small to reach the top facet_limit
+            counts, threshold = {}, []
+            for vid in self._by_frequency(field):
+                if len(threshold) >= facet_limit and len(self.postings[vid]) < threshold[0]:
+                    break
+                count = (base & self._bitmap(vid)).bit_count()
+                if count:
+                    counts[vid] = count
+                    if len(threshold) < facet_limit:
+                        heapq.heappush(threshold, count)
+                    elif count > threshold[0]:
+                        heapq.heapreplace(threshold, count)
+            result[field] = self._top(counts, facet_limit)
+        return result
+
+    def query(
+        self,
+        clauses: List[Tuple[str, List[str]]],
+        limit: int = 20,
+        cursor: Tuple[str, str] = None,
+        facets: List[str] = None,
+        facet_limit: int = 10,
+    ) -> dict:
+        """
+        Newest live projects matching every clause. Returns {"ids", "total",
+        "facets", "has_more"}; facets maps each requested field to its top
+        values with counts.
+        """
+        clause_bitmaps = [(field, self._clause_bitmap(field, values)) for field, values in clauses]
+        result = self.live
+        for _, bitmap in clause_bitmaps:
+            result &= bitmap
+
+        window = result if cursor is None else result & ((1 << self._position(cursor)) - 1)
+        docs = []
+        while window and len(docs) <= limit:
+            top = window.bit_length() - 1
+            docs.append(top)
+            window ^= 1 << top
+
+        # Fields without a clause of their own all count over the result
+        counts = {}
+        shared = []
+        for field in facets if facets is not None else self.fields:
+            if not any(clause_field == field for clause_field, _ in clause_bitmaps):
+                shared.append(field)
+                continue
+            base = self.live
+            for clause_field, bitmap in clause_bitmaps:
+                if clause_field != field:
+                    base &= bitmap
+            counts.update(self._counts([field], base, facet_limit))
+        if shared:
+            counts.update(self._counts(shared, result, facet_limit))
+        counts = {field: counts[field] for field in (facets if facets is not None else self.fields)}
+
+        return {
+            "ids": [self.doc_keys[doc] for doc in docs[:limit]],
+            "total": result.bit_count(),
+            "facets": counts,
+            "has_more": len(docs) > limit,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "documents": self.live.bit_count(),
+            "values": len(self.value_names),
+            "dense_values": len(self.bitmaps),
+            "bitmap_bytes": sum((bitmap.bit_length() + 7) // 8 for bitmap in self.bitmaps.values()),
+        }
+
+
+project_facets = FacetIndex()
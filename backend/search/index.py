@@ -0,0 +1,260 @@
+"""
+In-memory inverted index for /search/devs and /search/projects.
+
+Each searchable field is tokenized (lowercase alphanumeric words) into
+postings: per term, an array of internal doc ids (always increasing, since
+docs are numbered as they are added) and a parallel array with the term's
+field weight in that doc. A query is the AND of its terms; the last term
+also matches as a prefix, via binary search over the sorted vocabulary, so
+results show up while a word is still being typed.
+
+Ranking sums idf(term) x field weight, so a hit in `username` or `title`
+outranks one in a long description and rare terms count more than common
+ones. Results are ordered by (score desc, id asc). idf moves with every
+insert, so the cursor carries the ranking inputs of the first page as well
+as the last (score, id) returned: the terms each query word expanded to and
+their idf. Later pages rank with those, so a document added in between (or
+a different worker's index) can't shift scores and make pages skip or
+repeat results; a new document just lands on whichever page its score puts
+it on. idf is rounded to 6 decimals, and so are the scores of queries of
+three or more words, so both come out identical on every page.
+
+Documents are added incrementally. Re-adding an id replaces the old version:
+its doc number is retired and filtered out of later queries.
+"""
+import base64
+import heapq
+import json
+import math
+import re
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+
+TOKEN = re.compile(r"[0-9a-z]+")
+MAX_PREFIX_EXPANSION = 64
+MAX_WEIGHT = 255
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower()) if text else []
+
+
+def field_tokens(value) -> List[str]:
+    """Tokens of a text field or of every element of an array field"""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [token for item in value for token in tokenize(str(item))]
+    return tokenize(str(value))
+
+
+def encode_search_cursor(score: float, doc_key: str, expanded=None) -> str:
+    """expanded: per query word, the [term, idf] pairs it was ranked with"""
+    # json keeps the floats exact, so the next page resumes precisely after it
+    raw = json.dumps([score, doc_key, expanded], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str):
+    """Returns (score, doc_key, expanded or None); raises ValueError for anything that isn't a cursor we issued"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, doc_key, *rest = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        expanded = rest[0] if rest else None
+        if expanded is not None:
+            expanded = [[(str(term), float(idf)) for term, idf in pairs] for pairs in expanded]
+        return float(score), str(doc_key), expanded
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class SearchIndex:
+    def __init__(self, fields: Dict[str, int]):
+        """fields: column name -> weight (small int) of a match in that column"""
+        self.fields = fields
+        self.doc_keys: List[Optional[str]] = []
+        self.doc_numbers: Dict[str, int] = {}
+        self.postings: Dict[str, array] = {}
+        self.weights: Dict[str, array] = {}
+        self.vocabulary: List[str] = []
+        self.live = 0
+        self.ready = False
+
+    # Writes
+
+    def add(self, row: dict):
+        """Index (or re-index) a row; it must carry its `id`"""
+        key = str(row["id"])
+        previous = self.doc_numbers.get(key)
+        if previous is not None:
+            self.doc_keys[previous] = None
+            self.live -= 1
+
+        doc = len(self.doc_keys)
+        self.doc_keys.append(key)
+        self.doc_numbers[key] = doc
+        self.live += 1
+
+        term_weights: Dict[str, int] = {}
+        for field, weight in self.fields.items():
+            for token in set(field_tokens(row.get(field))):
+                term_weights[token] = min(term_weights.get(token, 0) + weight, MAX_WEIGHT)
+
+        for term, weight in term_weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = array("i")
+                self.weights[term] = array("B")
+                if self.ready:
+                    insort(self.vocabulary, term)
+            postings.append(doc)
+            self.weights[term].append(weight)
+
+    def remove(self, key: str):
+        doc = self.doc_numbers.pop(str(key), None)
+        if doc is not None:
+            self.doc_keys[doc] = None
+            self.live -= 1
+
+    def finish_load(self):
+        """Build the sorted vocabulary once after a bulk load"""
+        self.vocabulary = sorted(self.postings)
+        self.ready = True
+
+    # Reads
+
+    def _idf(self, term: str) -> float:
+        return round(math.log(1 + self.live / len(self.postings[term])), 6)
+
+    def _expand(self, term: str, prefix: bool) -> List[str]:
+        """Vocabulary terms a query term matches (itself, or up to 64 by prefix)"""
+        if not prefix:
+            return [term] if term in self.postings else []
+        start = bisect_left(self.vocabulary, term)
+        terms = []
+        for candidate in self.vocabulary[start:start + MAX_PREFIX_EXPANSION]:
+            if not candidate.startswith(term):
+                break
+            terms.append(candidate)
+        return terms
+
+    def _scores(self, terms: List[str], idfs: Dict[str, float]) -> Dict[int, float]:
+        """doc -> score for one query term over all of its expansions (best one counts)"""
+        if len(terms) == 1:
+            idf = idfs[terms[0]]
+            return {doc: idf * weight for doc, weight in zip(self.postings[terms[0]], self.weights[terms[0]])}
+        scores: Dict[int, float] = {}
+        for term in terms:
+            idf = idfs[term]
+            for doc, weight in zip(self.postings[term], self.weights[term]):
+                score = idf * weight
+                if score > scores.get(doc, 0):
+                    scores[doc] = score
+        return scores
+
+    def _probe(self, candidates: Dict[int, float], terms: List[str], idfs: Dict[str, float]) -> Dict[int, float]:
+        """Keep candidates that also match one of `terms`, via binary search in the postings"""
+        lists = [(self.postings[term], self.weights[term], idfs[term]) for term in terms]
+        matched = {}
+        for doc, score in candidates.items():
+            best = 0
+            for postings, weights, idf in lists:
+                position = bisect_left(postings, doc)
+                if position < len(postings) and postings[position] == doc:
+                    best = max(best, idf * weights[position])
+            if best:
+                matched[doc] = score + best
+        return matched
+
+    def search(self, query: str, limit: int = 20, cursor: str = None):
+        """
+        Returns (ids, next_cursor): ids of the best `limit` live docs after
+        `cursor`, most relevant first. Raises ValueError for a bad cursor.
+        """
+        after = decode_search_cursor(cursor) if cursor else None
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return [], None
+
+        if after is not None and after[2] is not None:
+            # Rank exactly as the first page did
+            expanded, idfs = self._restore(words, after[2])
+        else:
+            # The last (possibly partial) word matches as a prefix
+            expanded = [self._expand(word, index == len(words) - 1) for index, word in enumerate(words)]
+            idfs = {term: self._idf(term) for terms in expanded for term in terms}
+        sizes = [sum(len(self.postings[term]) for term in terms) for terms in expanded]
+        if not all(sizes):
+            return [], None
+
+        # Start from the rarest term; probe the rest only for those candidates
+        order = sorted(range(len(words)), key=sizes.__getitem__)
+        scores = self._scores(expanded[order[0]], idfs)
+        for index in order[1:]:
+            if len(scores) * max(sizes[index].bit_length(), 1) < sizes[index]:
+                scores = self._probe(scores, expanded[index], idfs)
+            else:
+                matches = self._scores(expanded[index], idfs)
+                scores = {doc: score + matches[doc] for doc, score in scores.items() if doc in matches}
+            if not scores:
+                return [], None
+
+        if len(words) > 2:
+            # Float sums of three or more terms depend on the order the words were combined in
+            scores = {doc: round(score, 6) for doc, score in scores.items()}
+
+        doc_keys = self.doc_keys
+        if after is None:
+            ranked = [(-score, key) for doc, score in scores.items() if (key := doc_keys[doc]) is not None]
+        else:
+            threshold = (-after[0], after[1])
+            ranked = [
+                item for doc, score in scores.items()
+                if (key := doc_keys[doc]) is not None and (item := (-score, key)) > threshold
+            ]
+        page = heapq.nsmallest(limit + 1, ranked)
+
+        has_more = len(page) > limit
+        page = page[:limit]
+        next_cursor = None
+        if has_more:
+            snapshot = [[[term, idfs[term]] for term in terms] for terms in expanded]
+            next_cursor = encode_search_cursor(-page[-1][0], page[-1][1], snapshot)
+        return [key for _, key in page], next_cursor
+
+    def _restore(self, words: List[str], snapshot):
+        """The expansions and idf a cursor was issued with, checked against this query"""
+        if len(snapshot) != len(words):
+            raise ValueError("Invalid cursor")
+        expanded, idfs = [], {}
+        for index, (word, pairs) in enumerate(zip(words, snapshot)):
+            prefix = index == len(words) - 1
+            terms = []
+            for term, idf in pairs:
+                if term != word and not (prefix and term.startswith(word)):
+                    raise ValueError("Invalid cursor")
+                # A worker that hasn't indexed the term yet has nothing to match it against
+                if term in self.postings:
+                    terms.append(term)
+                    idfs[term] = idf
+            expanded.append(terms)
+        return expanded, idfs
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "documents": self.live,
+            "terms": len(self.postings),
+            "postings": sum(len(postings) for postings in self.postings.values()),
+        }
+
+
+dev_index = SearchIndex({"username": 3, "full_name": 2})
+project_index = SearchIndex({
+    "title": 4,
+    "tags": 2,
+    "tech_stack": 2,
+    "description": 1,
+    "detailed_description": 1,
+})
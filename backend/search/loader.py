@@ -0,0 +1,116 @@
+"""
+Loading the search indexes (search/index.py), the developer typeahead and
+the project discovery index from the database, and keeping every worker's
+copies current as profiles and projects change.
+"""
+import os
+
+from storage.query import supabase, run_query
+from pubsub.invalidation import broadcast_invalidation
+from search.index import dev_index, project_index
+from search.typeahead import dev_typeahead
+from search.facets import project_facets
+from recommend.loader import add_project_to_matrix, PROJECT_MATCH_FIELDS
+
+SEARCH_LOAD_PAGE = int(os.getenv("SEARCH_LOAD_PAGE", "10000"))
+SEARCH_CHANNEL = "search:index"
+SEARCH_INDEXES = {
+    "devs": ("profiles", dev_index, "id, full_name, username"),
+    "projects": ("app_projects", project_index, "id, title, detailed_description"),
+}
+
+
+async def load_search_indexes():
+    """Page through profiles and app_projects into the search indexes"""
+    for kind, (table, index, _) in SEARCH_INDEXES.items():
+        columns = ", ".join(["id", *index.fields])
+        last_id = None
+        try:
+            while True:
+                query = supabase.table(table).select(columns)
+                if last_id is not None:
+                    query = query.gt("id", last_id)
+                response = await run_query(query.order("id").limit(SEARCH_LOAD_PAGE))
+                rows = response.data or []
+                for row in rows:
+                    index.add(row)
+                    if kind == "devs":
+                        dev_typeahead.add(row)
+                if len(rows) < SEARCH_LOAD_PAGE:
+                    break
+                last_id = rows[-1]["id"]
+            index.finish_load()
+            if kind == "devs":
+                await _load_typeahead_followers()
+            print(f"🔎 Search index for {kind} loaded: {index.stats()}")
+        except Exception as e:
+            print(f"❌ Error loading {kind} search index, falling back to ilike: {e}")
+
+
+async def _load_typeahead_followers():
+    """Follower counts that rank typeahead results, from profile_stats"""
+    last_id = None
+    while True:
+        query = supabase.table("profile_stats").select("user_id, followers").gt("followers", 0)
+        if last_id is not None:
+            query = query.gt("user_id", last_id)
+        response = await run_query(query.order("user_id").limit(SEARCH_LOAD_PAGE))
+        rows = response.data or []
+        for row in rows:
+            dev_typeahead.set_followers(row["user_id"], row["followers"])
+        if len(rows) < SEARCH_LOAD_PAGE:
+            break
+        last_id = rows[-1]["user_id"]
+    dev_typeahead.finish_load()
+    print(f"🔎 Typeahead loaded: {dev_typeahead.stats()}")
+
+
+async def load_facet_index():
+    """Page through app_projects in (created_at, id) order into the discovery index"""
+    project_facets.begin_load()
+    columns = ", ".join(["id", "created_at", *project_facets.fields])
+    position = None
+    try:
+        while True:
+            query = supabase.table("app_projects").select(columns)
+            if position is not None:
+                created_at, row_id = position
+                query = query.gte("created_at", created_at).or_(
+                    f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{row_id})'
+                )
+            response = await run_query(query.order("created_at").order("id").limit(SEARCH_LOAD_PAGE))
+            rows = response.data or []
+            for row in rows:
+                project_facets.add(row, loading=True)
+            if len(rows) < SEARCH_LOAD_PAGE:
+                break
+            position = rows[-1]["created_at"], rows[-1]["id"]
+        project_facets.finish_load()
+        print(f"🔎 Discovery index loaded: {project_facets.stats()}")
+    except Exception as e:
+        project_facets.loading = False
+        print(f"❌ Error loading discovery index, falling back to queries: {e}")
+
+
+def _apply_document(kind: str, document: dict):
+    SEARCH_INDEXES[kind][1].add(document)
+    if kind == "devs":
+        dev_typeahead.add(document)
+    else:
+        project_facets.add(document)
+        add_project_to_matrix(document)
+
+
+search_updates = broadcast_invalidation(SEARCH_CHANNEL, _apply_document)
+
+
+async def index_document(kind: str, row: dict):
+    """Add a new or changed profile ("devs") or app project ("projects") to every worker's index"""
+    index = SEARCH_INDEXES[kind][1]
+    if kind == "devs":
+        fields = [*index.fields]
+    else:
+        fields = [*index.fields, "created_at", *project_facets.fields, *PROJECT_MATCH_FIELDS]
+    document = {"id": row["id"], **{field: row.get(field) for field in fields}}
+    _apply_document(kind, document)
+    await search_updates.publish(kind, document)
@@ -1,5 +1,6 @@
-from db import get_devs, get_projects
+from db import get_devs, get_projects, get_dev_suggestions, discover_projects
 from fastapi import FastAPI , Depends , Query,status , HTTPException
+from typing import List, Optional
 from fastapi.responses import JSONResponse
 from auth.dependencies import get_current_user_id
 
@@ -9,15 +10,28 @@ search_app = FastAPI()
 @search_app.get("/devs")
 async def search_devs(
     q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     user_id: str = Depends(get_current_user_id)
 ):
     """
-    Search developer profiles by name or username.
+    Search developer profiles by name or username, best matches first.
+    The body stays a plain list; pass the X-Next-Cursor header back as
+    `cursor` for the next page.
     Protected route — requires valid access token.
     """
     try:
-        filtered_devs = await get_devs(q)
-        return JSONResponse(status_code=200, content=filtered_devs or [])
+        filtered_devs = await get_devs(q, limit, cursor)
+        if not filtered_devs:
+            return JSONResponse(status_code=200, content=[])
+        headers = {"X-Next-Cursor": filtered_devs["next_cursor"]} if filtered_devs["next_cursor"] else None
+        return JSONResponse(status_code=200, content=filtered_devs["results"] or [], headers=headers)
+
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
     except Exception as e:
         print(f"❌ Error during /search/devs for user {user_id}: {e}")
@@ -25,22 +39,82 @@ async def search_devs(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error while searching developers"
         )
+@search_app.get("/typeahead")
+async def typeahead_devs(
+    q: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=10),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Autocomplete for the search box: developers whose username or a word of
+    their name starts with q, most followed first. Cheap enough per keystroke.
+    Protected route — requires valid access token.
+    """
+    try:
+        return JSONResponse(status_code=200, content=await get_dev_suggestions(q, limit))
+    except Exception as e:
+        print(f"❌ Error during /search/typeahead for user {user_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error while fetching suggestions"
+        )
 @search_app.get("/projects")
 async def search_projects(
     q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     user_id: str = Depends(get_current_user_id)
 ):
     """
-    Search projects by name.
+    Search projects by title, description, tags and tech stack, best matches
+    first. Paged like /devs through `cursor` and the X-Next-Cursor header.
     Protected route — requires valid access token.
     """
     try:
-        filtered_projects = await get_projects(q)
-        return JSONResponse(status_code=200, content=filtered_projects or [])
+        filtered_projects = await get_projects(q, limit, cursor)
+        if not filtered_projects:
+            return JSONResponse(status_code=200, content=[])
+        headers = {"X-Next-Cursor": filtered_projects["next_cursor"]} if filtered_projects["next_cursor"] else None
+        return JSONResponse(status_code=200, content=filtered_projects["results"] or [], headers=headers)
+
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
     except Exception as e:
         print(f"❌ Error during /search/projects for user {user_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error while searching projects"
-        )
\ No newline at end of file
+        )
+
+@search_app.get("/projects/discover")
+async def discover(
+    f: List[str] = Query([]),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None,
+    facets: Optional[str] = None,
+    facet_limit: int = Query(10, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Browse projects by facets. Each `f` is `field:value|value` (values ORed),
+    repeated `f` are ANDed, e.g. ?f=tech_stack:python|rust&f=status:active.
+    Fields: required_skills, tech_stack, programming_languages, tags, domain,
+    difficulty_level, is_remote, status. `facets` is a comma-separated list
+    of fields to count (all by default).
+    Protected route — requires valid access token.
+    """
+    fields = [field.strip() for field in facets.split(",") if field.strip()] if facets is not None else None
+    try:
+        result = await discover_projects(f, limit, cursor, fields, facet_limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error while discovering projects"
+        )
+    return JSONResponse(status_code=200, content=result)
@@ -0,0 +1,240 @@
+"""
+Prefix autocomplete for developer names.
+
+Every profile contributes a few lowercase keys (its username, its full name
+and each later word of the full name, so "smi" finds "John Smith"), kept in
+one sorted list with a parallel array of owners. A prefix is a contiguous
+range of that list, found with two binary searches. The matches are ranked
+by follower count and only the top-k are kept.
+
+Broad prefixes match too many names to rank per request. Their top-k lists
+are kept up to date instead: all prefixes of up to SHORT_PREFIX_LENGTH
+characters are filled at load time in one pass over users in follower
+order, and a longer prefix joins them the first time its range holds more
+than PINNED_RANGE keys. Follow counts and new profiles update these lists
+in place; one that may have lost a member to an outsider is recomputed on
+its next lookup. Other prefixes are ranked on demand and cached for
+TYPEAHEAD_CACHE_TTL seconds. While a word is typed, a cached parent prefix with fewer than top-k
+results already holds every match, so the next keystroke only filters it.
+A new or renamed profile invalidates the prefixes of its keys.
+"""
+import heapq
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from ttl_cache import TTLCache, MISSING
+
+TYPEAHEAD_TOP_K = int(os.getenv("TYPEAHEAD_TOP_K", "10"))
+TYPEAHEAD_CACHE_TTL = float(os.getenv("TYPEAHEAD_CACHE_TTL", "30"))
+TYPEAHEAD_CACHE_ENTRIES = int(os.getenv("TYPEAHEAD_CACHE_ENTRIES", "50000"))
+SHORT_PREFIX_LENGTH = 3
+PINNED_RANGE = 1000
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join(text.lower().split()) if text else ""
+
+
+def name_keys(username: Optional[str], full_name: Optional[str]) -> List[str]:
+    keys = {normalize(username)}
+    full = normalize(full_name)
+    words = full.split(" ")
+    keys.update(" ".join(words[i:]) for i in range(len(words)))
+    keys.discard("")
+    return sorted(keys)
+
+
+def _prefixes(keys: List[str], longest: int = None) -> set:
+    # Lookups strip trailing spaces, so "ab " is never asked for
+    return {key[:end] for key in keys for end in range(1, min(len(key), longest or len(key)) + 1)
+            if key[end - 1] != " "}
+
+
+class Typeahead:
+    def __init__(self, top_k: int = TYPEAHEAD_TOP_K):
+        self.top_k = top_k
+        self.keys: List[str] = []
+        self.owners = array("i")
+        self.ids: Dict[str, int] = {}
+        self.profiles: List[dict] = []
+        self.followers = array("i")
+        self.cache = TTLCache(TYPEAHEAD_CACHE_TTL, max_entries=TYPEAHEAD_CACHE_ENTRIES)
+        self.pinned: Dict[str, List[int]] = {}
+        self.dirty = set()
+        self.ready = False
+        self.pending = []
+        self.renamed = set()
+
+    # Loading
+
+    def add(self, row: dict):
+        """Add or rename a profile (id, username, full_name)"""
+        user_id = str(row["id"])
+        profile = {"id": user_id, "username": row.get("username"), "full_name": row.get("full_name")}
+        number = self.ids.get(user_id)
+        if number is None:
+            number = len(self.profiles)
+            self.ids[user_id] = number
+            self.profiles.append(profile)
+            self.followers.append(0)
+            old_keys = []
+        else:
+            old_keys = name_keys(self.profiles[number]["username"], self.profiles[number]["full_name"])
+            self.profiles[number] = profile
+        new_keys = name_keys(profile["username"], profile["full_name"])
+
+        if not self.ready:
+            # Sorted once in finish_load
+            self.pending.extend((key, number) for key in new_keys)
+            if old_keys:
+                self.renamed.add(number)
+            return
+        for key in old_keys:
+            self._remove_key(key, number)
+        for key in new_keys:
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.owners.insert(position, number)
+        for key in set(old_keys) | set(new_keys):
+            for end in range(1, len(key) + 1):
+                self.cache.invalidate(key[:end])
+        for prefix in _prefixes(old_keys):
+            if number in self.pinned.get(prefix, ()):
+                self.dirty.add(prefix)
+        for prefix in _prefixes(new_keys):
+            if prefix in self.pinned or len(prefix) <= SHORT_PREFIX_LENGTH:
+                self._offer(prefix, number)
+
+    def _remove_key(self, key: str, number: int):
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.owners[position] == number:
+                del self.keys[position]
+                del self.owners[position]
+                return
+            position += 1
+
+    def set_followers(self, user_id: str, count: int):
+        number = self.ids.get(user_id)
+        if number is not None:
+            self.followers[number] = max(count, 0)
+
+    def adjust_followers(self, user_id: str, delta: int):
+        number = self.ids.get(user_id)
+        if number is None:
+            return
+        self.followers[number] = max(self.followers[number] + delta, 0)
+        if not self.ready:
+            return
+        profile = self.profiles[number]
+        for prefix in _prefixes(name_keys(profile["username"], profile["full_name"])):
+            top = self.pinned.get(prefix)
+            if top is None:
+                continue
+            if number not in top:
+                self._offer(prefix, number)
+            elif delta < 0 and len(top) >= self.top_k:
+                # Someone outside the list may now rank above this user
+                self.dirty.add(prefix)
+            else:
+                top.sort(key=self._rank_key)
+
+    def _offer(self, prefix: str, number: int):
+        """Let a user into a pinned prefix's top-k list if they rank high enough"""
+        top = self.pinned.setdefault(prefix, [])
+        if number in top:
+            top.sort(key=self._rank_key)
+            return
+        if len(top) < self.top_k or self._rank_key(number) < self._rank_key(top[-1]):
+            top.append(number)
+            top.sort(key=self._rank_key)
+            del top[self.top_k:]
+
+    def finish_load(self):
+        pending, self.pending = sorted(self.pending), []
+        if self.renamed:
+            current = {number: set(name_keys(self.profiles[number]["username"], self.profiles[number]["full_name"]))
+                       for number in self.renamed}
+            pending = [(key, number) for key, number in pending
+                       if number not in current or key in current[number]]
+            self.renamed = set()
+        self.keys = [key for key, _ in pending]
+        self.owners = array("i", (number for _, number in pending))
+        self._build_short_prefixes()
+        self.cache.clear()
+        self.ready = True
+
+    def _build_short_prefixes(self):
+        """One pass over users, most followed first, filling each short prefix's top-k"""
+        pinned: Dict[str, List[int]] = {}
+        for number in sorted(range(len(self.profiles)), key=self._rank_key):
+            profile = self.profiles[number]
+            for prefix in _prefixes(name_keys(profile["username"], profile["full_name"]), SHORT_PREFIX_LENGTH):
+                top = pinned.setdefault(prefix, [])
+                if len(top) < self.top_k:
+                    top.append(number)
+        self.pinned = pinned
+        self.dirty = set()
+
+    # Reads
+
+    def _rank_key(self, number: int):
+        return -self.followers[number], self.profiles[number]["username"] or "", number
+
+    def _rank(self, numbers) -> List[int]:
+        return heapq.nsmallest(self.top_k, numbers, key=self._rank_key)
+
+    def _range(self, prefix: str):
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\uffff", start)
+        return self._rank(set(self.owners[start:end])), end - start
+
+    def _matches(self, number: int, prefix: str) -> bool:
+        profile = self.profiles[number]
+        return any(key.startswith(prefix) for key in name_keys(profile["username"], profile["full_name"]))
+
+    def _top(self, prefix: str) -> List[int]:
+        generation = self.cache.generation
+        parent = self.cache.get(prefix[:-1]) if len(prefix) > 1 else MISSING
+        if parent is not MISSING and len(parent) < self.top_k:
+            # The parent prefix's list is complete, so it holds every match
+            top = [number for number in parent if self._matches(number, prefix)]
+        else:
+            top, size = self._range(prefix)
+            if size > PINNED_RANGE:
+                self.pinned[prefix] = top
+                return top
+        self.cache.set(prefix, top, generation=generation)
+        return top
+
+    def lookup(self, prefix: str, limit: int = None) -> List[dict]:
+        """Best `limit` (at most top_k) profiles with a name key starting with prefix"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if prefix in self.dirty:
+            self.pinned[prefix] = self._range(prefix)[0]
+            self.dirty.discard(prefix)
+        top = self.pinned.get(prefix)
+        if top is None and len(prefix) <= SHORT_PREFIX_LENGTH and self.ready:
+            top = []
+        elif top is None:
+            top = self.cache.get(prefix)
+            if top is MISSING:
+                top = self._top(prefix)
+        limit = self.top_k if limit is None else max(1, min(limit, self.top_k))
+        return [{**self.profiles[number], "followers": self.followers[number]} for number in top[:limit]]
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "profiles": len(self.profiles),
+            "keys": len(self.keys),
+            "pinned_prefixes": len(self.pinned),
+            "cache": self.cache.stats(),
+        }
+
+
+dev_typeahead = Typeahead()
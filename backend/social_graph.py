@@ -0,0 +1,178 @@
+"""
+In-memory follow graph.
+
+User ids are interned to dense ints and each user's followees and followers
+are kept as sorted array('i') adjacency lists (4 bytes per edge per
+direction), so membership is a binary search and the whole graph of 1M edges
+fits in a few tens of MB. The index is loaded from user_connections at
+startup and kept current by follow/unfollow (including writes made on other
+workers, which arrive over the broker). Until loading has finished `ready`
+is False and callers fall back to querying the database; writes seen while
+loading are replayed once the bulk load is done.
+"""
+import heapq
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, List
+
+SUGGESTION_MAX_FANOUT = 200
+
+
+def _contains(values: array, value: int) -> bool:
+    position = bisect_left(values, value)
+    return position < len(values) and values[position] == value
+
+
+def _insert(values: array, value: int) -> bool:
+    position = bisect_left(values, value)
+    if position < len(values) and values[position] == value:
+        return False
+    values.insert(position, value)
+    return True
+
+
+def _remove(values: array, value: int) -> bool:
+    position = bisect_left(values, value)
+    if position < len(values) and values[position] == value:
+        del values[position]
+        return True
+    return False
+
+
+class SocialGraph:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.following: List[array] = []
+        self.followers: List[array] = []
+        self.edges = 0
+        self.ready = False
+        self.loading = False
+        self.pending = []
+
+    def _intern(self, user_id: str) -> int:
+        index = self.ids.get(user_id)
+        if index is None:
+            index = len(self.names)
+            self.ids[user_id] = index
+            self.names.append(user_id)
+            self.following.append(array("i"))
+            self.followers.append(array("i"))
+        return index
+
+    # Loading
+
+    def begin_load(self):
+        self.__init__()
+        self.loading = True
+
+    def load_edges(self, pairs):
+        """Bulk-add (follower_id, following_id) pairs; sorted once in finish_load"""
+        for follower_id, following_id in pairs:
+            follower = self._intern(follower_id)
+            followee = self._intern(following_id)
+            self.following[follower].append(followee)
+            self.followers[followee].append(follower)
+
+    def finish_load(self):
+        for adjacency in (self.following, self.followers):
+            for index, values in enumerate(adjacency):
+                if len(values) > 1:
+                    adjacency[index] = array("i", sorted(set(values)))
+        self.edges = sum(len(values) for values in self.following)
+        self.loading = False
+        self.ready = True
+        pending, self.pending = self.pending, []
+        for op, follower_id, following_id in pending:
+            (self.add if op == "follow" else self.remove)(follower_id, following_id)
+
+    # Writes
+
+    def add(self, follower_id: str, following_id: str) -> bool:
+        if self.loading:
+            self.pending.append(("follow", follower_id, following_id))
+            return False
+        if not self.ready:
+            return False
+        follower = self._intern(follower_id)
+        followee = self._intern(following_id)
+        if not _insert(self.following[follower], followee):
+            return False
+        _insert(self.followers[followee], follower)
+        self.edges += 1
+        return True
+
+    def remove(self, follower_id: str, following_id: str) -> bool:
+        if self.loading:
+            self.pending.append(("unfollow", follower_id, following_id))
+            return False
+        follower = self.ids.get(follower_id)
+        followee = self.ids.get(following_id)
+        if not self.ready or follower is None or followee is None:
+            return False
+        if not _remove(self.following[follower], followee):
+            return False
+        _remove(self.followers[followee], follower)
+        self.edges -= 1
+        return True
+
+    # Reads (only meaningful once ready)
+
+    def is_following(self, follower_id: str, following_id: str) -> bool:
+        follower = self.ids.get(follower_id)
+        followee = self.ids.get(following_id)
+        if follower is None or followee is None:
+            return False
+        return _contains(self.following[follower], followee)
+
+    def following_ids(self, user_id: str) -> List[str]:
+        index = self.ids.get(user_id)
+        return [] if index is None else [self.names[i] for i in self.following[index]]
+
+    def follower_ids(self, user_id: str) -> List[str]:
+        index = self.ids.get(user_id)
+        return [] if index is None else [self.names[i] for i in self.followers[index]]
+
+    def mutuals(self, user_id: str) -> List[str]:
+        """Users that user_id follows and who follow user_id back"""
+        index = self.ids.get(user_id)
+        if index is None:
+            return []
+        following, followers = self.following[index], self.followers[index]
+        if len(following) > len(followers):
+            following, followers = followers, following
+        return [self.names[i] for i in following if _contains(followers, i)]
+
+    def suggestions(self, user_id: str, limit: int = 10,
+                    max_fanout: int = SUGGESTION_MAX_FANOUT) -> List[dict]:
+        """
+        Friend-of-friend suggestions: users followed by the people user_id
+        follows, ranked by how many of them do. Only the first `max_fanout`
+        followees of each hop are expanded, bounding the work for hub accounts.
+        """
+        index = self.ids.get(user_id)
+        if index is None:
+            return []
+        following = self.following[index]
+        scores: Dict[int, int] = {}
+        for friend in following[:max_fanout]:
+            for candidate in self.following[friend][:max_fanout]:
+                if candidate != index and not _contains(following, candidate):
+                    scores[candidate] = scores.get(candidate, 0) + 1
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [{"user_id": self.names[candidate], "mutual_count": count} for candidate, count in best]
+
+    def stats(self) -> dict:
+        adjacency_bytes = sum(
+            sys.getsizeof(values) for adjacency in (self.following, self.followers) for values in adjacency
+        )
+        return {
+            "ready": self.ready,
+            "users": len(self.names),
+            "edges": self.edges,
+            "adjacency_bytes": adjacency_bytes,
+        }
+
+
+social_graph = SocialGraph()
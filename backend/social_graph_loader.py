@@ -0,0 +1,53 @@
+"""
+Loading the follow graph (social_graph.py) from user_connections and keeping
+every worker's copy current: follow/unfollow is applied by the worker that
+wrote it and broadcast to the others. Each change also moves the followed
+user's typeahead ranking.
+"""
+import os
+
+from storage.query import supabase, run_query
+from pubsub.invalidation import broadcast_invalidation
+from social_graph import social_graph
+from search.typeahead import dev_typeahead
+
+GRAPH_CHANNEL = "graph:follows"
+GRAPH_LOAD_PAGE = int(os.getenv("GRAPH_LOAD_PAGE", "10000"))
+
+
+async def load_social_graph():
+    """Page through user_connections into the in-memory follow graph"""
+    social_graph.begin_load()
+    last_id = None
+    try:
+        while True:
+            query = supabase.table("user_connections").select("id, follower_id, following_id")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            response = await run_query(query.order("id").limit(GRAPH_LOAD_PAGE))
+            rows = response.data or []
+            social_graph.load_edges((row["follower_id"], row["following_id"]) for row in rows)
+            if len(rows) < GRAPH_LOAD_PAGE:
+                break
+            last_id = rows[-1]["id"]
+        social_graph.finish_load()
+        print(f"🕸️ Social graph loaded: {social_graph.stats()}")
+    except Exception as e:
+        social_graph.loading = False
+        print(f"❌ Error loading social graph, falling back to queries: {e}")
+
+
+def _apply_graph_change(op: str, follower_id: str, following_id: str):
+    """Apply a follow/unfollow the database accepted (each worker does this once per change)"""
+    (social_graph.add if op == "follow" else social_graph.remove)(follower_id, following_id)
+    # Counted from the write itself: the graph defers or ignores changes until it has loaded
+    dev_typeahead.adjust_followers(following_id, 1 if op == "follow" else -1)
+
+
+graph_changes = broadcast_invalidation(GRAPH_CHANNEL, _apply_graph_change)
+
+
+async def publish_graph_change(op: str, follower_id: str, following_id: str):
+    """Called only after the database insert/delete changed a row"""
+    _apply_graph_change(op, follower_id, following_id)
+    await graph_changes.publish(op, follower_id, following_id)
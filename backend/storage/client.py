@@ -0,0 +1,63 @@
+"""
+Storage backend selection.
+
+DB_BACKEND=supabase (default) talks to the hosted project using SUPABASE_URL
+and SUPABASE_KEY. DB_BACKEND=sqlite runs every db.py query against a local
+SQLite database with the same tables (SQLITE_PATH, default in-memory), which
+is what the offline benchmarks and soak tests use.
+
+Auth calls (sign up, sign in, sign out) go through create_auth_client(), a
+separate client: signing in makes a supabase client send that user's access
+token on every later request, so the shared data client must never hold a
+session.
+"""
+import os
+import logging
+
+DB_BACKEND = os.getenv("DB_BACKEND", "supabase").lower()
+
+
+def create_storage_client():
+    """Return a client exposing the supabase .table() query builder API, or None if unconfigured"""
+    if DB_BACKEND == "sqlite":
+        from storage.sqlite_client import SQLiteClient
+
+        path = os.getenv("SQLITE_PATH", ":memory:")
+        logging.info("Using SQLite storage backend at %s", path)
+        return SQLiteClient(path)
+
+    if DB_BACKEND != "supabase":
+        raise RuntimeError(f"Unknown DB_BACKEND {DB_BACKEND!r}, expected 'supabase' or 'sqlite'")
+
+    from supabase import create_client
+
+    settings = _supabase_settings()
+    if settings is None:
+        return None
+    client = create_client(*settings)
+    logging.info("Connected to Supabase at %s", settings[0])
+    return client
+
+
+def create_auth_client():
+    """Return a client used only for supabase.auth calls, or None if unconfigured"""
+    if DB_BACKEND == "sqlite":
+        from storage.sqlite_client import SQLiteAuthClient
+
+        return SQLiteAuthClient()
+
+    from supabase import create_client, ClientOptions
+
+    settings = _supabase_settings()
+    if settings is None:
+        return None
+    # Sessions are handed to the caller; nothing is kept, stored or refreshed here
+    return create_client(*settings, options=ClientOptions(persist_session=False, auto_refresh_token=False))
+
+
+def _supabase_settings():
+    try:
+        return os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"]
+    except KeyError:
+        print("Error: SUPABASE_URL or SUPABASE_KEY environment variable is not set")
+        return None
@@ -0,0 +1,49 @@
+"""
+The shared data client and how queries run.
+
+db.py and the modules that load and sync the in-memory indexes all query
+through run_query, so it lives below them; db re-exports supabase and
+run_query for existing callers.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from loaders import current_loaders
+from storage.client import create_storage_client
+
+# Supabase by default; DB_BACKEND=sqlite swaps in the local stand-in
+supabase = create_storage_client()
+
+# The supabase client is synchronous, so every .execute() is a blocking HTTP
+# round trip. Queries run on a bounded pool of worker threads instead, which
+# keeps the event loop (and every open websocket) responsive while they wait.
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "16"))
+db_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="db")
+
+async def run_query(query):
+    """Execute a PostgREST query builder on the db thread pool and return its response"""
+    loaders = current_loaders()
+    if loaders:
+        loaders.queries += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, query.execute)
+
+# SQLSTATE classes worth retrying: connection exception, transaction rollback
+# (serialization failure, deadlock), insufficient resources, operator intervention
+TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57")
+
+def is_transient_db_error(error: Exception) -> bool:
+    """Whether a failed query may succeed if retried unchanged (an outage rather than bad rows)"""
+    if isinstance(error, (OSError, TimeoutError)) or type(error).__module__.startswith(("httpx", "httpcore")):
+        return True
+    code = str(getattr(error, "code", None) or "")
+    if code.startswith("PGRST00"):
+        # PostgREST couldn't reach or authenticate against the database
+        return True
+    if len(code) == 3 and code.startswith("5"):
+        # An HTTP status from a gateway in front of PostgREST
+        return True
+    if code == "SQLITE":
+        return "locked" in str(error) or "busy" in str(error)
+    return code[:2] in TRANSIENT_SQLSTATE_CLASSES
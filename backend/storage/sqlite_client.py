@@ -0,0 +1,543 @@
+"""
+SQLite stand-in for the supabase client.
+
+Implements the part of the PostgREST query builder that db.py uses
+(select/insert/update/upsert/delete, eq/neq/gt/gte/lt/lte/ilike/like/is_/in_/or_
+filters, order/limit/offset/range, single, embedded resources such as
+"*, rooms(*)" and exact counts) on top of sqlite3, so the backend can be run,
+benchmarked and soak tested without the live service.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "sqlite_schema.sql")
+
+# Views don't carry declared types for computed columns
+VIEW_COLUMN_TYPES = {
+    "notification_with_sender": {"sender": "JSON"},
+}
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+OPERATORS = {
+    "eq": "=",
+    "neq": "!=",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "like": "LIKE",
+    "ilike": "LIKE",
+    "is": "IS",
+}
+
+
+class StorageError(Exception):
+    """Raised for invalid queries, mirroring postgrest.APIError's message/code"""
+
+    def __init__(self, message: str, code: str = "SQLITE"):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class SQLiteResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self):
+        return f"SQLiteResponse(data={self.data!r}, count={self.count!r})"
+
+
+def _split_top_level(text: str, sep: str = ","):
+    """Split on sep, ignoring separators inside parentheses or double quotes"""
+    parts, depth, quoted, escaped, current = [], 0, False, False, []
+    for ch in text:
+        if escaped:
+            escaped = False
+        elif quoted and ch == "\\":
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0 and not quoted:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _parse_select(columns: str):
+    """
+    Parse a PostgREST select string into (columns, embeds).
+    "*, rooms(*)" -> (["*"], {"rooms": (["*"], {})})
+    """
+    fields, embeds = [], {}
+    for part in _split_top_level(columns or "*"):
+        match = re.match(r"^([A-Za-z_][A-Za-z0-9_]*)\((.*)\)$", part, re.S)
+        if match:
+            embeds[match.group(1)] = _parse_select(match.group(2))
+        else:
+            fields.append(part)
+    return fields or ["*"], embeds
+
+
+def _literal(value: str):
+    """Convert a value from an or_() filter string to a Python value"""
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        # PostgREST quoting: backslash escapes the next character
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    lowered = value.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    if lowered == "null":
+        return None
+    return value
+
+
+class SQLiteQuery:
+    """Chainable builder mirroring postgrest's SyncRequestBuilder"""
+
+    def __init__(self, client: "SQLiteClient", table: str):
+        if not IDENTIFIER.match(table) or table not in client.columns:
+            raise StorageError(f'relation "{table}" does not exist', "42P01")
+        self.client = client
+        self.table_name = table
+        self.method = "select"
+        self.fields, self.embeds = ["*"], {}
+        self.payload = None
+        self.count_method = None
+        self.head = False
+        self.returning = "representation"
+        self.on_conflict = ""
+        self.ignore_duplicates = False
+        self.filters = []
+        self.orders = []
+        self.limit_value = None
+        self.offset_value = None
+        self.single_mode = None
+        self.embed_options = {}
+
+    # --- verbs -----------------------------------------------------------
+
+    def select(self, *columns: str, count=None, head=None):
+        self.method = "select"
+        self.fields, self.embeds = _parse_select(",".join(columns) if columns else "*")
+        self.count_method = count
+        self.head = bool(head)
+        return self
+
+    def insert(self, json, *, count=None, returning="representation", upsert=False, default_to_null=True):
+        self.method = "upsert" if upsert else "insert"
+        self.payload = json
+        self.count_method = count
+        self.returning = getattr(returning, "value", returning)
+        return self
+
+    def upsert(self, json, *, count=None, returning="representation", ignore_duplicates=False,
+               on_conflict="", default_to_null=True):
+        self.insert(json, count=count, returning=returning, upsert=True)
+        self.ignore_duplicates = ignore_duplicates
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, json, *, count=None, returning="representation"):
+        self.method = "update"
+        self.payload = json
+        self.count_method = count
+        self.returning = getattr(returning, "value", returning)
+        return self
+
+    def delete(self, *, count=None, returning="representation"):
+        self.method = "delete"
+        self.count_method = count
+        self.returning = getattr(returning, "value", returning)
+        return self
+
+    # --- filters ---------------------------------------------------------
+
+    def _column(self, column: str):
+        if column not in self.client.columns[self.table_name]:
+            raise StorageError(f'column {self.table_name}.{column} does not exist', "42703")
+        return f'"{column}"'
+
+    def _condition(self, column: str, operator: str, value):
+        if operator not in OPERATORS:
+            raise StorageError(f"unsupported operator {operator}")
+        sql_column = self._column(column)
+        if operator in ("like", "ilike") and isinstance(value, str):
+            value = value.replace("*", "%")
+        if operator in ("like", "ilike"):
+            # Backslash escapes wildcards, as in Postgres
+            return f"{sql_column} LIKE ? ESCAPE '\\'", [value]
+        if operator == "is":
+            return f"{sql_column} IS ?", [value]
+        return f"{sql_column} {OPERATORS[operator]} ?", [self.client.adapt(self.table_name, column, value)]
+
+    def _add(self, column, operator, value):
+        self.filters.append(self._condition(column, operator, value))
+        return self
+
+    def eq(self, column, value):
+        return self._add(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._add(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._add(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._add(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._add(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._add(column, "lte", value)
+
+    def like(self, column, pattern):
+        return self._add(column, "like", pattern)
+
+    def ilike(self, column, pattern):
+        return self._add(column, "ilike", pattern)
+
+    def is_(self, column, value):
+        return self._add(column, "is", _literal(value) if isinstance(value, str) else value)
+
+    def in_(self, column, values):
+        values = list(values)
+        sql_column = self._column(column)
+        if not values:
+            self.filters.append(("0", []))
+        else:
+            placeholders = ", ".join("?" for _ in values)
+            self.filters.append((f"{sql_column} IN ({placeholders})", values))
+        return self
+
+    def overlaps(self, column, values):
+        """Array column shares at least one element with values (PostgREST ov)"""
+        values = list(values)
+        sql_column = self._column(column)
+        if not values:
+            self.filters.append(("0", []))
+        else:
+            placeholders = ", ".join("?" for _ in values)
+            self.filters.append((f"EXISTS (SELECT 1 FROM json_each({sql_column}) WHERE value IN ({placeholders}))", values))
+        return self
+
+    def _logic(self, expression: str, joiner: str):
+        clauses, params = [], []
+        for part in _split_top_level(expression):
+            nested = re.match(r"^(and|or)\((.*)\)$", part, re.S)
+            if nested:
+                sql, values = self._logic(nested.group(2), nested.group(1).upper())
+            else:
+                pieces = part.split(".", 2)
+                if len(pieces) != 3:
+                    raise StorageError(f"could not parse filter {part!r}", "PGRST100")
+                column, operator, raw = pieces
+                if operator == "in":
+                    items = [_literal(item) for item in _split_top_level(raw.strip("()"))]
+                    sql = f"{self._column(column)} IN ({', '.join('?' for _ in items)})"
+                    values = items
+                else:
+                    sql, values = self._condition(column, operator, _literal(raw))
+            clauses.append(f"({sql})")
+            params.extend(values)
+        return f" {joiner} ".join(clauses), params
+
+    def or_(self, filters: str, reference_table=None):
+        self.filters.append(self._logic(filters, "OR"))
+        return self
+
+    # --- modifiers -------------------------------------------------------
+
+    def order(self, column, *, desc=False, nullsfirst=None, foreign_table=None):
+        if foreign_table:
+            self.embed_options.setdefault(foreign_table, {}).setdefault("order", []).append((column, desc))
+            return self
+        direction = "DESC" if desc else "ASC"
+        nulls = ""
+        if nullsfirst is not None:
+            nulls = " NULLS FIRST" if nullsfirst else " NULLS LAST"
+        self.orders.append(f"{self._column(column)} {direction}{nulls}")
+        return self
+
+    def limit(self, size, *, foreign_table=None):
+        if foreign_table:
+            self.embed_options.setdefault(foreign_table, {})["limit"] = int(size)
+        else:
+            self.limit_value = int(size)
+        return self
+
+    def offset(self, size):
+        self.offset_value = int(size)
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self.offset_value = int(start)
+        return self.limit(int(end) - int(start) + 1, foreign_table=foreign_table)
+
+    def single(self):
+        self.single_mode = "single"
+        return self
+
+    def maybe_single(self):
+        self.single_mode = "maybe"
+        return self
+
+    # --- execution -------------------------------------------------------
+
+    def _where(self):
+        if not self.filters:
+            return "", []
+        params = []
+        for _, values in self.filters:
+            params.extend(values)
+        return " WHERE " + " AND ".join(f"({sql})" for sql, _ in self.filters), params
+
+    def _select_sql(self):
+        where, params = self._where()
+        sql = f'SELECT * FROM "{self.table_name}"{where}'
+        if self.orders:
+            sql += " ORDER BY " + ", ".join(self.orders)
+        if self.limit_value is not None or self.offset_value is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [self.limit_value if self.limit_value is not None else -1, self.offset_value or 0]
+        return sql, params
+
+    def to_sql(self):
+        """Return the (sql, params) a select would run, for EXPLAIN QUERY PLAN"""
+        return self._select_sql()
+
+    def execute(self):
+        with self.client.lock:
+            try:
+                response = getattr(self, f"_execute_{self.method}")()
+                self.client.connection.commit()
+            except sqlite3.Error as e:
+                self.client.connection.rollback()
+                raise StorageError(str(e)) from e
+        if self.single_mode:
+            rows = response.data or []
+            if len(rows) == 1:
+                response.data = rows[0]
+            elif not rows and self.single_mode == "maybe":
+                response.data = None
+            else:
+                raise StorageError(
+                    f"JSON object requested, multiple (or no) rows returned ({len(rows)} rows)", "PGRST116"
+                )
+        return response
+
+    def _count(self):
+        if not self.count_method:
+            return None
+        where, params = self._where()
+        return self.client.connection.execute(f'SELECT COUNT(*) FROM "{self.table_name}"{where}', params).fetchone()[0]
+
+    def _execute_select(self):
+        count = self._count()
+        if self.head or self.fields == ["count"]:
+            data = [] if self.head else [{"count": count}]
+            return SQLiteResponse(data, count)
+        sql, params = self._select_sql()
+        rows = self.client.fetch(self.table_name, sql, params)
+        rows = self.client.embed(self.table_name, rows, self.embeds, self.embed_options)
+        return SQLiteResponse(self.client.project(self.table_name, rows, self.fields, self.embeds), count)
+
+    def _rows(self):
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        prepared = []
+        for row in rows:
+            row = dict(row)
+            if "id" in self.client.columns[self.table_name] and row.get("id") is None:
+                row["id"] = str(uuid.uuid4())
+            for column in row:
+                self._column(column)
+            prepared.append(row)
+        return prepared
+
+    def _execute_insert(self):
+        returned = []
+        for row in self._rows():
+            columns = list(row)
+            sql = (
+                f'INSERT INTO "{self.table_name}" ({", ".join(self._column(c) for c in columns)}) '
+                f'VALUES ({", ".join("?" for _ in columns)})'
+            )
+            if self.method == "upsert":
+                target = self.on_conflict or "id"
+                conflict_columns = [self._column(c.strip()) for c in target.split(",")]
+                updates = [c for c in columns if f'"{c}"' not in conflict_columns]
+                if self.ignore_duplicates or not updates:
+                    sql += f' ON CONFLICT ({", ".join(conflict_columns)}) DO NOTHING'
+                else:
+                    assignments = ", ".join(f'"{c}" = excluded."{c}"' for c in updates)
+                    sql += f' ON CONFLICT ({", ".join(conflict_columns)}) DO UPDATE SET {assignments}'
+            sql += " RETURNING *"
+            params = [self.client.adapt(self.table_name, c, row[c]) for c in columns]
+            returned.extend(self.client.fetch(self.table_name, sql, params))
+        return self._mutation_response(returned)
+
+    _execute_upsert = _execute_insert
+
+    def _execute_update(self):
+        columns = list(self.payload)
+        assignments = ", ".join(f"{self._column(c)} = ?" for c in columns)
+        where, params = self._where()
+        values = [self.client.adapt(self.table_name, c, self.payload[c]) for c in columns]
+        sql = f'UPDATE "{self.table_name}" SET {assignments}{where} RETURNING *'
+        return self._mutation_response(self.client.fetch(self.table_name, sql, values + params))
+
+    def _execute_delete(self):
+        where, params = self._where()
+        sql = f'DELETE FROM "{self.table_name}"{where} RETURNING *'
+        return self._mutation_response(self.client.fetch(self.table_name, sql, params))
+
+    def _mutation_response(self, rows):
+        count = len(rows) if self.count_method else None
+        return SQLiteResponse(rows if self.returning != "minimal" else [], count)
+
+
+class _UnavailableAuth:
+    def __getattr__(self, name):
+        raise StorageError("Supabase auth is not available on the sqlite storage backend")
+
+
+class SQLiteAuthClient:
+    """Counterpart of the auth-only supabase client; sqlite has no auth"""
+
+    def __init__(self):
+        self.auth = _UnavailableAuth()
+
+
+class SQLiteClient:
+    """Drop-in replacement for supabase.Client backed by a single sqlite3 connection"""
+
+    def __init__(self, path: str = ":memory:", schema_path: str = SCHEMA_PATH):
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+        with open(schema_path) as f:
+            self.connection.executescript(f.read())
+        self.auth = _UnavailableAuth()
+        self._load_metadata()
+
+    def _load_metadata(self):
+        self.columns, self.types, self.foreign_keys = {}, {}, {}
+        relations = self.connection.execute(
+            "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+        for name, kind in relations:
+            info = self.connection.execute(f'PRAGMA table_info("{name}")').fetchall()
+            self.columns[name] = [row["name"] for row in info]
+            self.types[name] = {row["name"]: (row["type"] or "").upper() for row in info}
+            self.types[name].update(VIEW_COLUMN_TYPES.get(name, {}))
+            if kind == "table":
+                for fk in self.connection.execute(f'PRAGMA foreign_key_list("{name}")').fetchall():
+                    self.foreign_keys.setdefault(name, []).append((fk["from"], fk["table"], fk["to"]))
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    from_ = table
+
+    def adapt(self, table: str, column: str, value):
+        """Convert a Python value to its stored representation"""
+        if self.types[table].get(column) == "JSON" and value is not None and not isinstance(value, str):
+            return json.dumps(value)
+        return value
+
+    def fetch(self, table: str, sql: str, params):
+        rows = self.connection.execute(sql, params).fetchall()
+        types = self.types[table]
+        decoded = []
+        for row in rows:
+            item = dict(row)
+            for column, value in item.items():
+                kind = types.get(column)
+                if value is None or not kind:
+                    continue
+                if kind == "BOOLEAN":
+                    item[column] = bool(value)
+                elif kind == "JSON" and isinstance(value, str):
+                    item[column] = json.loads(value)
+            decoded.append(item)
+        return decoded
+
+    def embed(self, table: str, rows, embeds, options, path=""):
+        """Attach embedded resources using declared foreign keys, one IN query per embed"""
+        for name, (fields, nested) in embeds.items():
+            key = f"{path}{name}"
+            embed_options = options.get(key, {})
+            many_to_one = next((fk for fk in self.foreign_keys.get(table, []) if fk[1] == name), None)
+            one_to_many = next((fk for fk in self.foreign_keys.get(name, []) if fk[1] == table), None)
+            if many_to_one:
+                local, target = many_to_one[0], many_to_one[2]
+            elif one_to_many:
+                local, target = one_to_many[2], one_to_many[0]
+            else:
+                raise StorageError(f"Could not find a relationship between '{table}' and '{name}'", "PGRST200")
+
+            keys = sorted({row[local] for row in rows if row.get(local) is not None})
+            related = []
+            if keys:
+                sql = f'SELECT * FROM "{name}" WHERE "{target}" IN ({", ".join("?" for _ in keys)})'
+                orders = embed_options.get("order")
+                if orders:
+                    sql += " ORDER BY " + ", ".join(f'"{c}" {"DESC" if d else "ASC"}' for c, d in orders)
+                related = self.fetch(name, sql, keys)
+                related = self.embed(name, related, nested, options, path=f"{key}.")
+
+            grouped = {}
+            for item in related:
+                grouped.setdefault(item.get(target), []).append(item)
+            grouped = {value: self.project(name, items, fields, nested) for value, items in grouped.items()}
+            for row in rows:
+                matches = grouped.get(row.get(local), [])
+                if many_to_one:
+                    row[name] = matches[0] if matches else None
+                else:
+                    limit = embed_options.get("limit")
+                    row[name] = matches[:limit] if limit is not None else matches
+        return rows
+
+    def project(self, table: str, rows, fields, embeds):
+        if "*" in fields:
+            return rows
+        wanted = []
+        for field in fields:
+            column = field.split(":")[-1].strip()
+            alias = field.split(":")[0].strip() if ":" in field else column
+            if column not in self.columns[table]:
+                raise StorageError(f"column {table}.{column} does not exist", "42703")
+            wanted.append((alias, column))
+        return [
+            {**{alias: row.get(column) for alias, column in wanted}, **{name: row.get(name) for name in embeds}}
+            for row in rows
+        ]
+
+    def explain(self, query: SQLiteQuery):
+        """Return SQLite's EXPLAIN QUERY PLAN rows for a select builder"""
+        sql, params = query.to_sql()
+        with self.lock:
+            return [tuple(row) for row in self.connection.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
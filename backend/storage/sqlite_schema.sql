@@ -0,0 +1,318 @@
+-- Local SQLite mirror of the Supabase tables used by the backend.
+-- Column names match Postgres so db.py queries run unchanged against it.
+-- Types: BOOLEAN columns come back as bool, JSON columns (Postgres arrays
+-- and jsonb) come back as lists/dicts.
+
+CREATE TABLE IF NOT EXISTS profiles (
+  id text PRIMARY KEY,
+  email text,
+  username text,
+  full_name text,
+  avatar_url text,
+  bio text,
+  skills JSON,
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS rooms (
+  id text PRIMARY KEY,
+  name text,
+  type text,
+  description text,
+  created_by text REFERENCES profiles(id),
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS room_members (
+  id text PRIMARY KEY,
+  room_id text REFERENCES rooms(id) ON DELETE CASCADE,
+  user_id text REFERENCES profiles(id) ON DELETE CASCADE,
+  role text DEFAULT 'member',
+  request_status BOOLEAN DEFAULT 0,
+  last_read_count integer NOT NULL DEFAULT 0,
+  joined_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  UNIQUE(room_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS room_members_user_idx ON room_members(user_id, request_status);
+
+CREATE TABLE IF NOT EXISTS private_rooms (
+  id text PRIMARY KEY,
+  room_id text REFERENCES rooms(id) ON DELETE CASCADE,
+  user1_id text,
+  user2_id text,
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS private_rooms_user1_idx ON private_rooms(user1_id);
+CREATE INDEX IF NOT EXISTS private_rooms_user2_idx ON private_rooms(user2_id);
+
+CREATE TABLE IF NOT EXISTS messages (
+  id text PRIMARY KEY,
+  room_id text REFERENCES rooms(id) ON DELETE CASCADE,
+  sender_id text REFERENCES profiles(id),
+  content text,
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS messages_room_created_idx ON messages(room_id, created_at, id);
+
+-- Mirrors room_last_message.sql
+CREATE TABLE IF NOT EXISTS room_last_message (
+  room_id text PRIMARY KEY REFERENCES rooms(id) ON DELETE CASCADE,
+  message_id text,
+  sender_id text,
+  content text,
+  created_at text,
+  message_count integer NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS messages_room_last_message
+AFTER INSERT ON messages
+BEGIN
+  INSERT INTO room_last_message (room_id, message_id, sender_id, content, created_at, message_count)
+  VALUES (NEW.room_id, NEW.id, NEW.sender_id, NEW.content, NEW.created_at, 1)
+  ON CONFLICT (room_id) DO UPDATE SET
+    message_id = CASE WHEN excluded.created_at >= room_last_message.created_at
+                      THEN excluded.message_id ELSE room_last_message.message_id END,
+    sender_id = CASE WHEN excluded.created_at >= room_last_message.created_at
+                     THEN excluded.sender_id ELSE room_last_message.sender_id END,
+    content = CASE WHEN excluded.created_at >= room_last_message.created_at
+                   THEN excluded.content ELSE room_last_message.content END,
+    created_at = MAX(excluded.created_at, room_last_message.created_at),
+    message_count = room_last_message.message_count + 1;
+  UPDATE room_members
+  SET last_read_count = (SELECT message_count FROM room_last_message WHERE room_id = NEW.room_id)
+  WHERE room_id = NEW.room_id AND user_id = NEW.sender_id;
+END;
+
+CREATE TABLE IF NOT EXISTS notifications (
+  id text PRIMARY KEY,
+  recipient_id text,
+  sender_id text REFERENCES profiles(id),
+  type text,
+  reference_id text,
+  message text,
+  is_read BOOLEAN DEFAULT 0,
+  read_at text,
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS notifications_recipient_idx ON notifications(recipient_id, is_read, created_at);
+
+-- Mirrors notification_unread_counts.sql
+CREATE TABLE IF NOT EXISTS notification_unread_counts (
+  user_id text PRIMARY KEY,
+  unread_count integer NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS notifications_unread_count_insert
+AFTER INSERT ON notifications
+WHEN NOT COALESCE(NEW.is_read, 0)
+BEGIN
+  INSERT INTO notification_unread_counts (user_id, unread_count) VALUES (NEW.recipient_id, 1)
+  ON CONFLICT (user_id) DO UPDATE SET unread_count = unread_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS notifications_unread_count_read
+AFTER UPDATE OF is_read ON notifications
+WHEN NOT COALESCE(OLD.is_read, 0) AND COALESCE(NEW.is_read, 0)
+BEGIN
+  UPDATE notification_unread_counts SET unread_count = MAX(unread_count - 1, 0)
+  WHERE user_id = OLD.recipient_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS notifications_unread_count_unread
+AFTER UPDATE OF is_read ON notifications
+WHEN COALESCE(OLD.is_read, 0) AND NOT COALESCE(NEW.is_read, 0)
+BEGIN
+  INSERT INTO notification_unread_counts (user_id, unread_count) VALUES (NEW.recipient_id, 1)
+  ON CONFLICT (user_id) DO UPDATE SET unread_count = unread_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS notifications_unread_count_delete
+AFTER DELETE ON notifications
+WHEN NOT COALESCE(OLD.is_read, 0)
+BEGIN
+  UPDATE notification_unread_counts SET unread_count = MAX(unread_count - 1, 0)
+  WHERE user_id = OLD.recipient_id;
+END;
+
+CREATE TABLE IF NOT EXISTS user_connections (
+  id text PRIMARY KEY,
+  follower_id text,
+  following_id text,
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  UNIQUE(follower_id, following_id)
+);
+CREATE INDEX IF NOT EXISTS user_connections_following_idx ON user_connections(following_id);
+
+CREATE TABLE IF NOT EXISTS projects (
+  id text PRIMARY KEY,
+  profile_id text REFERENCES profiles(id) ON DELETE CASCADE,
+  name text,
+  description text,
+  url text,
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS projects_profile_idx ON projects(profile_id);
+
+-- Mirrors profile_stats.sql
+CREATE TABLE IF NOT EXISTS profile_stats (
+  user_id text PRIMARY KEY,
+  followers integer NOT NULL DEFAULT 0,
+  following integer NOT NULL DEFAULT 0,
+  projects integer NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS user_connections_profile_stats_insert
+AFTER INSERT ON user_connections
+BEGIN
+  INSERT INTO profile_stats (user_id, following) VALUES (NEW.follower_id, 1)
+  ON CONFLICT (user_id) DO UPDATE SET following = following + 1;
+  INSERT INTO profile_stats (user_id, followers) VALUES (NEW.following_id, 1)
+  ON CONFLICT (user_id) DO UPDATE SET followers = followers + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_connections_profile_stats_delete
+AFTER DELETE ON user_connections
+BEGIN
+  UPDATE profile_stats SET following = MAX(following - 1, 0) WHERE user_id = OLD.follower_id;
+  UPDATE profile_stats SET followers = MAX(followers - 1, 0) WHERE user_id = OLD.following_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS projects_profile_stats_insert
+AFTER INSERT ON projects
+BEGIN
+  INSERT INTO profile_stats (user_id, projects) VALUES (NEW.profile_id, 1)
+  ON CONFLICT (user_id) DO UPDATE SET projects = projects + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS projects_profile_stats_delete
+AFTER DELETE ON projects
+BEGIN
+  UPDATE profile_stats SET projects = MAX(projects - 1, 0) WHERE user_id = OLD.profile_id;
+END;
+
+CREATE TABLE IF NOT EXISTS app_projects (
+  id text PRIMARY KEY,
+  title text NOT NULL,
+  description text NOT NULL,
+  detailed_description text,
+  status text DEFAULT 'active',
+  project_type text,
+  domain text,
+  difficulty_level text DEFAULT 'intermediate',
+  required_skills JSON,
+  tech_stack JSON,
+  programming_languages JSON,
+  estimated_duration text,
+  team_size_min integer DEFAULT 1,
+  team_size_max integer DEFAULT 5,
+  is_remote BOOLEAN DEFAULT 1,
+  timezone_preference text,
+  github_url text,
+  demo_url text,
+  figma_url text,
+  documentation_url text,
+  image_url text,
+  is_recruiting BOOLEAN DEFAULT 1,
+  is_public BOOLEAN DEFAULT 1,
+  collaboration_type text DEFAULT 'open',
+  created_by text REFERENCES profiles(id) ON DELETE SET NULL,
+  tags JSON,
+  view_count integer DEFAULT 0,
+  like_count integer DEFAULT 0,
+  application_count integer DEFAULT 0,
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  updated_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  deadline text,
+  started_at text,
+  completed_at text,
+  -- Maintained by the app_project_members triggers below (app_projects_feed.sql)
+  member_count integer NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS app_projects_feed_idx ON app_projects(created_at, id);
+-- Scalar facets from project_discovery_indexes.sql (SQLite has no GIN; array
+-- facets are scanned with json_each)
+CREATE INDEX IF NOT EXISTS app_projects_status_created_idx ON app_projects(status, created_at, id);
+CREATE INDEX IF NOT EXISTS app_projects_domain_created_idx ON app_projects(domain, created_at, id);
+CREATE INDEX IF NOT EXISTS app_projects_difficulty_created_idx ON app_projects(difficulty_level, created_at, id);
+CREATE INDEX IF NOT EXISTS app_projects_remote_created_idx ON app_projects(is_remote, created_at, id);
+
+CREATE TABLE IF NOT EXISTS app_project_members (
+  id text PRIMARY KEY,
+  project_id text REFERENCES app_projects(id) ON DELETE CASCADE,
+  user_id text REFERENCES profiles(id) ON DELETE CASCADE,
+  role text DEFAULT 'member',
+  status text DEFAULT 'active',
+  joined_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  contribution_description text,
+  UNIQUE(project_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS app_project_members_project_joined_idx ON app_project_members(project_id, joined_at, id);
+CREATE INDEX IF NOT EXISTS app_project_members_user_idx ON app_project_members(user_id);
+
+CREATE TRIGGER IF NOT EXISTS app_project_members_count_insert
+AFTER INSERT ON app_project_members
+BEGIN
+  UPDATE app_projects SET member_count = member_count + 1 WHERE id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS app_project_members_count_delete
+AFTER DELETE ON app_project_members
+BEGIN
+  UPDATE app_projects SET member_count = MAX(member_count - 1, 0) WHERE id = OLD.project_id;
+END;
+
+CREATE TABLE IF NOT EXISTS resume_jobs (
+  id text PRIMARY KEY,
+  user_id text NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  filename text,
+  status text NOT NULL DEFAULT 'queued',
+  skills JSON,
+  added_skills JSON,
+  error text,
+  created_at text DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  finished_at text
+);
+
+CREATE INDEX IF NOT EXISTS resume_jobs_user_created_idx ON resume_jobs(user_id, created_at);
+
+CREATE VIEW IF NOT EXISTS private_room_details AS
+SELECT
+  pr.room_id,
+  pr.user1_id,
+  pr.user2_id,
+  p1.full_name AS user1_name,
+  p1.username AS user1_username,
+  p1.avatar_url AS user1_avatar_url,
+  p2.full_name AS user2_name,
+  p2.username AS user2_username,
+  p2.avatar_url AS user2_avatar_url,
+  r.name,
+  r.type,
+  r.description,
+  r.created_at
+FROM private_rooms pr
+JOIN rooms r ON r.id = pr.room_id
+LEFT JOIN profiles p1 ON p1.id = pr.user1_id
+LEFT JOIN profiles p2 ON p2.id = pr.user2_id;
+
+CREATE VIEW IF NOT EXISTS notification_with_sender AS
+SELECT
+  n.id,
+  n.recipient_id,
+  n.sender_id,
+  n.type,
+  n.reference_id,
+  n.message,
+  n.is_read,
+  n.read_at,
+  n.created_at,
+  json_object(
+    'id', p.id,
+    'full_name', p.full_name,
+    'username', p.username,
+    'avatar_url', p.avatar_url
+  ) AS sender
+FROM notifications n
+LEFT JOIN profiles p ON p.id = n.sender_id;
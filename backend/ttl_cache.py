@@ -0,0 +1,188 @@
+"""
+Process-wide TTL cache for hot point lookups.
+
+Unlike the request-scoped loaders, entries outlive a request: a value is
+reused until its TTL runs out or it is invalidated by the code that changes
+it. Negative results (None) can be kept for a shorter `negative_ttl`. The
+cache is bounded to `max_entries` and evicts least recently used keys.
+
+`generation` moves on every invalidation. Read it before querying and pass
+it to set(): a value read while an invalidation happened is not cached, so a
+slow query can't put back what a write just cleared.
+
+ExpiringMap is the TTL-first counterpart for short-lived state (OTP codes,
+rate-limit counters): every key carries its own deadline and keys leave in
+expiry order rather than by recency.
+"""
+import heapq
+import math
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, ttl: float, negative_ttl: float = None, max_entries: int = 100_000):
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[object, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    def get(self, key):
+        """Cached value for key, or MISSING"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+        self.misses += 1
+        return MISSING
+
+    def set(self, key, value, ttl: float = None, generation: int = None):
+        if generation is not None and generation != self.generation:
+            return
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        self.generation += 1
+        if self.entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+class ExpiringMap:
+    """
+    Map whose keys each expire on their own deadline. A min-heap of
+    (expires, key) orders the deadlines; every operation first pops what is
+    due, so expired keys are dropped as time passes without a sweeper task.
+    Re-setting or deleting a key leaves its old heap entry behind; stale
+    entries are skipped when they surface (their deadline no longer matches
+    the key's) and the heap is rebuilt once they outnumber the live keys.
+    Past max_entries the keys closest to expiring are evicted first.
+
+    A ttl of None means no expiry. Not thread-safe; use from one event loop.
+    """
+
+    def __init__(self, max_entries: int = 100_000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = {}
+        self.heap = []
+        self.expired = 0
+        self.evicted = 0
+
+    def _expire(self) -> float:
+        now = self.clock()
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            expires, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == expires:
+                del self.entries[key]
+                self.expired += 1
+        return now
+
+    def _store(self, key, expires: float, value):
+        entry = self.entries.get(key)
+        self.entries[key] = (expires, value)
+        if expires != math.inf and (entry is None or entry[0] != expires):
+            heapq.heappush(self.heap, (expires, key))
+        while len(self.entries) > self.max_entries:
+            self._evict_one()
+        if len(self.heap) > 2 * len(self.entries) + 1024:
+            self.heap = [(expires, key) for key, (expires, _) in self.entries.items() if expires != math.inf]
+            heapq.heapify(self.heap)
+
+    def _evict_one(self):
+        while self.heap:
+            expires, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == expires:
+                del self.entries[key]
+                self.evicted += 1
+                return
+        # Only keys without an expiry are left
+        del self.entries[next(iter(self.entries))]
+        self.evicted += 1
+
+    def get(self, key, default=None):
+        self._expire()
+        entry = self.entries.get(key)
+        return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl: float = None):
+        now = self._expire()
+        self._store(key, math.inf if ttl is None else now + ttl, value)
+
+    def delete(self, key) -> bool:
+        self._expire()
+        return self.entries.pop(key, None) is not None
+
+    def incr(self, key, ttl: float = None):
+        """
+        Add one to key's integer value and return (count, seconds left). A
+        missing key starts at 1 with the given ttl; an existing one keeps its
+        deadline, so with a ttl this is a fixed-window counter.
+        """
+        now = self._expire()
+        entry = self.entries.get(key)
+        if entry is None:
+            expires, count = (math.inf if ttl is None else now + ttl), 1
+        else:
+            expires, count = entry[0], int(entry[1]) + 1
+        self._store(key, expires, count)
+        return count, expires - now
+
+    def expire(self, key, ttl: float) -> bool:
+        """Give an existing key a new deadline ttl seconds from now"""
+        now = self._expire()
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        self._store(key, now + ttl, entry[1])
+        return True
+
+    def ttl(self, key):
+        """Seconds until key expires: None if it doesn't exist, inf if it never does"""
+        now = self._expire()
+        entry = self.entries.get(key)
+        return None if entry is None else entry[0] - now
+
+    def __len__(self):
+        self._expire()
+        return len(self.entries)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self),
+            "heap": len(self.heap),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
@@ -88,6 +88,11 @@ export default function ChatPage() {
 
     ws.onmessage = (event) => {
       const data = JSON.parse(event.data);
+      if (data.type === "message_rejected") {
+        // Broadcast earlier but never saved
+        setMessages(prev => prev.filter(m => m.id !== data.id));
+        return;
+      }
       if (!data.sender_id) {
         data.sender_id = userId; // fallback
       }
@@ -117,6 +117,12 @@ export default function CommunityChatPage() {
       try {
         const data = JSON.parse(event.data);
         console.log("📨 Received message:", data);
+
+        if (data.type === "message_rejected") {
+          // Broadcast earlier but never saved
+          setMessages(prev => prev.filter(m => m.id !== data.id));
+          return;
+        }
         
         // Ensure we have all required fields
         if (!data.sender_id) {
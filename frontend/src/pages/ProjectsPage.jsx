@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Box,
   Container,
@@ -199,6 +199,38 @@ const DifficultyChip = styled(Chip)(({ theme, difficulty }) => {
   };
 });
 
+// The projects feed is paged (next_cursor): one page is loaded at a time and
+// "Load more" fetches the next. Status and recruiting are filtered by the
+// server; the other filters apply to the pages loaded so far.
+const PROJECTS_URL = 'http://localhost:8000/api/app_projects_with_members';
+const PROJECTS_PAGE_SIZE = 24;
+const PROJECT_STATUSES = ['active', 'completed', 'on_hold', 'cancelled'];
+
+const fetchProjectsPage = async (token, { cursor, status, isRecruiting } = {}) => {
+  const params = { limit: PROJECTS_PAGE_SIZE };
+  if (cursor) params.cursor = cursor;
+  if (status) params.status = status;
+  if (isRecruiting !== undefined) params.is_recruiting = isRecruiting;
+  const res = await axios.get(PROJECTS_URL, {
+    headers: {
+      'Authorization': `Bearer ${token}`
+    },
+    params,
+  });
+  // Map members to a flat array of profile info for each project
+  const projects = (res.data.projects || []).map(project => ({
+    ...project,
+    members: (project.app_project_members || []).map(m => ({
+      id: m.profiles?.id,
+      name: m.profiles?.full_name || m.profiles?.username || 'Unknown',
+      avatar: m.profiles?.avatar || '',
+      role: m.role,
+      status: m.status,
+    }))
+  }));
+  return { projects, nextCursor: res.data.next_cursor };
+};
+
 function ProjectsPage() {
   useAuthGuard();
   const [selectedTab, setSelectedTab] = useState(0);
@@ -211,6 +243,12 @@ function ProjectsPage() {
   const [projects, setProjects] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Bumped to reload the first page (e.g. after creating a project)
+  const [refreshKey, setRefreshKey] = useState(0);
+  // Changes whenever the list starts over, so pages for older filters are dropped
+  const listVersion = useRef(0);
 
   // Create Project Modal State
   const [createOpen, setCreateOpen] = useState(false);
@@ -257,7 +295,16 @@ function ProjectsPage() {
   const user = JSON.parse(localStorage.getItem('user') || '{}');
   const userId = user.id;
 
+  // Filters the server applies; changing one starts again from the first page
+  const serverFilters = {
+    status: selectedStatus || undefined,
+    // Discover only lists projects that are recruiting
+    isRecruiting: selectedTab === 0 ? true : undefined,
+  };
+
   useEffect(() => {
+    const version = ++listVersion.current;
+    const stale = () => listVersion.current !== version;
     const fetchProjects = async () => {
       setLoading(true);
       setError(null);
@@ -269,34 +316,38 @@ function ProjectsPage() {
           setLoading(false);
           return;
         }
-        const res = await axios.get('http://localhost:8000/api/app_projects_with_members', {
-          headers: {
-            'Authorization': `Bearer ${token}`
-          }
-        });
-        const data = res.data.projects;
-        // Map members to a flat array of profile info for each project
-        const projectsWithMembers = (data || []).map(project => ({
-          ...project,
-          members: (project.app_project_members || []).map(m => ({
-            id: m.profiles?.id,
-            name: m.profiles?.full_name || m.profiles?.username || 'Unknown',
-            avatar: m.profiles?.avatar || '',
-            email: m.profiles?.email || '',
-            role: m.role,
-            status: m.status,
-          }))
-        }));
-        setProjects(projectsWithMembers);
+        const page = await fetchProjectsPage(token, serverFilters);
+        if (stale()) return;
+        setProjects(page.projects);
+        setNextCursor(page.nextCursor);
       } catch (err) {
+        if (stale()) return;
         setError('Failed to fetch projects');
         console.error('Failed to fetch projects:', err);
       } finally {
-        setLoading(false);
+        if (!stale()) setLoading(false);
       }
     };
     fetchProjects();
-  }, []);
+  }, [selectedStatus, selectedTab, refreshKey]);
+
+  const handleLoadMore = async () => {
+    const token = localStorage.getItem('access_token');
+    if (!token || !nextCursor) return;
+    const version = listVersion.current;
+    setLoadingMore(true);
+    try {
+      const page = await fetchProjectsPage(token, { ...serverFilters, cursor: nextCursor });
+      if (listVersion.current !== version) return;
+      setProjects(prev => [...prev, ...page.projects.filter(p => !prev.some(q => q.id === p.id))]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError('Failed to fetch projects');
+      console.error('Failed to fetch more projects:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   // After fetching projects, mark already applied projects
   useEffect(() => {
@@ -308,7 +359,6 @@ function ProjectsPage() {
 
   // Extract unique values for filters from real data
   const allDomains = [...new Set(projects.map(p => p.domain).filter(Boolean))];
-  const allStatuses = [...new Set(projects.map(p => p.status).filter(Boolean))];
   const allTypes = [...new Set(projects.map(p => p.project_type).filter(Boolean))];
   const allSkills = [...new Set(projects.flatMap(p => p.required_skills || []))];
 
@@ -330,9 +380,8 @@ function ProjectsPage() {
         (project.tags && project.tags.some(tag => tag.toLowerCase().includes(searchLower)));
       if (!matchesSearch) return false;
     }
-    // Filter by domain, status, type, skill
+    // Filter by domain, type, skill (status is filtered by the server)
     if (selectedDomain && project.domain !== selectedDomain) return false;
-    if (selectedStatus && project.status !== selectedStatus) return false;
     if (selectedType && project.project_type !== selectedType) return false;
     if (selectedSkill && !(project.required_skills || []).includes(selectedSkill)) return false;
     return true;
@@ -383,32 +432,8 @@ function ProjectsPage() {
       await createProject(payload);
       setCreateSuccess('Project created!');
       handleCreateClose();
-      // Refresh projects
-      setLoading(true);
-      const token = localStorage.getItem('access_token');
-      if (!token) {
-        setError('No authentication token found. Please log in.');
-        setLoading(false);
-        return;
-      }
-      const res = await axios.get('http://localhost:8000/api/app_projects_with_members', {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
-      const data = res.data.projects;
-      const projectsWithMembers = (data || []).map(project => ({
-        ...project,
-        members: (project.app_project_members || []).map(m => ({
-          id: m.profiles?.id,
-          name: m.profiles?.full_name || m.profiles?.username || 'Unknown',
-          avatar: m.profiles?.avatar || '',
-          email: m.profiles?.email || '',
-          role: m.role,
-          status: m.status,
-        }))
-      }));
-      setProjects(projectsWithMembers);
+      // Refresh projects from the first page
+      setRefreshKey(k => k + 1);
     } catch (err) {
       setCreateError('Failed to create project');
     } finally {
@@ -576,7 +601,7 @@ function ProjectsPage() {
                         displayEmpty
                       >
                         <MenuItem value="">All Statuses</MenuItem>
-                        {allStatuses.map(status => (
+                        {PROJECT_STATUSES.map(status => (
                           <MenuItem key={status} value={status} sx={{ color: '#fff' }}>
                             {status.replace('_', ' ')}
                           </MenuItem>
@@ -809,7 +834,7 @@ function ProjectsPage() {
                       <Stack direction="row" spacing={1} alignItems="center" sx={{ mb: 2 }}>
                         <AvatarGroup max={4}>
                           {project.members && project.members.map((member) => (
-                            <Tooltip key={member.id} title={member.email} placement="top">
+                            <Tooltip key={member.id} title={member.name} placement="top">
                               <Avatar
                                 alt={member.name}
                                 src={member.avatar}
@@ -821,7 +846,7 @@ function ProjectsPage() {
                           ))}
                         </AvatarGroup>
                         <Typography variant="caption" color="#9ca3af">
-                          {project.members && project.members.length} member{project.members && project.members.length !== 1 ? 's' : ''}
+                          {project.member_count ?? project.members.length} member{(project.member_count ?? project.members.length) !== 1 ? 's' : ''}
                         </Typography>
                       </Stack>
 
@@ -853,6 +878,14 @@ function ProjectsPage() {
             )}
           </Grid>
 
+          {nextCursor && !loading && (
+            <Box sx={{ display: 'flex', justifyContent: 'center', mt: 4 }}>
+              <GradientButton onClick={handleLoadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </GradientButton>
+            </Box>
+          )}
+
           {/* Create Project Modal */}
           <Dialog open={createOpen} onClose={handleCreateClose} maxWidth="md" fullWidth sx={{ alignItems: 'flex-start' }} PaperProps={{ sx: { background: 'rgba(0, 0, 0, 0.85)', backdropFilter: 'blur(24px)', minWidth: { md: 700 }, position: 'relative' } }}>
             <IconButton onClick={handleCreateClose} sx={{ position: 'absolute', top: 12, right: 12, color: '#fff', zIndex: 10 }}>
@@ -0,0 +1,5 @@
+-- Supports keyset pagination of message history on (created_at, id) in
+-- /chat/rooms/{room_id}/messages and /communities/{community_id}/messages.
+-- Both directions (before/after a cursor) are served by the same index.
+CREATE INDEX IF NOT EXISTS messages_room_created_id_idx
+  ON messages (room_id, created_at, id);
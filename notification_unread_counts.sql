@@ -0,0 +1,65 @@
+-- Maintained unread-notification counter per recipient, backing the badge
+-- count in /notifications and the push channel. Triggers keep it in step with
+-- inserts, reads and deletes on notifications, so reading it is a single
+-- primary-key lookup instead of a count over the user's unread backlog.
+CREATE TABLE IF NOT EXISTS notification_unread_counts (
+  user_id uuid PRIMARY KEY,
+  unread_count bigint NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION notification_unread_count_row() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' AND NOT COALESCE(NEW.is_read, false) THEN
+    INSERT INTO notification_unread_counts (user_id, unread_count)
+    VALUES (NEW.recipient_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET unread_count = notification_unread_counts.unread_count + 1;
+  ELSIF TG_OP = 'DELETE' AND NOT COALESCE(OLD.is_read, false) THEN
+    UPDATE notification_unread_counts SET unread_count = GREATEST(unread_count - 1, 0)
+    WHERE user_id = OLD.recipient_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Updates are handled per statement so marking thousands of notifications
+-- read touches each recipient's counter once.
+CREATE OR REPLACE FUNCTION notification_unread_count_update() RETURNS trigger AS $$
+BEGIN
+  WITH delta AS (
+    SELECT user_id, SUM(change) AS change
+    FROM (
+      SELECT recipient_id AS user_id, -1 AS change FROM old_rows WHERE NOT COALESCE(is_read, false)
+      UNION ALL
+      SELECT recipient_id AS user_id, 1 AS change FROM new_rows WHERE NOT COALESCE(is_read, false)
+    ) changes
+    GROUP BY user_id
+    HAVING SUM(change) <> 0
+  )
+  INSERT INTO notification_unread_counts (user_id, unread_count)
+  SELECT user_id, GREATEST(change, 0) FROM delta
+  ON CONFLICT (user_id) DO UPDATE SET unread_count = GREATEST(
+    notification_unread_counts.unread_count
+      + (SELECT change FROM delta WHERE delta.user_id = notification_unread_counts.user_id),
+    0);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS notifications_unread_count_row ON notifications;
+CREATE TRIGGER notifications_unread_count_row
+AFTER INSERT OR DELETE ON notifications
+FOR EACH ROW EXECUTE FUNCTION notification_unread_count_row();
+
+DROP TRIGGER IF EXISTS notifications_unread_count_update ON notifications;
+CREATE TRIGGER notifications_unread_count_update
+AFTER UPDATE ON notifications
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notification_unread_count_update();
+
+-- Backfill from existing notifications
+INSERT INTO notification_unread_counts (user_id, unread_count)
+SELECT recipient_id, COUNT(*)
+FROM notifications
+WHERE NOT COALESCE(is_read, false)
+GROUP BY recipient_id
+ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count;
@@ -0,0 +1,59 @@
+-- Maintained follower / following / project counters backing get_user_stats.
+-- Triggers on user_connections and projects keep one row per profile, so the
+-- stats read is a primary-key lookup instead of three counts that grow with
+-- how popular a user is.
+CREATE TABLE IF NOT EXISTS profile_stats (
+  user_id uuid PRIMARY KEY,
+  followers bigint NOT NULL DEFAULT 0,
+  following bigint NOT NULL DEFAULT 0,
+  projects bigint NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION profile_stats_connections() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO profile_stats (user_id, following) VALUES (NEW.follower_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET following = profile_stats.following + 1;
+    INSERT INTO profile_stats (user_id, followers) VALUES (NEW.following_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET followers = profile_stats.followers + 1;
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE profile_stats SET following = GREATEST(following - 1, 0) WHERE user_id = OLD.follower_id;
+    UPDATE profile_stats SET followers = GREATEST(followers - 1, 0) WHERE user_id = OLD.following_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION profile_stats_projects() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO profile_stats (user_id, projects) VALUES (NEW.profile_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET projects = profile_stats.projects + 1;
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE profile_stats SET projects = GREATEST(projects - 1, 0) WHERE user_id = OLD.profile_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS user_connections_profile_stats ON user_connections;
+CREATE TRIGGER user_connections_profile_stats
+AFTER INSERT OR DELETE ON user_connections
+FOR EACH ROW EXECUTE FUNCTION profile_stats_connections();
+
+DROP TRIGGER IF EXISTS projects_profile_stats ON projects;
+CREATE TRIGGER projects_profile_stats
+AFTER INSERT OR DELETE ON projects
+FOR EACH ROW EXECUTE FUNCTION profile_stats_projects();
+
+-- Backfill from existing rows
+INSERT INTO profile_stats (user_id, followers, following, projects)
+SELECT p.id,
+  (SELECT COUNT(*) FROM user_connections uc WHERE uc.following_id = p.id),
+  (SELECT COUNT(*) FROM user_connections uc WHERE uc.follower_id = p.id),
+  (SELECT COUNT(*) FROM projects pr WHERE pr.profile_id = p.id)
+FROM profiles p
+ON CONFLICT (user_id) DO UPDATE SET
+  followers = EXCLUDED.followers,
+  following = EXCLUDED.following,
+  projects = EXCLUDED.projects;
@@ -0,0 +1,23 @@
+-- Indexes behind /search/projects/discover when it filters in the database
+-- (before the in-memory discovery index has loaded, or when scripting the
+-- same filters in SQL). Array facets are matched with && (PostgREST ov),
+-- which GIN indexes serve; scalar facets are equality / IN filters.
+CREATE INDEX IF NOT EXISTS app_projects_required_skills_gin
+  ON app_projects USING GIN (required_skills);
+CREATE INDEX IF NOT EXISTS app_projects_tech_stack_gin
+  ON app_projects USING GIN (tech_stack);
+CREATE INDEX IF NOT EXISTS app_projects_programming_languages_gin
+  ON app_projects USING GIN (programming_languages);
+CREATE INDEX IF NOT EXISTS app_projects_tags_gin
+  ON app_projects USING GIN (tags);
+
+-- Scalar facets, each with the feed's keyset order so a filtered page is an
+-- index range scan rather than a sort
+CREATE INDEX IF NOT EXISTS app_projects_status_created_idx
+  ON app_projects (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS app_projects_domain_created_idx
+  ON app_projects (domain, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS app_projects_difficulty_created_idx
+  ON app_projects (difficulty_level, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS app_projects_remote_created_idx
+  ON app_projects (is_remote, created_at DESC, id DESC);
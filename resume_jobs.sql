@@ -0,0 +1,18 @@
+-- Resume uploads parsed in the background (POST /api/profile/resume). The
+-- client polls its job (GET /api/profile/resume/{job_id}) for the skills
+-- found and the ones added to its profile; any worker can answer the poll.
+CREATE TABLE IF NOT EXISTS resume_jobs (
+  id uuid PRIMARY KEY,
+  user_id uuid NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  filename text,
+  status text NOT NULL DEFAULT 'queued'
+    CHECK (status IN ('queued', 'processing', 'done', 'failed')),
+  skills text[],
+  added_skills text[],
+  error text,
+  created_at timestamptz NOT NULL DEFAULT now(),
+  finished_at timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS resume_jobs_user_created_idx
+  ON resume_jobs (user_id, created_at DESC);
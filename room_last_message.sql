@@ -0,0 +1,57 @@
+-- Maintained "last message per room" projection backing /chat/conversations.
+-- Every insert into messages (save_message) upserts the room's row here, so the
+-- inbox reads one row per room instead of running a top-1 query per room.
+CREATE TABLE IF NOT EXISTS room_last_message (
+  room_id uuid PRIMARY KEY REFERENCES rooms(id) ON DELETE CASCADE,
+  message_id uuid,
+  sender_id uuid,
+  content text,
+  created_at timestamptz,
+  message_count bigint NOT NULL DEFAULT 0
+);
+
+-- Unread count for a member = room_last_message.message_count - last_read_count
+ALTER TABLE room_members ADD COLUMN IF NOT EXISTS last_read_count bigint NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION update_room_last_message() RETURNS trigger AS $$
+DECLARE
+  new_count bigint;
+BEGIN
+  INSERT INTO room_last_message (room_id, message_id, sender_id, content, created_at, message_count)
+  VALUES (NEW.room_id, NEW.id, NEW.sender_id, NEW.content, NEW.created_at, 1)
+  ON CONFLICT (room_id) DO UPDATE SET
+    message_id = CASE WHEN EXCLUDED.created_at >= room_last_message.created_at
+                      THEN EXCLUDED.message_id ELSE room_last_message.message_id END,
+    sender_id = CASE WHEN EXCLUDED.created_at >= room_last_message.created_at
+                     THEN EXCLUDED.sender_id ELSE room_last_message.sender_id END,
+    content = CASE WHEN EXCLUDED.created_at >= room_last_message.created_at
+                   THEN EXCLUDED.content ELSE room_last_message.content END,
+    created_at = GREATEST(EXCLUDED.created_at, room_last_message.created_at),
+    message_count = room_last_message.message_count + 1
+  RETURNING message_count INTO new_count;
+
+  -- The sender has read everything up to their own message
+  UPDATE room_members SET last_read_count = new_count
+  WHERE room_id = NEW.room_id AND user_id = NEW.sender_id;
+
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS messages_room_last_message ON messages;
+CREATE TRIGGER messages_room_last_message
+AFTER INSERT ON messages
+FOR EACH ROW EXECUTE FUNCTION update_room_last_message();
+
+-- Backfill from existing history
+INSERT INTO room_last_message (room_id, message_id, sender_id, content, created_at, message_count)
+SELECT DISTINCT ON (m.room_id)
+  m.room_id, m.id, m.sender_id, m.content, m.created_at,
+  COUNT(*) OVER (PARTITION BY m.room_id)
+FROM messages m
+ORDER BY m.room_id, m.created_at DESC
+ON CONFLICT (room_id) DO NOTHING;
+
+UPDATE room_members rm SET last_read_count = rlm.message_count
+FROM room_last_message rlm
+WHERE rlm.room_id = rm.room_id;